@@ -9,6 +9,7 @@ __email__= "l.pereztato@ciccp.es"
 
 import sys
 import logging
+import weakref
 from pycost.bc3 import fr_entity
 from pycost.bc3 import bc3_entity
 from pycost.prices.price_justification import PriceJustificationRecord as pjr
@@ -16,12 +17,127 @@ from pycost.utils import basic_types
 
 
 class BC3Component(fr_entity.EntFR):
-    '''Component of a price decomposition.'''
+    '''Component of a price decomposition.
+
+    :ivar parentList: component list that contains this component.
+    '''
+    parentList= None
+    _ent= None
+    componentsByCode= dict() # components indexed by the code of their entity.
 
     def __init__(self, e= None, fr= fr_entity.EntFR()):
         super(BC3Component,self).__init__(fr.factor,fr.productionRate)
         self.ent= e
 
+    def __setstate__(self, state):
+        ''' Restore the object state and register this component as
+            dependent of its entity.
+
+        :param state: object state.
+        '''
+        for name in ['factor', 'productionRate', 'ent']: # pickled before being properties.
+            if(name in state):
+                state['_'+name]= state.pop(name)
+        self.__dict__.update(state)
+        if(hasattr(self._ent, 'getDependents')):
+            self._ent.getDependents().add(self)
+            self.registerCode()
+
+    def registerCode(self):
+        ''' Append this component to the components that refer to the code
+            of its entity (see getComponentsThatReferTo).'''
+        code= self._ent.Codigo()
+        components= BC3Component.componentsByCode.get(code, None)
+        if(components is None):
+            components= weakref.WeakSet()
+            BC3Component.componentsByCode[code]= components
+        components.add(self)
+
+    def unregisterCode(self):
+        ''' Remove this component from the components that refer to the
+            code of its entity.'''
+        components= BC3Component.componentsByCode.get(self._ent.Codigo(), None)
+        if(components is not None):
+            components.discard(self)
+
+    @staticmethod
+    def getComponentsThatReferTo(code):
+        ''' Return the components whose entity has the code argument (all
+            the objects with that code are considered, even if they have
+            been replaced in the price tables).
+
+        :param code: code of the entity.
+        '''
+        retval= list()
+        components= BC3Component.componentsByCode.get(code, None)
+        if(components is not None):
+            for component in list(components):
+                if(component.ent.Codigo()==code):
+                    retval.append(component)
+        return retval
+
+    def getParentPrice(self):
+        ''' Return the price whose decomposition contains this component
+            (None if it has been removed from it).'''
+        retval= None
+        if(self.parentList is not None):
+            retval= self.parentList.parentPrice
+        return retval
+
+    def invalidateParentPrice(self):
+        ''' Discard the cached price of the price that contains this
+            component.'''
+        if(self.parentList is not None):
+            self.parentList.invalidatePrice()
+
+    @property
+    def ent(self):
+        ''' Return the entity (price) of this component.'''
+        return self._ent
+
+    @ent.setter
+    def ent(self, value):
+        ''' Set the entity (price) of this component.
+
+        :param value: new entity.
+        '''
+        if(hasattr(self._ent, 'getDependents')): # not a pending link.
+            self._ent.getDependents().discard(self)
+            self.unregisterCode()
+        self._ent= value
+        if(hasattr(value, 'getDependents')):
+            value.getDependents().add(self)
+            self.registerCode()
+        self.invalidateParentPrice()
+
+    @property
+    def factor(self):
+        ''' Return the factor.'''
+        return self._factor
+
+    @factor.setter
+    def factor(self, value):
+        ''' Set the factor.
+
+        :param value: new factor.
+        '''
+        self._factor= value
+        self.invalidateParentPrice()
+
+    @property
+    def productionRate(self):
+        ''' Return the production rate.'''
+        return self._productionRate
+
+    @productionRate.setter
+    def productionRate(self, value):
+        ''' Set the production rate.
+
+        :param value: new production rate.
+        '''
+        self._productionRate= value
+        self.invalidateParentPrice()
+
     def getCopy(self):
         ''' Return a copy of this object.'''
         fr_copy= super().getCopy()
@@ -82,9 +198,12 @@ class BC3Component(fr_entity.EntFR):
             os.write(0 + '|' + self.CodigoEntidad() + '|')
         super(BC3Component,self).WriteSpre(os)
 
+    def getBC3String(self):
+        ''' Return the component in FIEBDC-3 format.'''
+        return self.ent.CodigoBC3() + '\\' + super(BC3Component,self).getBC3String()
+
     def WriteBC3(self, os):
-        os.write(self.ent.CodigoBC3() + '\\')
-        super(BC3Component,self).WriteBC3(os)
+        os.write(self.getBC3String())
 
     def Entidad(self):
         if self.ent:
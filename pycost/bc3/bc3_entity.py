@@ -10,8 +10,10 @@ __email__= "l.pereztato@ciccp.es"
 
 import logging
 from pycost.bc3 import codes
+from pycost.bc3 import bc3_writer
 from pycost.utils import EntPyCost as epc
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from decimal import Decimal
 
 class EntBC3(epc.EntPyCost):
@@ -99,6 +101,11 @@ class EntBC3(epc.EntPyCost):
     def getRoundedPrice(self):
         return Decimal(self.getPriceString())
 
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price as an integer in units of
+            10**-precision (see getRoundedPrice).'''
+        return fixed_point.round_scaled(self.getPrice(), 10**self.precision)
+
     def Fecha(self):
         return "040400";    # xxx
 
@@ -121,12 +128,12 @@ class EntBC3(epc.EntPyCost):
            + self.getPriceString() + '|' + '\n')
 
     def WriteConceptoBC3(self, os):
-        os.write("~C" + '|' + self.CodigoBC3())
-        os.write('|' + self.Unidad() + '|')
-        os.write(self.getTitle() + '|')
-        os.write(self.getPriceString() + '|')
-        os.write(self.Fecha() + '|')
-        os.write(self.ChrTipo() + '|\n')
+        os.write("~C" + '|' + self.CodigoBC3()
+                 + '|' + self.Unidad() + '|'
+                 + self.getTitle() + '|'
+                 + bc3_writer.get_price_string(os, self) + '|'
+                 + self.Fecha() + '|'
+                 + self.ChrTipo() + '|\n')
 
     def Write(self, os):
         os.write("Codigo: " + self.Codigo() + '\n'
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+''' Read-only index of the records of a FIEBDC-3 file.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import mmap
+from pycost.bc3 import codes
+from pycost.bc3 import fiebdc3
+
+class BC3Index(object):
+    ''' Memory-mapped FIEBDC-3 file that stores the byte offsets of the
+        records of each concept. The records are decoded only when
+        requested.
+
+    :ivar fileName: name of the indexed file.
+    :ivar encoding: encoding of the indexed file.
+    :ivar offsets: dictionary containing, for each concept code, a
+                   dictionary with the (start, end) byte offsets of its
+                   records indexed by the record type.
+    :ivar mm: memory map of the file (None if the file is empty).
+    '''
+    # Indexed record types.
+    indexed_record_types= set(['C', 'D', 'T', 'P', 'Y'])
+
+    def __init__(self, fileName, encoding= 'utf-8'):
+        ''' Constructor.
+
+        :param fileName: name of the file to index.
+        :param encoding: encoding of the file.
+        '''
+        self.fileName= fileName
+        self.encoding= encoding
+        self.offsets= dict()
+        self.inputFile= open(fileName, mode= 'rb')
+        self.mm= None
+        if(os.fstat(self.inputFile.fileno()).st_size>0): # empty files can't be mapped.
+            self.mm= mmap.mmap(self.inputFile.fileno(), 0, access= mmap.ACCESS_READ)
+            self.buildIndex()
+
+    def buildIndex(self):
+        ''' Store the byte offsets of the records of each concept.'''
+        recordSeparator= fiebdc3.record_separator.encode('ascii')
+        fieldSeparator= fiebdc3.field_separator.encode('ascii')
+        recordTypes= set(t.encode('ascii') for t in self.indexed_record_types)
+        mm= self.mm
+        sz= len(mm)
+        start= mm.find(recordSeparator)
+        while(start>=0):
+            end= mm.find(recordSeparator, start+1)
+            if(end<0):
+                end= sz
+            recordType= mm[start+1:start+2]
+            if(recordType in recordTypes):
+                codeStart= mm.find(fieldSeparator, start, end)
+                if(codeStart>=0):
+                    codeEnd= mm.find(fieldSeparator, codeStart+1, end)
+                    if(codeEnd<0):
+                        codeEnd= end
+                    code= mm[codeStart+1:codeEnd].decode(self.encoding).strip().strip('\\')
+                    if(len(code)>0):
+                        self.offsets.setdefault(code, dict())[recordType.decode('ascii')]= (start+1, end)
+            start= end if (end<sz) else -1
+
+    def __len__(self):
+        ''' Return the number of indexed concepts.'''
+        return len(self.offsets)
+
+    def __contains__(self, code):
+        ''' Return true if the code argument is in the index.
+
+        :param code: concept code.
+        '''
+        return code in self.offsets
+
+    def getRecordText(self, start, end):
+        ''' Return the text of the record between the offsets argument.
+
+        :param start: byte offset of the record start.
+        :param end: byte offset of the record end.
+        '''
+        return self.mm[start:end].decode(self.encoding)
+
+    def getRecords(self, code):
+        ''' Return a Codigos object containing the record of the concept
+            whose code is passed as parameter (or None if not found).
+
+        :param code: concept code.
+        '''
+        retval= None
+        recordOffsets= self.offsets.get(code, None)
+        if(recordOffsets is not None):
+            retval= codes.Codigos()
+            for (start, end) in recordOffsets.values():
+                record= fiebdc3.normalize_record(self.getRecordText(start, end))
+                fields= record.split(fiebdc3.field_separator)
+                recordType= fields.pop(0)
+                cod= fields.pop(0)
+                retval.insertRecord(recordType, cod, fields, 0)
+        return retval
+
+    def close(self):
+        ''' Close the memory map and the indexed file.'''
+        if(self.mm is not None):
+            self.mm.close()
+        self.inputFile.close()
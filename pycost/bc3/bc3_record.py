@@ -7,20 +7,115 @@ __license__= "GPL"
 __version__= "3.0"
 __email__= "l.pereztato@ciccp.es"
 
-from pycost.bc3 import fiebdc3
 import logging
+from pycost.bc3 import fiebdc3
 
 elemento, descompuesto, medicion, obra, capitulo, sin_tipo= range(0,6)
 
 class RegBC3(object):
+    ''' FIEBDC-3 record (the raw tokens of the ~C, ~D, ~M, ~T, ~Y and ~P
+        records that share the same code).
+
+    The views of the record (concept, text, decomposition,...) are
+    decoded the first time they are requested and then memoized, so
+    repeated access doesn't decode the tokens again. Assigning new tokens
+    invalidates the corresponding view.
+
+    :ivar code: concept identifier.
+    '''
+    __slots__= ('code', '_c', '_d', '_m', '_t', '_y', '_p', 'o', '_concept', '_text', '_desc', '_med', '_parameters')
+    savedDecodes= 0 # number of decodes avoided by the memoized views.
+
     def __init__(self, code):
         self.code= code # Concept identifier.
-        self.c= None # Concepto
-        self.d= None # Descomposición.
-        self.m= None # Medicion
-        self.t= None # Texto
-        self.y= None # Descomposición.
-        self.p= None # Parameter definitions.
+        self._c= None # Concepto
+        self._d= None # Descomposición.
+        self._m= None # Medicion
+        self._t= None # Texto
+        self._y= None # Descomposición.
+        self._p= None # Parameter definitions.
+        self.o= None # Business relationship.
+        self._concept= None
+        self._text= None
+        self._desc= None
+        self._med= None
+        self._parameters= None
+
+    @classmethod
+    def getSavedDecodes(cls):
+        ''' Return the number of decodes avoided by the memoized views.'''
+        return cls.savedDecodes
+
+    @classmethod
+    def resetSavedDecodes(cls):
+        ''' Reset the counter of decodes avoided by the memoized views.'''
+        cls.savedDecodes= 0
+
+    @property
+    def c(self):
+        ''' Return the tokens of the ~C record.'''
+        return self._c
+
+    @c.setter
+    def c(self, tokens):
+        ''' Assign the tokens of the ~C record.'''
+        self._c= tokens
+        self._concept= None
+
+    @property
+    def d(self):
+        ''' Return the tokens of the ~D record.'''
+        return self._d
+
+    @d.setter
+    def d(self, tokens):
+        ''' Assign the tokens of the ~D record.'''
+        self._d= tokens
+        self._desc= None
+
+    @property
+    def m(self):
+        ''' Return the tokens of the ~M record.'''
+        return self._m
+
+    @m.setter
+    def m(self, tokens):
+        ''' Assign the tokens of the ~M record.'''
+        self._m= tokens
+        self._med= None
+
+    @property
+    def t(self):
+        ''' Return the tokens of the ~T record.'''
+        return self._t
+
+    @t.setter
+    def t(self, tokens):
+        ''' Assign the tokens of the ~T record.'''
+        self._t= tokens
+        self._text= None
+
+    @property
+    def y(self):
+        ''' Return the tokens of the ~Y record.'''
+        return self._y
+
+    @y.setter
+    def y(self, tokens):
+        ''' Assign the tokens of the ~Y record.'''
+        self._y= tokens
+        self._desc= None
+
+    @property
+    def p(self):
+        ''' Return the tokens of the ~P record.'''
+        return self._p
+
+    @p.setter
+    def p(self, tokens):
+        ''' Assign the tokens of the ~P record.'''
+        self._p= tokens
+        self._parameters= None
 
     def GetDatosElemento(self):
         return fiebdc3.regBC3_elemento(self.GetConcepto(),self.GetTexto())
@@ -33,35 +128,61 @@ class RegBC3(object):
         return fiebdc3.regBC3_medicion(self.GetConcepto(),self.GetTexto(),self.GetMed())
 
     def GetConcepto(self):
-        return fiebdc3.regBC3_c(self.c)
+        ''' Return the decoded ~C record.'''
+        if(self._concept is None):
+            tokens= self._c
+            if(tokens is not None):
+                tokens= list(tokens) # the decoder consumes the tokens.
+            self._concept= fiebdc3.regBC3_c(tokens)
+        else:
+            RegBC3.savedDecodes+= 1
+        return self._concept
 
     def GetTexto(self):
-        return fiebdc3.regBC3_t(self.t)
+        ''' Return the decoded ~T record.'''
+        if(self._text is None):
+            self._text= fiebdc3.regBC3_t(self._t)
+        else:
+            RegBC3.savedDecodes+= 1
+        return self._text
 
     def getParametricData(self):
         return fiebdc3.regBC3_parametric(self.GetConcepto(), self.GetTexto(), self.getParameters())
 
     def getParameters(self):
         ''' Return the parametric concept contained in the BC3 file.'''
-        return fiebdc3.regBC3_p(self.p)
+        if(self._parameters is None):
+            self._parameters= fiebdc3.regBC3_p(self._p)
+        else:
+            RegBC3.savedDecodes+= 1
+        return self._parameters
 
     def GetDesc(self):
-        tmp= None
-        if(self.d and self.y):
-            tmp= self.d+self.y
-        elif(self.d):
-            tmp= self.d
-        elif(self.y):
-            tmp= self.y
-        bc3String= ''
-        if(tmp): # if it's composed.
-            for s in tmp:
-                bc3String+= s
-        return fiebdc3.regBC3_d(bc3String)
+        ''' Return the decoded decomposition (~D and ~Y records).'''
+        if(self._desc is None):
+            tmp= None
+            if(self._d and self._y):
+                tmp= self._d+self._y
+            elif(self._d):
+                tmp= self._d
+            elif(self._y):
+                tmp= self._y
+            bc3String= ''
+            if(tmp): # if it's composed.
+                bc3String= ''.join(tmp)
+            self._desc= fiebdc3.regBC3_d(bc3String)
+        else:
+            RegBC3.savedDecodes+= 1
+        return self._desc
 
 
     def GetMed(self):
-        return fiebdc3.regBC3_m(self.m)
+        ''' Return the decoded ~M record.'''
+        if(self._med is None):
+            self._med= fiebdc3.regBC3_m(self._m)
+        else:
+            RegBC3.savedDecodes+= 1
+        return self._med
 
     def isParametric(self):
         ''' Return true if the concept is a parametric one.'''
@@ -88,22 +209,19 @@ class RegBC3(object):
 
 
     def getConceptType(self):
-        ''' Return the type of this concept.'''
+        ''' Return the type of this concept. The checks follow the
+            precedence used to split the records in tables: root chapter,
+            measurement, chapter, elementary cost and unit cost.'''
         if self.EsObra():
             return obra
-        elif self.isElementaryCost():
-            return elemento
         elif self.EsMedicion():
             return medicion
-        elif self.EsDescompuesto():
-            return descompuesto
-        elif self.isChapter():
+        elif fiebdc3.es_codigo_capitulo_u_obra(self.code):
             return capitulo
-        else:
-            className= type(self).__name__
-            methodName= sys._getframe(0).f_code.co_name
-            logging.error(className+'.'+methodName+"; type of the concept: '" + str(i) + "' not found.")
-            return sin_tipo
+        elif self.isElementaryCost():
+            return elemento
+        else: # not a measurement, nor a chapter nor an elementary cost.
+            return descompuesto
 
     def getConceptTypeString(self):
         ''' Return a string identifying the type of this concept.'''
@@ -152,3 +270,19 @@ class RegBC3(object):
            + "P: " + self.p + ' ' + self.p.size() + '\n')
         return os
 
+
+def decode_unit_price_records(records):
+    ''' Decode the unit price records argument into plain tuples. It
+        doesn't use any shared state so it can be run in a worker process.
+
+    :param records: list of RegBC3 objects.
+    :returns: list of (code, title, unit, long description, price, components)
+              tuples, where components is a list of (code, factor,
+              production rate) tuples.
+    '''
+    retval= list()
+    for record in records:
+        concept= record.GetConcepto()
+        components= [(comp.codigo, comp.factor, comp.productionRate) for comp in record.GetDesc()]
+        retval.append((record.code, concept.resumen, concept.unidad, record.GetTexto().texto, concept.precio, components))
+    return retval
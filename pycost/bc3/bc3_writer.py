@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+''' Buffered output of FIEBDC-3 records.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+
+class BC3Writer(object):
+    ''' Output stream that accumulates the FIEBDC-3 records in a list of
+        strings and writes them to the underlying stream in large chunks.
+        It also stores the price string of each written concept, so each
+        price is computed only once for each export.
+
+    :ivar os: underlying output stream.
+    :ivar bufferSize: number of characters to accumulate before writing
+                      them to the underlying stream.
+    :ivar priceStrings: price strings of the concepts indexed by the
+                        object identifier.
+    '''
+    def __init__(self, os, bufferSize= 1<<20):
+        ''' Constructor.
+
+        :param os: output stream to write into.
+        :param bufferSize: number of characters to accumulate before
+                           writing them to the output stream.
+        '''
+        self.os= os
+        self.bufferSize= bufferSize
+        self.buffer= list()
+        self.bufferLength= 0
+        self.priceStrings= dict()
+
+    def write(self, text):
+        ''' Append the text argument to the buffer.
+
+        :param text: text to write.
+        '''
+        self.buffer.append(text)
+        self.bufferLength+= len(text)
+        if(self.bufferLength>=self.bufferSize):
+            self.flush()
+
+    def flush(self):
+        ''' Write the contents of the buffer to the output stream.'''
+        if(self.bufferLength>0):
+            self.os.write(''.join(self.buffer))
+        self.buffer.clear()
+        self.bufferLength= 0
+
+    def getPriceString(self, concept):
+        ''' Return the price string of the concept argument, computing it
+            only the first time.
+
+        :param concept: concept whose price string will be returned.
+        '''
+        key= id(concept)
+        retval= self.priceStrings.get(key, None)
+        if(retval is None):
+            retval= concept.getPriceString()
+            self.priceStrings[key]= retval
+        return retval
+
+    def setChapterPrices(self, rootChapter):
+        ''' Store the price strings of the chapter argument and all its
+            sub-chapters computing the prices bottom-up.
+
+        :param rootChapter: chapter whose prices will be stored.
+        '''
+        prices= rootChapter.getPrices()
+        for chapter in rootChapter.getChaptersDepthFirst():
+            self.priceStrings[id(chapter)]= chapter.formatString.format(prices[id(chapter)])
+
+def get_price_string(os, concept):
+    ''' Return the price string of the concept, using the cached value if
+        the output stream is a BC3Writer.
+
+    :param os: output stream.
+    :param concept: concept whose price string will be returned.
+    '''
+    if(isinstance(os, BC3Writer)):
+        return os.getPriceString(concept)
+    else:
+        return concept.getPriceString()
+
+# Root chapter of the worker processes (see write_subchapter_bc3).
+worker_root_chapter= None
+
+def set_worker_root_chapter(rootChapter):
+    ''' Store the root chapter in the worker process.
+
+    :param rootChapter: root chapter.
+    '''
+    global worker_root_chapter
+    worker_root_chapter= rootChapter
+
+def write_subchapter_bc3(args):
+    ''' Return the FIEBDC-3 text of a sub-chapter of the root chapter of
+        the worker process.
+
+    :param args: tuple containing the index of the sub-chapter and its
+                 position string.
+    '''
+    index, pos= args
+    chapter= worker_root_chapter.subcapitulos[index]
+    retval= io.StringIO()
+    writer= BC3Writer(retval)
+    writer.setChapterPrices(chapter)
+    chapter.WriteBC3(writer, pos)
+    writer.flush()
+    return retval.getvalue()
@@ -124,20 +124,17 @@ class Codigos(dict):
                     retval= self[codSharp2]
         return retval
             
-    def insertRecord(self, str_reg, quantities_counter):
+    def insertRecord(self, tipo, cod, tokens, quantities_counter):
         ''' Insert the tokens corresponding to a concept.
 
-        :param str_reg: character string containing the tokens.
+        :param tipo: record type (C, D, T, M,...).
+        :param cod: code of the concept.
+        :param tokens: remaining fields of the record.
         :param quantities_counter: counter of the ~M records.
         '''
-        tokens= str_reg.split('|')
-        tipo= tokens.pop(0)
-        cod= tokens.pop(0)
         cod= cod.strip('\\'); # Remove leading backslash.
 
-        if(tipo=='V' or tipo=='K' or tipo=='L' or
-                tipo=='A' or tipo=='G' or tipo=='E' or tipo=='X' or
-                tipo=='R'):
+        if(tipo in fiebdc3.ignored_record_types):
             logging.info("Ignoring '"+tipo+"' record.")
             return
 
@@ -255,6 +252,24 @@ class Codigos(dict):
         return retval
 
 
+    def getConceptTypeBuckets(self):
+        ''' Classify the entities according to its concept type visiting
+            each one of them only once.
+
+        :returns: dictionary containing a Codigos object for each one of
+                  the concept types found (bc3_record.obra,
+                  bc3_record.capitulo, bc3_record.elemento,...).
+        '''
+        retval= dict()
+        for key, entity in self.items():
+            conceptType= entity.getConceptType()
+            bucket= retval.get(conceptType, None)
+            if(bucket is None):
+                bucket= Codigos()
+                retval[conceptType]= bucket
+            bucket[key]= entity
+        return retval
+
     def Borra(self, cods):
         '''Removes the elements that are already in the dictionary
            argument.
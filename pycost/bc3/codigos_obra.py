@@ -6,8 +6,12 @@ __license__= "GPL"
 __version__= "3.0"
 __email__= "l.pereztato@ciccp.es"
 
+import sys
+import hashlib
 import logging
 from pycost.bc3 import codes
+from pycost.bc3 import bc3_record
+from pycost.bc3 import fiebdc3
 from pycost.utils import EntPyCost as epc
 
 class CodigosObra(epc.EntPyCost):
@@ -21,6 +25,7 @@ class CodigosObra(epc.EntPyCost):
         self.resto= codes.Codigos()
         self.containers= [self.caps,self.elementos,self.quantities,self.udsobr,self.resto]
         self.codigos_capitulos= set()
+        self.parentChaptersIndex= None
 
     def GetDatosElementos(self):
         ''' Return elementary prices data.'''
@@ -81,17 +86,29 @@ class CodigosObra(epc.EntPyCost):
 
     def Trocea(self):
         '''Separa los registros según sean capítulos, quantities, 
-           descompuestos, etc.
+           descompuestos, etc. (each record is visited only once).
         '''
-        obra= self.resto.GetObra(); #Obtiene los registros que corresponden a la obra.
-        self.caps.InsertaCods(obra)
-        #resto.Borra(obra)
-        self.caps.update(self.resto.GetChapters())
-        self.resto.Borra(self.caps)
-        self.elementos= self.resto.getElementaryCosts()
-        self.resto.Borra(self.elementos)
-        self.udsobr= self.resto.getUnitCosts()
-        self.resto.Borra(self.udsobr)
+        buckets= self.resto.getConceptTypeBuckets()
+        obra= buckets.pop(bc3_record.obra, None) # Registros que corresponden a la obra.
+        if(obra is None):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            logging.error(className+'.'+methodName+'; root chapter not found.')
+            exit(1)
+        self.caps.update(obra)
+        chapters= buckets.pop(bc3_record.capitulo, codes.Codigos())
+        for key, entity in chapters.items():
+            if(entity.isParametric()):
+                logging.error("parametric chapters not implemented yet.")
+        self.caps.update(chapters)
+        logging.info("  read " + str(len(chapters)) + ' chapters.')
+        self.elementos.update(buckets.pop(bc3_record.elemento, codes.Codigos()))
+        logging.info("  read " + str(len(self.elementos)) + " elementary prices." + '\n')
+        self.udsobr.update(buckets.pop(bc3_record.descompuesto, codes.Codigos()))
+        logging.info(" read " + str(len(self.udsobr)) + " precios descompuestos." + '\n')
+        self.resto.clear()
+        for bucket in buckets.values():
+            self.resto.update(bucket)
         if(len(self.resto)>0):
             logging.error("They left " + str(len(self.resto)) + ' not imported concepts.')
             logging.error(str(self.resto) + '\n')
@@ -107,36 +124,76 @@ class CodigosObra(epc.EntPyCost):
 
 
     def readBC3(self, inputFile):
-        ''' Read the remaining lines from BC3 and then calls the "Trocea"
+        ''' Read the records from the BC3 stream and then calls the "Trocea"
             routine.
 
-        :param inputFile: file to read from.
+        :param inputFile: stream to read from.
         '''
-        reg= ""
         count= 0
-        while(inputFile):
-            reg= inputFile.readline()
-            if(len(reg)==0):
-                break;
+        for tipo, code, fields in fiebdc3.tokenize_records(inputFile):
+            count+= 1
+            logging.info("Reading record: " + str(count) + '\n')
+            if(tipo == 'M'): # Quantities are directly inserted.
+                self.quantities.insertRecord(tipo, code, fields, count)
             else:
-                if(reg[0]=='~'):
-                    reg= reg[1:]
-                count+= 1
-                logging.info("Reading record: " + str(count) + '\n')
-                reg= reg.replace(chr(13),'')
-                reg= reg.replace('\n','')
-                if len(reg)>2:
-                    tipo= reg[0]
-                    if(tipo == 'M'): # Quantities are directly inserted.
-                        self.quantities.insertRecord(reg, count)
-                    else:
-                        self.resto.insertRecord(reg, count)
-
-        inputFile.close()
+                self.resto.insertRecord(tipo, code, fields, count)
         logging.info("  " + str(len(self.quantities)) + " quantities read." + '\n')
         self.Trocea()
 
 
+    @staticmethod
+    def getRecordHash(record, digest= None):
+        ''' Return the hash of the tokens of the record argument.
+
+        :param record: BC3 record.
+        :param digest: hash object to update (if None create a new one).
+        '''
+        retval= digest
+        if(retval is None):
+            retval= hashlib.sha1()
+        for recordType in ('c', 'd', 't', 'y', 'm', 'p'):
+            tokens= getattr(record, recordType)
+            if(tokens is not None):
+                retval.update((recordType+'|'+'|'.join(tokens)+'\n').encode('utf-8'))
+        return retval
+
+    def getRecordHashes(self):
+        ''' Return the hashes of the records grouped by the kind of object
+            they define: chapters, elementary prices, unit prices and
+            quantities (the quantities are grouped by the code of the ~M 
+            record, the counter suffix is removed). Must be called before
+            reading the chapters (that removes the elementary prices read).
+        '''
+        retval= {'chapters': dict(), 'elementary_prices': dict(), 'unit_prices': dict(), 'quantities': dict()}
+        for category, table in [('chapters', self.caps), ('elementary_prices', self.elementos), ('unit_prices', self.udsobr)]:
+            hashes= retval[category]
+            for key, record in table.items():
+                hashes[key]= self.getRecordHash(record).hexdigest()
+        quantityDigests= dict()
+        for key, record in self.quantities.items():
+            code= key.rpartition('@')[0]
+            quantityDigests[code]= self.getRecordHash(record, quantityDigests.get(code, None))
+        hashes= retval['quantities']
+        for code, digest in quantityDigests.items():
+            hashes[code]= digest.hexdigest()
+        return retval
+
+    def getParentChaptersIndex(self):
+        ''' Return a dictionary that maps the code of each elementary price
+            to the codes of the chapters whose decomposition contains it.
+            The index is built once from the ~D records of the chapters.
+        '''
+        if(self.parentChaptersIndex is None):
+            self.parentChaptersIndex= dict()
+            for chapterCode, record in self.caps.items():
+                for comp in record.GetDesc():
+                    p= self.elementos.find(comp.codigo)
+                    if(p): # elementary price found.
+                        parentChapters= self.parentChaptersIndex.setdefault(p.code, list())
+                        if(chapterCode not in parentChapters):
+                            parentChapters.append(chapterCode)
+        return self.parentChaptersIndex
+
     def FiltraElementales(self, descomp):
         '''Devuelve los registros de la descomposicion que corresponden a
         precios elementales.
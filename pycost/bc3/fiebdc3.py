@@ -64,6 +64,92 @@ def repl_lowcase_letter_index(match):
     match3 = match.group(3)
     return match1+str(match2)+match3
 
+# Patterns used to translate the parametric formulas into Python expressions.
+formula_lowcase_letter_pattern= re.compile(r'([a-z])')
+formula_parameter_index_pattern= re.compile(r'\(((?:num|str)[A-N])\)')
+formula_matrix_index_pattern= re.compile(r'\((\d+|num[A-N]),(\d+|num[A-N])\)')
+
+def translate_parametric_formula(formula):
+    ''' Return the Python expression corresponding to the formula of a
+        decomposition statement of a parametric concept (i.e.
+        "%P(%A)*(%B=b)" -> "numP[numA]*(numB==1)"). The indexes and the
+        options selected for the parameters are not replaced by its values
+        so the expression can be compiled once and evaluated for any
+        options using a namespace containing numA, strA, numB, ...
+
+    :param formula: formula to translate.
+    '''
+    retval= formula_lowcase_letter_pattern.sub(repl_lowcase_letter, formula)
+    retval= retval.replace('=', '==')
+    retval= retval.replace('%', 'num')
+    retval= retval.replace('$', 'str')
+    retval= retval.replace('<>','!=')
+    retval= retval.replace('@', ' or ')
+    # Parameter indexes.
+    retval= formula_parameter_index_pattern.sub(r'[\1]', retval)
+    # Matrix indexes.
+    retval= formula_matrix_index_pattern.sub(r'[\1][\2]', retval)
+    retval= retval.replace('&','and')
+    return retval
+
+# Names of the substitution statements of the summary and the text.
+summary_statement_names= ['RESUMEN', 'SUMMARY', 'R']
+text_statement_names= ['TEXTO', 'TEXT', 'T']
+
+# References to variables in the substitution statements: $A, %O(%A),
+# $L(a,%F),...
+template_reference_pattern= re.compile(r'([$%])([A-Z])(?:\(([^()]*)\))?')
+template_parameter_index_pattern= re.compile(r'%[A-Z]')
+template_letter_index_pattern= re.compile(r'[a-z]')
+
+def parse_template_indexes(text):
+    ''' Return the indexes of a variable reference of a substitution
+        statement (i.e. "a,%F" -> [0, 'numF']) or None if the text can't be
+        interpreted as a list of indexes.
+
+    :param text: text between parenthesis.
+    '''
+    retval= list()
+    for item in text.split(','):
+        item= item.strip()
+        if(template_parameter_index_pattern.fullmatch(item)):
+            retval.append('num'+item[1]) # index of the selected option.
+        elif(template_letter_index_pattern.fullmatch(item)):
+            retval.append(ord(item)-97)
+        elif(item.isdigit()):
+            retval.append(int(item))
+        else:
+            return None
+    return retval
+
+def tokenize_substitution_statement(statement):
+    ''' Return the substitution statement (summary, text,...) as a list of
+        literal strings and variable references. Each variable reference
+        is a (name, indexes, source text) tuple (i.e. "$L(a,%F)" ->
+        ('strL', [0, 'numF'], '$L(a,%F)')).
+
+    :param statement: text of the substitution statement.
+    '''
+    retval= list()
+    position= 0
+    for match in template_reference_pattern.finditer(statement):
+        prefix, letter, indexesText= match.groups()
+        name= ('str' if prefix=='$' else 'num')+letter
+        end= match.end()
+        indexes= list()
+        if(indexesText is not None):
+            indexes= parse_template_indexes(indexesText)
+            if(indexes is None): # not an index list, keep it as literal.
+                indexes= list()
+                end= match.start(3)-1
+        if(match.start()>position):
+            retval.append(statement[position:match.start()])
+        retval.append((name, indexes, statement[match.start():end]))
+        position= end
+    if(position<len(statement)):
+        retval.append(statement[position:])
+    return retval
+
 def parse_comma_separated_list(inputString, delimiter= ',', quotationMark= '"'):
     retval= list()
     item= str()
@@ -84,6 +170,90 @@ def parse_comma_separated_list(inputString, delimiter= ',', quotationMark= '"'):
     retval.append(item)
     return retval
 
+record_separator= '~'
+field_separator= '|'
+# Record types that are not used by pyCost.
+ignored_record_types= set(['V', 'K', 'L', 'A', 'G', 'E', 'X', 'R'])
+
+_comment_regex= re.compile(r'(?m)#.*\n')
+_multiple_newlines_regex= re.compile('\n\n+')
+_trailing_spaces_regex= re.compile(r'\s+\n')
+_leading_spaces_regex= re.compile(r'\n\s+')
+
+def split_records(inputStream, chunkSize= 4096):
+    ''' Generator that yields the raw FIEBDC-3 records (the text between
+        two consecutive '~' characters) read from the stream argument.
+
+    :param inputStream: input stream to read from.
+    :param chunkSize: number of characters read from the stream each time.
+    '''
+    buffer= ''
+    while True: # until EOF
+        chunk= inputStream.read(chunkSize)
+        if not chunk: # EOF
+            yield buffer
+            break
+        buffer+= chunk
+        parts= buffer.split(record_separator)
+        buffer= parts.pop() # last part can be incomplete.
+        for part in parts:
+            yield part
+
+def replace_newlines_inside_string(inputString, quotationMark= '"'):
+    ''' Replace the newline characters between double quotation marks
+        with blanks.
+
+    :param inputString: input string.
+    :param quotationMark: quotation mark character.
+    '''
+    parts= inputString.split(quotationMark)
+    for i in range(1, len(parts), 2): # odd parts are inside the quotes.
+        parts[i]= parts[i].replace('\n', ' ')
+    return quotationMark.join(parts)
+
+def normalize_record(rawRecord):
+    ''' Return the record argument in one line. In parametric records (~P)
+        the comments are removed and the newline characters between
+        statements are replaced by the parameter tokens separator.
+
+    :param rawRecord: text of the record (without the leading '~').
+    '''
+    retval= rawRecord.replace(chr(13),'')
+    if(retval[0]=='P'): # Parametric concept.
+        retval= _comment_regex.sub('\n', retval) # Remove comments.
+        retval= replace_newlines_inside_string(retval)
+        retval= _multiple_newlines_regex.sub('\n', retval) # Remove multiple \n
+        retval= _trailing_spaces_regex.sub('\n', retval) # Remove spaces
+        retval= _leading_spaces_regex.sub('\n', retval)
+        retval= retval.replace('\t',' ')
+        retval= retval.replace('=\n','= ')
+        retval= retval.replace('+\n','+ ')
+        retval= retval.replace(',\n',', ')
+        retval= retval.replace('.\n','. ')
+        retval= retval.replace('\n', parameter_tokens_separator) # replace newline characters.
+    else:
+        retval= retval.replace('\n','') # remove newline characters.
+    return retval
+
+def tokenize_records(inputStream, chunkSize= 4096):
+    ''' Generator that yields a (record_type, code, fields) tuple for each
+        record of the FIEBDC-3 stream argument. The stream is read only
+        once and nothing is written to disk.
+
+    :param inputStream: input stream to read from.
+    :param chunkSize: number of characters read from the stream each time.
+    '''
+    for rawRecord in split_records(inputStream, chunkSize):
+        if(len(rawRecord)>0):
+            record= normalize_record(rawRecord)
+            if(len(record)>2):
+                fields= record.split(field_separator)
+                recordType= fields.pop(0)
+                code= ''
+                if(len(fields)>0):
+                    code= fields.pop(0)
+                yield recordType, code, fields
+
 class regBC3(object):
     def decod_bc3(self, strtk):
         logging.error('decod_bc3 not implemented.')
@@ -255,41 +425,63 @@ class regBC3_d(regBC3_lista_reg):
 
 
 class MedArq(regBC3):
-    '''Mensuration lines.
-
-    :ivar lines: mensuration lines
+    '''Mensuration lines stored in columns (one list for each field).
+
+    :ivar tipo: type of each line.
+    :ivar comentario: comment of each line.
+    :ivar unidades: number of units of each line.
+    :ivar largo: length of each line.
+    :ivar ancho: width of each line.
+    :ivar alto: height of each line.
     '''
+    def __init__(self):
+        ''' Constructor.'''
+        self.clear()
+
+    def clear(self):
+        ''' Remove all the lines.'''
+        self.tipo= list()
+        self.comentario= list()
+        self.unidades= list()
+        self.largo= list()
+        self.ancho= list()
+        self.alto= list()
+
+    def __len__(self):
+        ''' Return the number of lines.'''
+        return len(self.tipo)
+
     def decod_bc3(self, strtk):
-        '''String decodification.'''
-        self.lines= list()
+        '''String decodification (walks the tokens in a single pass).'''
+        self.clear()
         tokens= strtk.split('\\')
-        while(len(tokens)>0):
+        numTokens= len(tokens)
+        for i in range(0, numTokens, 6):
             tipo= 0
             comentario= ''
             unidades= 0
             largo= 0
             ancho= 0
             alto= 0
-            if(len(tokens)>0):
-                tmp= tokens.pop(0)
-                if(len(tmp)>0):
-                    tipo= int(tmp)
-            if(len(tokens)>0):
-                comentario= tokens.pop(0)
-            if(len(tokens)>0):
-                tmp= tokens.pop(0)
+            tmp= tokens[i]
+            if(len(tmp)>0):
+                tipo= int(tmp)
+            if(i+1<numTokens):
+                comentario= tokens[i+1]
+            if(i+2<numTokens):
+                tmp= tokens[i+2]
                 if(len(tmp)>0):
                     unidades= float(tmp)
-            if(len(tokens)>0):
-                tmp= tokens.pop(0)
+            if(i+3<numTokens):
+                tmp= tokens[i+3]
                 if(len(tmp)>0):
                     largo= float(tmp)
-            if(len(tokens)>0):
-                tmp= tokens.pop(0)
+            if(i+4<numTokens):
+                tmp= tokens[i+4]
                 if(len(tmp)>0):
                     ancho= float(tmp)
-            if(len(tokens)>0):
-                tmp= tokens.pop(0)
+            if(i+5<numTokens):
+                tmp= tokens[i+5]
                 if(len(tmp)>0):
                     alto= float(tmp)
             # If any of the dimension is not null.
@@ -302,18 +494,30 @@ class MedArq(regBC3):
                     ancho= 1
                 if(alto==0):
                     alto= 1
-            lineData= {'tipo':tipo, 'comentario':comentario, 'unidades':unidades, 'largo':largo, 'ancho':ancho, 'alto':alto}
-            self.lines.append(lineData)
+            self.tipo.append(tipo)
+            self.comentario.append(comentario)
+            self.unidades.append(unidades)
+            self.largo.append(largo)
+            self.ancho.append(ancho)
+            self.alto.append(alto)
         return strtk
+
+    @property
+    def lines(self):
+        ''' Return the mensuration lines as a list of dictionaries.'''
+        retval= list()
+        for tipo, comentario, unidades, largo, ancho, alto in zip(self.tipo, self.comentario, self.unidades, self.largo, self.ancho, self.alto):
+            retval.append({'tipo':tipo, 'comentario':comentario, 'unidades':unidades, 'largo':largo, 'ancho':ancho, 'alto':alto})
+        return retval
     
     def Write(self, os= sys.stdout):
-        for l in self.lines:
-            os.write("Tipo: "+str(l['tipo'])+ '\n'
-               + "Commentary: " + l['comentario'] + '\n'
-               + "Units: " + str(l['unidades']) + '\n'
-               + "Lenght: " + str(l['largo']) + '\n'
-               + "Width: " + str(l['ancho']) + '\n'
-               + "Height: " + str(l['alto']) + '\n')
+        for i in range(0, len(self)):
+            os.write("Tipo: "+str(self.tipo[i])+ '\n'
+               + "Commentary: " + self.comentario[i] + '\n'
+               + "Units: " + str(self.unidades[i]) + '\n'
+               + "Lenght: " + str(self.largo[i]) + '\n'
+               + "Width: " + str(self.ancho[i]) + '\n'
+               + "Height: " + str(self.alto[i]) + '\n')
 
 
 class regBC3_linea_med(regBC3):
@@ -363,26 +567,31 @@ class regBC3_m(regBC3):
     '''FIEBDC-3 ~M record
 
     :ivar ruta: path Cap/subcap/subsubcap/.../posicion
-    :ivar med: (MedArq) mensuration
+    :ivar med_total: total measurement.
+    :ivar lista_med: (MedArq) mensuration lines.
+    :ivar etiqueta: label.
     '''
     def __init__(self, tokens):
-        # Remove empty element at end.
-        if(len(tokens[-1])==0):
-            tokens.pop(-1)
         self.ruta= regBC3_ruta()
-        if(len(tokens)>0):
-            self.ruta.decod_bc3(tokens.pop(0))
-        if(len(tokens)>0):
-            self.med_total= float(tokens.pop(0))
-        if(len(tokens)>0):
-            self.decod_str_bc3(tokens)
+        self.med_total= 0.0
+        self.lista_med= MedArq()
+        self.etiqueta= ''
+        self.decod_bc3(tokens)
 
     def decod_bc3(self, tokens):
-        '''Decodes tokens.'''
-        self.lista_med= MedArq()
-        while (len(tokens)>0):
-            tk= tokens.pop(0)
-            self.lista_med.decod_bc3(tk)
+        '''Decodes tokens (the tokens are not modified).'''
+        sz= len(tokens)
+        # Ignore empty element at end.
+        if((sz>0) and (len(tokens[-1])==0)):
+            sz-= 1
+        if(sz>0):
+            self.ruta.decod_bc3(tokens[0])
+        if(sz>1) and (len(tokens[1])>0):
+            self.med_total= float(tokens[1])
+        if(sz>2):
+            self.lista_med.decod_bc3(tokens[2])
+        if(sz>3):
+            self.etiqueta= tokens[3]
         return tokens
     
     def Write(self, os= sys.stdout):
@@ -488,16 +697,140 @@ class regBC3_t(regBC3):
         os.write("Texto: " + self.texto + '\n')
 
 class regBC3_p(regBC3):
-    '''Corresponds to a ~P record of the FIEBDC-3 specification.'''
+    '''Corresponds to a ~P record of the FIEBDC-3 specification.
+
+    :ivar compiledComponents: list of (code, compiled formula) tuples
+                              corresponding to the decomposition
+                              statements (computed by compileComponents).
+    :ivar evaluationGlobals: copy of the variables used as global namespace
+                             when evaluating the compiled formulas (so the
+                             variables dictionary is not modified by eval).
+    :ivar substitutionTemplates: substitution statements split in literal
+                                 strings and variable references (computed
+                                 by compileSubstitutionStatements).
+    '''
     def __init__(self,Str):
         self.variables= dict()
         self.components= dict()
         self.substitutionStatements= dict()
         self.parameterLabelStatements= dict()
         self.parameterLabelLetters= dict()
+        self.compiledComponents= None
+        self.evaluationGlobals= None
+        self.substitutionTemplates= None
         if(Str):
             self.decod_str_bc3(Str)
-            
+
+    def __getstate__(self):
+        ''' Return the object state for pickling (the code objects can't be
+            pickled, they are compiled again when needed).'''
+        retval= self.__dict__.copy()
+        retval['compiledComponents']= None
+        retval['evaluationGlobals']= None
+        return retval
+
+    def compileComponents(self):
+        ''' Translate the formulas of the decomposition statements into
+            Python expressions and compile them.'''
+        self.compiledComponents= list()
+        for key in self.components:
+            for formula in self.components[key]:
+                expression= translate_parametric_formula(formula)
+                try:
+                    code= compile(expression, key, 'eval')
+                except SyntaxError as e:
+                    className= type(self).__name__
+                    methodName= sys._getframe(0).f_code.co_name
+                    logging.error(className+'.'+methodName+'; can\'t compile formula: \''+str(formula)+'\' of component: \''+str(key)+'\': '+str(e))
+                    continue
+                self.compiledComponents.append((key, code))
+        self.evaluationGlobals= dict(self.variables)
+        return self.compiledComponents
+
+    def getCompiledComponents(self):
+        ''' Return the compiled formulas of the decomposition statements
+            (compiling them if not already done).'''
+        if(self.compiledComponents is None):
+            self.compileComponents()
+        return self.compiledComponents
+
+    def evaluateComponents(self, selectedParameters):
+        ''' Evaluate the compiled formulas of the decomposition statements
+            and return a dictionary containing the non-zero values.
+
+        :param selectedParameters: dictionary containing the indexes
+                                   (numA, numB,...) and the options
+                                   (strA, strB,...) selected for the
+                                   parameters.
+        '''
+        retval= dict()
+        compiledComponents= self.getCompiledComponents()
+        for key, code in compiledComponents:
+            value= eval(code, self.evaluationGlobals, selectedParameters)
+            if(value!=0.0):
+                retval[key]= value
+        return retval
+
+    def compileSubstitutionStatements(self):
+        ''' Split the substitution statements in literal strings and
+            variable references.'''
+        self.substitutionTemplates= dict()
+        for key in self.substitutionStatements:
+            self.substitutionTemplates[key]= tokenize_substitution_statement(self.substitutionStatements[key])
+        return self.substitutionTemplates
+
+    def getReferenceValue(self, reference, selectedParameters):
+        ''' Return the text corresponding to a variable reference of a
+            substitution statement.
+
+        :param reference: (name, indexes, source text) tuple.
+        :param selectedParameters: dictionary containing the indexes
+                                   (numA, numB,...) and the options
+                                   (strA, strB,...) selected for the
+                                   parameters.
+        '''
+        name, indexes, sourceText= reference
+        if((not indexes) and (name in selectedParameters)):
+            value= selectedParameters[name]
+        elif(name in self.variables):
+            value= self.variables[name]
+            try:
+                for index in indexes:
+                    if(isinstance(index, str)): # index of the selected option.
+                        index= selectedParameters[index]
+                    value= value[index]
+            except (KeyError, IndexError, TypeError) as e:
+                className= type(self).__name__
+                methodName= sys._getframe(0).f_code.co_name
+                logging.error(className+'.'+methodName+'; can\'t evaluate: \''+sourceText+'\': '+str(e))
+                value= sourceText
+        else:
+            value= sourceText # unknown variable.
+        return str(value)
+
+    def renderSubstitutionStatement(self, names, selectedParameters):
+        ''' Return the text of the substitution statement with the values
+            corresponding to the selected parameters.
+
+        :param names: names of the substitution statement (i. e.:
+                      ['RESUMEN, SUMMARY]).
+        :param selectedParameters: dictionary containing the indexes
+                                   (numA, numB,...) and the options
+                                   (strA, strB,...) selected for the
+                                   parameters.
+        '''
+        if(self.substitutionTemplates is None):
+            self.compileSubstitutionStatements()
+        template= None
+        for name in names:
+            if(name in self.substitutionTemplates):
+                template= self.substitutionTemplates[name]
+                break
+        retval= ''
+        if(template):
+            retval= ''.join([token if isinstance(token, str) else self.getReferenceValue(token, selectedParameters) for token in template])
+        return retval
+
     def getDict(self):
         ''' Return the member values in a dictionary.'''
         retval= dict()
@@ -519,6 +852,8 @@ class regBC3_p(regBC3):
         self.substitutionStatements= dct['substitutionStatements']
         self.parameterLabelStatements= dct['parameterLabelStatements']
         self.parameterLabelLetters= dct['parameterLabelLetters']
+        self.compileComponents()
+        self.compileSubstitutionStatements()
 
 
     @staticmethod
@@ -786,6 +1121,8 @@ class regBC3_p(regBC3):
                         # print(innerTokens)
                         logging.error(className+'.'+methodName+errorMsg)
                         # exit(1)
+        self.compileComponents()
+        self.compileSubstitutionStatements()
         return tokens
 
     def writeParameterLabelStatements(self, os= sys.stdout):
@@ -921,34 +1258,43 @@ class regBC3_parametric(regBC3_elemento):
         super().setFromDict(dct)
         self.parameters.setFromDict(dct['parameters'])
 
-    def getParameterIndex(self, parameterKey:str, parameterOption:str):
+    def getParameterIndex(self, parameterKey:str, parameterOption:str, optionIndexes= None):
         ''' Return the index of the parameterOption in the list of values
             corresponding to the parameter key.
 
         :param parameterKey: identifier of the parameter.
         :param parameterOption: identifier of the option chosen for the 
                                 parameter.
+        :param optionIndexes: dictionary containing, for each parameter, a
+                              dictionary with the index of each of its
+                              options (if None the index is searched in the
+                              list of options).
         '''
-        retval= None
-        options= self.getParameterOptions(parameterKey)
-        if(parameterOption in options):
-            retval= options.index(parameterOption)
+        if(optionIndexes is None):
+            retval= None
+            options= self.getParameterOptions(parameterKey)
+            if(parameterOption in options):
+                retval= options.index(parameterOption)
         else:
+            retval= optionIndexes[parameterKey].get(parameterOption, None)
+        if(retval is None):
             logging.error('parameter: \''+parameterKey+'\' has not option: \''+parameterOption+'\'\n')
         return retval
 
-    def computeSelectedParameters(self, options):
+    def computeSelectedParameters(self, options, optionIndexes= None):
         ''' Return the indexes corresponding to the options argument.
 
         :param options: list of (parameterKey, parameterOption) tuples assigning
                        values to the parameters.
+        :param optionIndexes: dictionary containing the index of the options
+                              of each parameter (see getParameterIndex).
         '''
         selectedParameters= dict()
         for v in options:
             parameterKey= v[0] # identifier of the parameter.
             parameterOption= v[1] # option chose for this parameter.
             letter= self.parameters.parameterLabelLetters[parameterKey]
-            index= self.getParameterIndex(parameterKey, parameterOption)
+            index= self.getParameterIndex(parameterKey, parameterOption, optionIndexes)
             # store selected parameters in dictionary
             numKey= 'num'+letter
             selectedParameters[numKey]= index
@@ -962,97 +1308,27 @@ class regBC3_parametric(regBC3_elemento):
         :param options: list of (parameterKey, parameterOption) tuples assigning
                        values to the parameters.
         '''
-        retval= dict()
         selectedParameters= self.computeSelectedParameters(options)
-        pattern= re.compile(r"\((\d+),(\d+)\)")
-        for key in self.parameters.components:
-            cList= self.parameters.components[key]
-            for c in cList:
-                c=re.sub(r'([a-z])',repl_lowcase_letter,c)
-                c= c.replace('=', '==')
-                c= c.replace('%', 'num')
-                c= c.replace('$', 'str')
-                c=c.replace('<>','!=')
-                c=c.replace('@', ' or ')
-                for i in range(0, len(selectedParameters)):
-                    charToReplace= chr(ord('a')+i)
-                    c= c.replace(charToReplace, str(i))
-                for spKey in selectedParameters:
-                    c= c.replace('('+spKey+')', '['+spKey+']')
-                    value= selectedParameters[spKey]
-                    c= c.replace(spKey, str(value))
-                for varKey in self.parameters.variables:
-                    value= self.parameters.variables[varKey]
-                # Replace matrix indexes
-                c= pattern.sub(r'[\1][\2]',c)
-                c=c.replace('&','and')
-                value= eval(c, self.parameters.variables)
-                if(value!=0.0):
-                    retval[key]= value
-        return retval
+        return self.parameters.evaluateComponents(selectedParameters)
 
     def getSubstitutionStatementValue(self, options, substitutionStatementNames):
-        ''' Return the summary field.
+        ''' Return the value of the substitution statement.
 
         :param options: list of (parameterKey, parameterOption) tuples assigning
                        values to the parameters.
         :param substitutionStatementNames: names of the substitution statement
                                            (i. e.: ['RESUMEN, SUMMARY]).
         '''
-        substitutionStatements= self.parameters.substitutionStatements
-        retval= ''
-        for name in substitutionStatementNames:
-            if(name in substitutionStatements):
-                retval= substitutionStatements[name]
-                break
-        retval= retval.replace('%', 'num')
-        retval= retval.replace('$', 'str')
-        retval= re.sub(r'(\()([a-z])(,)',repl_lowcase_letter_index,retval)
-        retval= re.sub(r'(,)([a-z])(\))',repl_lowcase_letter_index,retval)
-        retval= re.sub(r'str([A-Z])\(([a-zA-Z_0-9]*),([a-zA-Z_0-9]*)\)',r'str\1[\2][\3]',retval)
-        # Replace selected values.
         selectedParameters= self.computeSelectedParameters(options)
-        for spKey in selectedParameters:
-            retval= retval.replace('('+spKey+')', '['+spKey+']')
-            value= selectedParameters[spKey]
-            retval= retval.replace(spKey, str(value))
-        # Extract string replacement patterns (with brackets)
-        p = re.compile(r"str[A-Z]\[[0-9]+\](?!\[)")
-        replacements1= p.findall(retval)
-        p = re.compile(r'str[A-Z]\[[a-zA-Z_0-9]*\]\[[a-zA-Z_0-9]*\]')
-        replacements2=p.findall(retval)
-        replacements=replacements1+replacements2
-        for r in replacements:
-            value= eval(r, self.parameters.variables)
-            retval= retval.replace(r, value)
-        # Extract number replacement patterns (with brackets)
-        p = re.compile("(num[A-Z]\[[0-9]+\])")
-        replacements= p.findall(retval)
-        for r in replacements:
-            value= eval(r, self.parameters.variables)
-            retval= retval.replace(r, value)
-        # Extract string replacement patterns (without brackets)
-        p = re.compile(r'str[O-X]')
-        replacements3= p.findall(retval)
-        for r in replacements3:
-            value= eval(r, self.parameters.variables)
-            retval= retval.replace(r, value)
-        # Extract number replacement patterns (without brackets)
-        p = re.compile("(num[O-X]\[[0-9]+\])")
-        replacements4= p.findall(retval)
-        for r in replacements4:
-            value= eval(r, self.parameters.variables)
-            retval= retval.replace(r, value)
-            
-        return retval
-    
+        return self.parameters.renderSubstitutionStatement(substitutionStatementNames, selectedParameters)
+
     def getSummary(self, options):
         ''' Return the summary field.
 
         :param options: list of (parameterKey, parameterOption) tuples assigning
                         values to the parameters.
         '''
-        return self.getSubstitutionStatementValue(options, ['RESUMEN', 'SUMMARY', 'R'])
+        return self.getSubstitutionStatementValue(options, summary_statement_names)
     
     def getText(self, options):
         ''' Return the text field.
@@ -1060,20 +1336,28 @@ class regBC3_parametric(regBC3_elemento):
         :param options: list of (parameterKey, parameterOption) tuples assigning
                         values to the parameters.
         '''
-        return self.getSubstitutionStatementValue(options, ['TEXTO', 'TEXT', 'T'])
-    def getCodeTail(self, options):
-        ''' Return the tail for the code of the instantiated concept.
+        return self.getSubstitutionStatementValue(options, text_statement_names)
+    def getCodeTail(self, options, optionIndexes= None):
+        ''' Return the tail for the code of the instantiated concept (the
+            letters of the chosen options: 'a' for the first option of the
+            parameter, 'b' for the second one,... in the order of the
+            parameters: A, B, C,...).
 
         :param options: list of (parameterKey, parameterOption) tuples assigning
                         values to the parameters.
+        :param optionIndexes: dictionary containing the index of the options
+                              of each parameter (see getParameterIndex).
         '''
-        retval= ''
+        optionLetters= list()
         for v in options:
             parameterKey= v[0] # identifier of the parameter.
             parameterOption= v[1] # option chose for this parameter.
             letter= self.parameters.parameterLabelLetters[parameterKey]
-            retval+= letter.lower()
-        return retval
+            index= self.getParameterIndex(parameterKey, parameterOption, optionIndexes)
+            if(index is not None):
+                optionLetters.append((letter, chr(ord('a')+index)))
+        optionLetters.sort()
+        return ''.join(optionLetter for (letter, optionLetter) in optionLetters)
 
     def writeParameterOptions(self, os= sys.stdout):
         ''' Write the parameters and their options.'''
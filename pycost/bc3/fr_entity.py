@@ -9,6 +9,7 @@ __email__= "l.pereztato@ciccp.es"
 
 import sys
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from pycost.utils import EntPyCost as epc
 from decimal import Decimal
 
@@ -64,13 +65,22 @@ class EntFR(epc.EntPyCost):
     def getRoundedPercentage(self):
         return Decimal(self.getPercentageString())
 
+    def getScaledRoundedProduct(self):
+        ''' Return the rounded product in thousandths (integer, see
+            getRoundedProduct).'''
+        return fixed_point.round_scaled(self.getProduct(), fixed_point.productScale)
+
     def WriteSpre(self, os):
         os.write(self.getProductString() + '|')
 
-    def WriteBC3(self, os):
+    def getBC3String(self):
+        ''' Return the factor and production rate in FIEBDC-3 format.'''
         txtFactor=  self.formatString.format(self.factor)
         txtRate=  self.formatString.format(self.productionRate)
-        os.write(txtFactor + '\\' + txtRate + '\\')
+        return txtFactor + '\\' + txtRate + '\\'
+
+    def WriteBC3(self, os):
+        os.write(self.getBC3String())
 
     def Write(self, os= sys.stdout):
         txtFactor=  self.formatString.format(self.factor)
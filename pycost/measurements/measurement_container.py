@@ -18,12 +18,122 @@ from pycost.utils import pylatex_utils
 from pycost.utils import basic_types
 
 class ChapterQuantities(list, epc.EntPyCost):
-    ''' Quantities inside a chapter. '''
+    ''' Quantities inside a chapter.
+
+    :ivar unitPriceIndex: unit price quantities of this container indexed
+                          by the code of their unit price (built on demand
+                          by getUnitPriceIndex and updated when the
+                          container changes).
+    :ivar revision: counter incremented each time the quantities of this
+                    container change (see budget_totals.BudgetTotals).
+    '''
+    unitPriceIndex= None
+    revision= 0
     
     def __init__(self):
         super(ChapterQuantities, self).__init__()
         epc.EntPyCost.__init__(self, owner= None)
 
+    def __getstate__(self):
+        ''' Return the object state for pickling (without the index, it's
+            rebuilt on demand).'''
+        retval= self.__dict__.copy()
+        retval.pop('unitPriceIndex', None)
+        return retval
+
+    def getUnitPriceIndex(self):
+        ''' Return the unit price quantities of this container indexed by
+            the code of their unit price.'''
+        if(self.unitPriceIndex is None):
+            self.unitPriceIndex= dict()
+            for upq in self:
+                self.unitPriceIndex.setdefault(upq.getUnitPriceCode(), list()).append(upq)
+        return self.unitPriceIndex
+
+    def indexQuantities(self, upq):
+        ''' Append the argument to the unit price index (if already built).
+
+        :param upq: unit price quantities appended to the container.
+        '''
+        self.revision+= 1
+        if(self.unitPriceIndex is not None):
+            self.unitPriceIndex.setdefault(upq.getUnitPriceCode(), list()).append(upq)
+
+    def unindexQuantities(self, upq):
+        ''' Remove the argument from the unit price index (if already built).
+
+        :param upq: unit price quantities removed from the container.
+        '''
+        self.revision+= 1
+        if(self.unitPriceIndex is not None):
+            unitPriceCode= upq.getUnitPriceCode()
+            items= [item for item in self.unitPriceIndex.get(unitPriceCode, list()) if item is not upq]
+            if(items):
+                self.unitPriceIndex[unitPriceCode]= items
+            else:
+                self.unitPriceIndex.pop(unitPriceCode, None)
+
+    def append(self, upq):
+        ''' Append the unit price quantities to the container.
+
+        :param upq: unit price quantities to append.
+        '''
+        super(ChapterQuantities, self).append(upq)
+        self.indexQuantities(upq)
+
+    def extend(self, quantities):
+        ''' Append the unit price quantities to the container.
+
+        :param quantities: unit price quantities to append.
+        '''
+        for upq in quantities:
+            self.append(upq)
+
+    def insert(self, index, upq):
+        ''' Insert the unit price quantities before the index.
+
+        :param index: position of the new item.
+        :param upq: unit price quantities to insert.
+        '''
+        super(ChapterQuantities, self).insert(index, upq)
+        self.revision+= 1
+        self.unitPriceIndex= None # order changed, rebuilt on demand.
+
+    def remove(self, upq):
+        ''' Remove the unit price quantities from the container.
+
+        :param upq: unit price quantities to remove.
+        '''
+        super(ChapterQuantities, self).remove(upq)
+        self.unindexQuantities(upq)
+
+    def pop(self, index= -1):
+        ''' Remove and return the unit price quantities at the index.
+
+        :param index: position of the item to remove.
+        '''
+        retval= super(ChapterQuantities, self).pop(index)
+        self.unindexQuantities(retval)
+        return retval
+
+    def clear(self):
+        ''' Remove all the unit price quantities.'''
+        super(ChapterQuantities, self).clear()
+        self.revision+= 1
+        self.unitPriceIndex= None
+
+    def __setitem__(self, index, value):
+        ''' Replace the item(s) at the index.'''
+        super(ChapterQuantities, self).__setitem__(index, value)
+        self.revision+= 1
+        self.unitPriceIndex= None
+
+    def __delitem__(self, index):
+        ''' Remove the item(s) at the index.'''
+        super(ChapterQuantities, self).__delitem__(index)
+        self.revision+= 1
+        self.unitPriceIndex= None
+
     def appendToExistingCode(self, unitPriceQuantities):
         ''' Tries to append the argument to an existing code on
         this container. In it doesn't exists it creates a new
@@ -31,15 +141,12 @@ class ChapterQuantities(list, epc.EntPyCost):
         
         :param unitPriceQuantities: quantities to append.
         '''
-        unitPriceCode= unitPriceQuantities.getUnitPriceCode()
-        codeFound= False
-        for upq in self: # search for the code in this container.
-            uPCode= upq.getUnitPriceCode()
-            if(uPCode==unitPriceCode): # code found.
-                upq.quantities.extend(unitPriceQuantities.quantities)
-                codeFound= True
-        if(not codeFound):
-            super(ChapterQuantities, self).append(unitPriceQuantities)
+        existing= self.getConceptsThatDependOn(unitPriceQuantities.getUnitPriceCode())
+        for upq in existing: # code found.
+            upq.quantities.extend(unitPriceQuantities.quantities)
+            self.revision+= 1
+        if(not existing):
+            self.append(unitPriceQuantities)
 
     def getQuantitiesForPrice(self, unitPriceCode):
         ''' Return the quantities corresponding to the price with the
@@ -49,12 +156,9 @@ class ChapterQuantities(list, epc.EntPyCost):
                               retrieved.
         '''
         retval= None
-        codeFound= False
-        for upq in self: # search for the code in this container.
-            uPCode= upq.getUnitPriceCode()
-            if(uPCode == unitPriceCode): # code found.
-                retval= upq
-                break
+        items= self.getUnitPriceIndex().get(unitPriceCode)
+        if(items):
+            retval= items[0]
         return retval
  
     def removeConcept(self, conceptToRemoveCode):
@@ -63,8 +167,11 @@ class ChapterQuantities(list, epc.EntPyCost):
         :param conceptToRemoveCode: code of the concept to remove.
         '''
         itemsToRemove= self.getConceptsThatDependOn(conceptToRemoveCode)
-        for item in itemsToRemove:
-            self.remove(item)
+        if(itemsToRemove):
+            toRemove= set(id(item) for item in itemsToRemove)
+            super(ChapterQuantities, self).__setitem__(slice(None), [upq for upq in self if id(upq) not in toRemove])
+            self.revision+= 1
+            self.unitPriceIndex.pop(conceptToRemoveCode, None)
 
     def getConceptsThatDependOn(self, priceCode):
         ''' Return the prices measurements which depend on the one whose code
@@ -72,12 +179,7 @@ class ChapterQuantities(list, epc.EntPyCost):
 
         :param priceCode: code of the price on which the returned prices depend.
         '''
-        retval= list()
-        for upq in self: # search for the code in this container.
-            uPCode= upq.getUnitPriceCode()
-            if(uPCode==priceCode): # code found.
-                retval.append(upCode)
-        return retval
+        return list(self.getUnitPriceIndex().get(priceCode, list()))
            
     def getLtxPriceString(self):
         ''' Return the price in as a string in human readable format.'''
@@ -95,6 +197,14 @@ class ChapterQuantities(list, epc.EntPyCost):
             t+= item.getRoundedPrice()
         return t
 
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price in hundredths computed with integer
+            arithmetic (see getRoundedPrice).'''
+        t= 0
+        for item in self:
+            t+= item.getScaledRoundedPrice()
+        return t
+
     def Write(self, os, cod, pos):
         contador= 1
         for i in self:
@@ -107,11 +217,10 @@ class ChapterQuantities(list, epc.EntPyCost):
             return
         else:
             os.write("~D" + '|' #Antes estaba con ~Y (daba problemas)
-             + cod + '|')
-            for i in self:
-                os.write((i).getUnitPriceCode() + "\\1\\" #factor 1
-                   + str((i).getRoundedTotal()) + '\\')
-            os.write('|' + '\n')
+             + cod + '|'
+             + ''.join((i).getUnitPriceCode() + "\\1\\" #factor 1
+                       + str((i).getRoundedTotal()) + '\\' for i in self)
+             + '|' + '\n')
 
     def ImprCompLtxMed(self, doc, other):
         ''' Write a LaTeX report containing a comparison of the measurements.
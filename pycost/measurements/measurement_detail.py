@@ -61,12 +61,21 @@ class Quantities(list, epy.EntPyCost):
             t+=(i).getRoundedTotal()
         return t
 
+    def getScaledRoundedTotal(self):
+        ''' Return the rounded total in thousandths computed with integer
+            arithmetic (see getRoundedTotal).'''
+        t= 0
+        for i in self:
+            t+= i.getScaledRoundedTotal()
+        return t
+
     def readBC3(self, m):
-        ''' Read quantities list.'''
-        for l in m:
-            rm= measurement_record.MeasurementRecord()
-            rm.readBC3(l)
-            self.append(rm)
+        ''' Read quantities list.
+
+        :param m: mensuration lines in columns (fiebdc3.MedArq object).
+        '''
+        for c, uds, l, an, al in zip(m.comentario, m.unidades, m.largo, m.ancho, m.alto):
+            self.append(measurement_record.MeasurementRecord(c= c, uds= uds, l= l, an= an, al= al))
 
     def WriteBC3(self, os):
         for i in self:
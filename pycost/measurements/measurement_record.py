@@ -11,6 +11,7 @@ import pylatex
 import decimal
 from pycost.prices import unit_price
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from pycost.utils import EntPyCost as epc
 from pycost.utils import pylatex_utils
 
@@ -132,6 +133,23 @@ class MeasurementRecord(epc.EntPyCost):
             retval= tmp.quantize(self.places, rounding=decimal.ROUND_HALF_UP)
         return retval
 
+    def getScaledRoundedTotal(self):
+        ''' Return the rounded total in thousandths computed with integer
+            arithmetic; same value as getRoundedTotal()*1000.'''
+        retval= 0
+        if(not self.isNull()):
+            scale= fixed_point.quantityScale
+            product= scale
+            denominator= 1
+            for dim in [self.unidades, self.largo, self.ancho, self.alto]:
+                if(dim):
+                    scaledDim= fixed_point.round_scaled(dim, scale)
+                    if(scaledDim): # the rounded dimension is not zero.
+                        product*= scaledDim
+                        denominator*= scale
+            retval= fixed_point.div_half_up(product, denominator)
+        return retval
+
     def readBC3(self, m):
         ''' Read measurement.'''
         self.comentario= m['comentario']
@@ -50,17 +50,12 @@ class QuantitiesReport(dict):
         for price in self:
             quantity= self[price]
             if(price.isCompound()): # compound price.
-                parentPrices= [price.Codigo()]
-                elementaryComponents= price.getElementaryComponents(parentPrices= parentPrices)
-                for code in elementaryComponents:
-                    ec= elementaryComponents[code]
-                    c_code= ec.CodigoEntidad()
-                    c_quantity= ec.getProduct()*quantity
+                for (c_code, coefficient) in price.getElementaryFactors():
+                    c_quantity= coefficient*quantity
                     if(c_code in retval):
                         retval[c_code]+= c_quantity
                     else:
                         retval[c_code]= c_quantity
-                parentPrices.pop()
             else: # elementary price.
                 code= price.Codigo()
                 if(code in retval):
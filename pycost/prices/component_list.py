@@ -15,14 +15,102 @@ from pycost.prices.price_justification import PriceJustificationRecordContainer
 from pycost.bc3 import bc3_component
 from pycost.bc3 import fr_entity
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 
 class ComponentList(list, epc.EntPyCost):
-    '''Componentes de un precio descompuesto.'''
-    
+    '''Componentes de un precio descompuesto.
+
+    :ivar parentPrice: price whose components are in this list (its cached
+                       price is invalidated when the list changes).
+    '''
+    parentPrice= None
+
     def __init__(self):
         super(ComponentList,self).__init__()
         epc.EntPyCost.__init__(self)
 
+    def invalidatePrice(self):
+        ''' Discard the cached price of the parent price.'''
+        if(self.parentPrice is not None):
+            self.parentPrice.invalidatePrice()
+
+    def append(self, component):
+        ''' Append the component to the list.
+
+        :param component: component to append.
+        '''
+        component.parentList= self
+        super(ComponentList,self).append(component)
+        self.invalidatePrice()
+
+    def extend(self, components):
+        ''' Append the components to the list.
+
+        :param components: components to append.
+        '''
+        for component in components:
+            self.append(component)
+
+    def insert(self, index, component):
+        ''' Insert the component before the index.
+
+        :param index: position of the new component.
+        :param component: component to insert.
+        '''
+        component.parentList= self
+        super(ComponentList,self).insert(index, component)
+        self.invalidatePrice()
+
+    def remove(self, component):
+        ''' Remove the component from the list.
+
+        :param component: component to remove.
+        '''
+        super(ComponentList,self).remove(component)
+        component.parentList= None
+        self.invalidatePrice()
+
+    def pop(self, index= -1):
+        ''' Remove and return the component at the index.
+
+        :param index: position of the component to remove.
+        '''
+        retval= super(ComponentList,self).pop(index)
+        retval.parentList= None
+        self.invalidatePrice()
+        return retval
+
+    def clear(self):
+        ''' Remove all the components.'''
+        for component in self:
+            component.parentList= None
+        super(ComponentList,self).clear()
+        self.invalidatePrice()
+
+    def __setitem__(self, index, value):
+        ''' Replace the component(s) at the index.'''
+        if(isinstance(index, slice)):
+            for component in self[index]:
+                component.parentList= None
+            value= list(value)
+            for component in value:
+                component.parentList= self
+        else:
+            self[index].parentList= None
+            value.parentList= self
+        super(ComponentList,self).__setitem__(index, value)
+        self.invalidatePrice()
+
+    def __delitem__(self, index):
+        ''' Remove the component(s) at the index.'''
+        if(isinstance(index, slice)):
+            for component in self[index]:
+                component.parentList= None
+        else:
+            self[index].parentList= None
+        super(ComponentList,self).__delitem__(index)
+        self.invalidatePrice()
+
     def getCopy(self):
         ''' Return a copy of the component list.'''
         retval= ComponentList()
@@ -94,6 +182,31 @@ class ComponentList(list, epc.EntPyCost):
                 parentPrices.pop()
         return retval
                 
+    def getElementaryDecomposition(self):
+        ''' Return the elementary prices of this collection (expanding the
+            compound ones) in a dictionary whose keys are the paths (tuples
+            of codes) to the elementary prices and whose values are
+            (elementary price, production rate, factor, repetitions) tuples;
+            the coefficient of the elementary price is
+            productionRate*factor**repetitions (see
+            getElementaryComponentFactors and getElementaryComponents).
+            The decompositions of the compound prices are taken from their
+            caches (see UnitPrice.getElementaryDecomposition).'''
+        retval= dict()
+        for c in self:
+            code= c.CodigoEntidad()
+            if(c.ent.isCompound()): # compount price.
+                product= c.getProduct()
+                for path, (ent, productionRate, factor, repetitions) in c.ent.getElementaryDecomposition().items():
+                    retval[(code,)+path]= (ent, productionRate, product*factor, repetitions)
+            else: # elementary price.
+                key= (code,)
+                repetitions= 1
+                if(key in retval): # repeated.
+                    repetitions+= retval[key][3]
+                retval[key]= (c.ent, c.getProductionRate(), 1.0, repetitions)
+        return retval
+
     def getElementaryComponents(self, parentPrices, parentFactor= 1.0):
         ''' Return the elementary components of this collection (if any
             component is composed append its decomposition to the returned
@@ -137,10 +250,9 @@ class ComponentList(list, epc.EntPyCost):
 
     def WriteBC3(self, cod, os):
         if(len(self)):
-            os.write("~D" + '|' + cod + '|')
-            for i in self:
-                i.WriteBC3(os)
-            os.write('|' + '\n')
+            os.write("~D" + '|' + cod + '|'
+                     + ''.join(i.getBC3String() for i in self)
+                     + '|' + '\n')
 
     def Write(self, os= sys.stdout):
         os.write('components: ')
@@ -152,6 +264,26 @@ class ComponentList(list, epc.EntPyCost):
         lista= self.getPriceJustificationList(True) # XXX Here cumulated percentages.
         return basic_types.ppl_price(float(lista.getRoundedTotal()))
 
+    def getScaledJustificationItems(self):
+        ''' Return the (type, isPercentage, price, productionRate) tuples
+            of the components, with the rounded price in hundredths and the
+            rounded production rate in thousandths (see
+            fixed_point.get_justification_total).'''
+        retval= list()
+        for i in self:
+            isPercentage= i.isPercentage()
+            if(isPercentage):
+                price= 0
+            else:
+                price= fixed_point.rescale(i.ent.getScaledRoundedPrice(), 10**i.ent.precision, fixed_point.priceScale)
+            retval.append((i.getType(), isPercentage, price, i.getScaledRoundedProduct()))
+        return retval
+
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price in hundredths computed with integer
+            arithmetic; same value as getRoundedPrice()*100.'''
+        return fixed_point.get_justification_rounded_total(self.getScaledJustificationItems(), True) # XXX Here cumulated percentages.
+
 
     #not  @brief Suma de los precios de un tipo (mdo, maq, mat,...)
     def PrecioPorTipo(self, tipo):
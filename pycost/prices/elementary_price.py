@@ -33,6 +33,45 @@ class ElementaryPrice(ms.Measurable):
         self.precio= p
         self.tipo= tp
 
+    def __setstate__(self, state):
+        ''' Restore the object state.
+
+        :param state: state returned by __getstate__.
+        '''
+        for name in ['precio', 'tipo']: # pickled before being properties.
+            if(name in state):
+                state['_'+name]= state.pop(name)
+        super(ElementaryPrice,self).__setstate__(state)
+
+    @property
+    def precio(self):
+        ''' Return the price.'''
+        return self._precio
+
+    @precio.setter
+    def precio(self, value):
+        ''' Set the price and invalidate the cached prices that depend on it.
+
+        :param value: new price.
+        '''
+        self._precio= value
+        self.invalidatePrice()
+
+    @property
+    def tipo(self):
+        ''' Return the type of the concept.'''
+        return self._tipo
+
+    @tipo.setter
+    def tipo(self, value):
+        ''' Set the type of the concept (the rounding of the prices that
+            depend on this one is made by type).
+
+        :param value: new type.
+        '''
+        self._tipo= value
+        self.invalidatePrice()
+
     def check_tipo(self):
         if(len(self.Codigo())>0):
             if tipo==sin_clasif and not isPercentage():
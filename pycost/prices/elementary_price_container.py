@@ -60,6 +60,9 @@ class ElementaryPrices(concept_dict.ConceptDict):
         '''
         if(conceptToRemoveCode in self.concepts):
             self.concepts.pop(conceptToRemoveCode)
+            concept_dict.ConceptDict.revision+= 1
+            if(self.conceptIndex is not None):
+                self.conceptIndex.unregister(self, conceptToRemoveCode)
 
     def writeSpreadsheet(self, sheet):
         logging.error("ElementaryPrices.writeSpreadsheet not implemented." + '\n')
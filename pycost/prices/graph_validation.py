@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+''' Validation of the graph formed by the concepts and the components of
+    their decompositions (cycles and references to unknown concepts).'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import sys
+import logging
+from pycost.prices import price_evaluation
+
+class GraphDiagnostics(object):
+    ''' Problems found in the component graph of a set of concepts.
+
+    :ivar numConcepts: number of concepts checked (the ones in the
+                       decompositions included).
+    :ivar numComponents: number of components checked.
+    :ivar cycles: lists with the codes of the concepts of each cycle
+                  (strongly connected component) found in the
+                  decompositions.
+    :ivar danglingReferences: (concept code, component code) tuples of the
+                              components that refer to concepts that don't
+                              exist.
+    :ivar unregisteredReferences: (concept code, component code) tuples of
+                                  the components that refer to concepts
+                                  that are not in the checked set (i.e.
+                                  removed from the price tables).
+    '''
+    def __init__(self):
+        ''' Constructor.'''
+        self.numConcepts= 0
+        self.numComponents= 0
+        self.cycles= list()
+        self.danglingReferences= list()
+        self.unregisteredReferences= list()
+
+    def isValid(self):
+        ''' Return true if no problems have been found.'''
+        return not (self.cycles or self.danglingReferences or self.unregisteredReferences)
+
+    def getMessages(self):
+        ''' Return a list of strings describing the problems found.'''
+        retval= list()
+        for cycle in self.cycles:
+            retval.append('cycle in the price decompositions: '+' -> '.join(cycle+cycle[:1]))
+        for (code, componentCode) in self.danglingReferences:
+            retval.append("concept: '"+str(code)+"' refers to the concept: '"+str(componentCode)+"' that doesn't exist.")
+        for (code, componentCode) in self.unregisteredReferences:
+            retval.append("concept: '"+str(code)+"' refers to the concept: '"+str(componentCode)+"' that is not in the price tables.")
+        return retval
+
+    def logMessages(self):
+        ''' Write the problems found in the log.'''
+        className= type(self).__name__
+        methodName= sys._getframe(0).f_code.co_name
+        for msg in self.getMessages():
+            logging.error(className+'.'+methodName+'; '+msg)
+
+    def getDict(self):
+        ''' Return a dictionary containing the object data.'''
+        retval= dict()
+        retval['num_concepts']= self.numConcepts
+        retval['num_components']= self.numComponents
+        retval['cycles']= [list(cycle) for cycle in self.cycles]
+        retval['dangling_references']= [list(ref) for ref in self.danglingReferences]
+        retval['unregistered_references']= [list(ref) for ref in self.unregisteredReferences]
+        return retval
+
+def get_strongly_connected_components(concepts):
+    ''' Return the strongly connected components of the graph formed by the
+        concepts argument and the concepts of their decompositions (Tarjan's
+        algorithm, iterative version so deep decompositions don't exhaust
+        the stack).
+
+    :param concepts: concepts of the graph.
+    '''
+    retval= list()
+    index= dict()
+    lowLink= dict()
+    stack= list()
+    onStack= set()
+    for root in concepts:
+        if(id(root) in index):
+            continue
+        index[id(root)]= lowLink[id(root)]= len(index)
+        stack.append(root)
+        onStack.add(id(root))
+        work= [(root, iter(price_evaluation.get_dependencies(root)))]
+        while(work):
+            concept, dependencies= work[-1]
+            key= id(concept)
+            newConcept= None
+            for dep in dependencies:
+                if(id(dep) not in index): # not visited yet.
+                    newConcept= dep
+                    break
+                elif(id(dep) in onStack):
+                    lowLink[key]= min(lowLink[key], index[id(dep)])
+            if(newConcept is not None):
+                index[id(newConcept)]= lowLink[id(newConcept)]= len(index)
+                stack.append(newConcept)
+                onStack.add(id(newConcept))
+                work.append((newConcept, iter(price_evaluation.get_dependencies(newConcept))))
+                continue
+            work.pop()
+            if(work):
+                parentKey= id(work[-1][0])
+                lowLink[parentKey]= min(lowLink[parentKey], lowLink[key])
+            if(lowLink[key]==index[key]): # root of a component.
+                component= list()
+                while(True):
+                    c= stack.pop()
+                    onStack.discard(id(c))
+                    component.append(c)
+                    if(c is concept):
+                        break
+                retval.append(component)
+    return retval
+
+def validate_component_graph(concepts):
+    ''' Check the graph formed by the concepts argument and the components
+        of their decompositions and return the problems found (cycles and
+        references to unknown concepts) in a GraphDiagnostics object.
+
+    :param concepts: concepts to check (i.e. all the concepts of the price
+                     tables of a project).
+    '''
+    retval= GraphDiagnostics()
+    registered= set(id(concept) for concept in concepts)
+    stronglyConnectedComponents= get_strongly_connected_components(concepts)
+    for scc in stronglyConnectedComponents:
+        for concept in scc:
+            retval.numConcepts+= 1
+            code= concept.Codigo()
+            components= getattr(concept, 'components', None)
+            if(components):
+                for component in components:
+                    retval.numComponents+= 1
+                    ent= component.ent
+                    if(not hasattr(ent, 'getRoundedPrice')): # pending link.
+                        retval.danglingReferences.append((code, str(ent)))
+                    elif(id(ent) not in registered):
+                        retval.unregisteredReferences.append((code, ent.Codigo()))
+            missingComponents= getattr(concept, 'missingComponents', None) # not found when reading.
+            if(missingComponents):
+                for componentCode in missingComponents:
+                    retval.danglingReferences.append((code, componentCode))
+        if((len(scc)>1) or any((dep is scc[0]) for dep in price_evaluation.get_dependencies(scc[0]))):
+            retval.cycles.append([concept.Codigo() for concept in reversed(scc)])
+    return retval
@@ -8,15 +8,31 @@ __version__= "3.0"
 __email__= "l.pereztato@ciccp.es"
 
 
+import sys
 import logging
+import itertools
+import collections
 from pycost.bc3 import fiebdc3
 from pycost.prices import unit_price
 from pycost.bc3 import fr_entity
 from pycost.bc3 import bc3_component
 
 class Parametric(fiebdc3.regBC3_parametric):
-    ''' Parametric concept as defined in the FIEBDC-3 specification.'''
-    
+    ''' Parametric concept as defined in the FIEBDC-3 specification.
+
+    :ivar instanceCache: LRU cache of the unit costs returned by
+                         getUnitPrice indexed by (code, frozenset(options)).
+    :ivar instanceCacheHits: number of calls to getUnitPrice answered
+                             from the cache.
+    :ivar instanceCacheMisses: number of calls to getUnitPrice that
+                               instantiated a new unit cost.
+    :ivar instanceCacheInvalidations: number of cached unit costs
+                                      discarded because the concepts
+                                      used as components have been
+                                      replaced or removed.
+    '''
+    instanceCacheSize= 128 # maximum number of cached unit costs.
+
     def __init__(self,c= None,t= None,p= None):
         ''' Constructor.
 
@@ -25,40 +41,223 @@ class Parametric(fiebdc3.regBC3_parametric):
         :param p: parameters.
         '''
         super(Parametric, self).__init__(c,t,p)
+        self.clearInstanceCache()
+
+    def __getstate__(self):
+        ''' Return the object state for pickling (without the cached unit
+            costs).'''
+        retval= self.__dict__.copy()
+        retval['instanceCache']= collections.OrderedDict()
+        return retval
+
+    def setFromDict(self, dct):
+        ''' Set the objects members from the values in the argument
+        dictionary.
+
+        :param dct: input dictionary.
+        '''
+        super(Parametric, self).setFromDict(dct)
+        self.clearInstanceCache()
+
+    def clearInstanceCache(self):
+        ''' Remove the cached unit costs and reset the statistics.'''
+        self.instanceCache= collections.OrderedDict()
+        self.instanceCacheHits= 0
+        self.instanceCacheMisses= 0
+        self.instanceCacheInvalidations= 0
+
+    def getInstanceCacheStats(self):
+        ''' Return a dictionary containing the statistics of the cache of
+            instantiated unit costs.'''
+        return {'hits': self.instanceCacheHits, 'misses': self.instanceCacheMisses, 'invalidations': self.instanceCacheInvalidations, 'size': len(self.instanceCache), 'max_size': self.instanceCacheSize}
+
+    @staticmethod
+    def getComponentSearchKey(key):
+        ''' Return the code of the concept corresponding to the component
+            key argument.
+
+        :param key: component key (see evaluateComponents).
+        '''
+        retval= key
+        if('%' in key):
+            retval= key[1:] # Remove the first percent sign.
+        return retval
+
+    @staticmethod
+    def sameComponentEntities(componentEntities, rootChapter):
+        ''' Return true if the concepts found for the components of a unit
+            cost are still the ones in the root chapter (used to check if
+            the cached unit costs are still valid).
+
+        :param componentEntities: dictionary containing the concepts found
+                                  for the components (see createUnitPrice).
+        :param rootChapter: root chapter.
+        '''
+        retval= True
+        for key in componentEntities:
+            ent= rootChapter.findPrice(Parametric.getComponentSearchKey(key))
+            if(not ent):
+                ent= None
+            if(ent is not componentEntities[key]): # removed or replaced.
+                retval= False
+                break
+        return retval
 
     def getUnitPrice(self, code, options, rootChapter):
-        ''' Return a unit cost instantiating this object.
+        ''' Return a unit cost instantiating this object. The unit costs
+            are cached, so the next calls with the same code, options
+            and root chapter return the same object unless the concepts
+            used as components have been replaced or removed from the root
+            chapter.
 
         :param code: code for the new unit cost.
         :param options: list of (parameterKey, parameterOption) tuples assigning
                         values to the parameters.
-        :param rootChapter: root chapter (access to the already 
+        :param rootChapter: root chapter (access to the already
                             defined concepts).
         '''
+        key= (code, frozenset(options))
+        cachedValue= self.instanceCache.get(key, None)
+        if(cachedValue is not None):
+            unitPrice, cachedRootChapter, componentEntities= cachedValue
+            if((cachedRootChapter is rootChapter) and self.sameComponentEntities(componentEntities, rootChapter)):
+                self.instanceCache.move_to_end(key)
+                self.instanceCacheHits+= 1
+                return unitPrice
+            else:
+                self.instanceCacheInvalidations+= 1
+        self.instanceCacheMisses+= 1
         codeTail= self.getCodeTail(options)
-        code= code.replace('$', codeTail)
-        components= self.getComponents(options)
-        summary= self.getSummary(options)
-        text= self.getText(options)
+        selectedParameters= self.computeSelectedParameters(options)
+        componentEntities= dict()
+        retval= self.createUnitPrice(code= code.replace('$', codeTail), options= options, selectedParameters= selectedParameters, rootChapter= rootChapter, componentEntities= componentEntities)
+        self.instanceCache[key]= (retval, rootChapter, componentEntities)
+        self.instanceCache.move_to_end(key)
+        if(len(self.instanceCache)>self.instanceCacheSize):
+            self.instanceCache.popitem(last= False) # remove the least recently used.
+        return retval
+
+    def createUnitPrice(self, code, options, selectedParameters, rootChapter, componentEntities= None):
+        ''' Return a unit cost instantiating this object with the
+            already selected parameters.
+
+        :param code: code for the new unit cost.
+        :param options: list of (parameterKey, parameterOption) tuples assigning
+                        values to the parameters.
+        :param selectedParameters: indexes and options corresponding to
+                                   the options argument (see
+                                   computeSelectedParameters).
+        :param rootChapter: root chapter (access to the already
+                            defined concepts).
+        :param componentEntities: dictionary containing the already
+                                  resolved components (used to share the
+                                  searches between instantiations).
+        '''
+        if(componentEntities is None):
+            componentEntities= dict()
+        components= self.parameters.evaluateComponents(selectedParameters)
+        summary= self.parameters.renderSubstitutionStatement(fiebdc3.summary_statement_names, selectedParameters)
+        text= self.parameters.renderSubstitutionStatement(fiebdc3.text_statement_names, selectedParameters)
         retval= unit_price.UnitPrice(cod= code, desc= summary, ud= self.Unidad(), ld= text)
         # Populate component list.
         cList= retval.components
         for key in components:
-            searchKey= key
-            if('%' in key):
-                searchKey= key[1:] # Remove the first percent sign.
-            ent= rootChapter.getUnitPrice(searchKey)
+            if(key in componentEntities):
+                ent= componentEntities[key]
+            else:
+                ent= rootChapter.getUnitPrice(self.getComponentSearchKey(key))
+                componentEntities[key]= ent
             if not ent:
                 className= type(self).__name__
                 methodName= sys._getframe(0).f_code.co_name
                 logging.warning(className+'.'+methodName+"; component: " + key + ' not found.')
-                error= True
                 continue
             else:
                 value= components[key]
                 fr= fr_entity.EntFR(f= 1.0, r= value)
                 cList.append(bc3_component.BC3Component(ent,fr))
-                error= False
-        
         return retval
-    
+
+    def getOptionIndexes(self):
+        ''' Return a dictionary containing, for each parameter, a
+            dictionary with the index of each of its options.'''
+        retval= dict()
+        for parameterKey in self.parameters.parameterLabelStatements:
+            optionIndexes= dict()
+            for index, option in enumerate(self.parameters.parameterLabelStatements[parameterKey]):
+                if(option not in optionIndexes): # keep the first one.
+                    optionIndexes[option]= index
+            retval[parameterKey]= optionIndexes
+        return retval
+
+    def getOptionsProduct(self, parameterOptions= None):
+        ''' Return the list of options corresponding to all the
+            combinations (cartesian product) of the parameter options.
+
+        :param parameterOptions: dictionary containing the options to
+                                 combine for each parameter (i.e.
+                                 {'diameter': ['100', '200'], 'length':
+                                 ['1 m', '2 m']}). If None, all the options
+                                 of all the parameters are combined.
+        '''
+        if(parameterOptions is None):
+            parameterOptions= self.parameters.parameterLabelStatements
+        parameterKeys= list(parameterOptions.keys())
+        retval= list()
+        for values in itertools.product(*[parameterOptions[key] for key in parameterKeys]):
+            retval.append(list(zip(parameterKeys, values)))
+        return retval
+
+    def getUnitPrices(self, code, optionsList, rootChapter):
+        ''' Return the unit costs obtained instantiating this object for
+            each of the options in the list (None for the options that
+            don't correspond to this object). The option indexes are
+            computed using dictionaries and the components are searched
+            only once for all the instantiations.
+
+        :param code: code of the parametric concept (the '$' character
+                     is replaced by the letters of the chosen options).
+        :param optionsList: list of options, each one being a list of
+                            (parameterKey, parameterOption) tuples (see
+                            getOptionsProduct).
+        :param rootChapter: root chapter (access to the already
+                            defined concepts).
+        '''
+        retval= list()
+        optionIndexes= self.getOptionIndexes()
+        componentEntities= dict()
+        for options in optionsList:
+            selectedParameters= self.computeSelectedParameters(options, optionIndexes)
+            if(None in selectedParameters.values()): # invalid option.
+                retval.append(None)
+            else:
+                codeTail= self.getCodeTail(options, optionIndexes)
+                retval.append(self.createUnitPrice(code= code.replace('$', codeTail), options= options, selectedParameters= selectedParameters, rootChapter= rootChapter, componentEntities= componentEntities))
+        return retval
+
+    def getUnitPricesTable(self, code, optionsList, rootChapter):
+        ''' Return a table (list of rows) containing the code, the chosen
+            options, the unit, the summary and the price of the unit costs
+            obtained instantiating this object for each of the options in
+            the list. The first row contains the column headers.
+
+        :param code: code of the parametric concept.
+        :param optionsList: list of options, each one being a list of
+                            (parameterKey, parameterOption) tuples (see
+                            getOptionsProduct).
+        :param rootChapter: root chapter (access to the already
+                            defined concepts).
+        '''
+        parameterKeys= list(self.parameters.parameterLabelStatements.keys())
+        retval= [['code']+parameterKeys+['unit', 'summary', 'price']]
+        unitPrices= self.getUnitPrices(code= code, optionsList= optionsList, rootChapter= rootChapter)
+        for options, unitPrice in zip(optionsList, unitPrices):
+            if(unitPrice is None): # invalid option.
+                continue
+            chosenOptions= dict(options)
+            row= [unitPrice.Codigo()]
+            for key in parameterKeys:
+                row.append(chosenOptions.get(key, None))
+            row.extend([unitPrice.Unidad(), unitPrice.getTitle(), unitPrice.getPrice()])
+            retval.append(row)
+        return retval
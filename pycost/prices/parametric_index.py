@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+''' Search index over the parametric concepts.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import re
+
+word_pattern= re.compile(r'\w+')
+
+def normalize_text(text):
+    ''' Return the text in lower case and without repeated blanks.
+
+    :param text: text to normalize.
+    '''
+    return ' '.join(text.lower().split())
+
+def get_words(text):
+    ''' Return the words (sequences of alphanumeric characters) of the
+        text in lower case.
+
+    :param text: text to split.
+    '''
+    return word_pattern.findall(text.lower())
+
+def get_ngrams(text, n= 3):
+    ''' Return the set of n-grams of the text (in lower case and padded
+        with blanks, so the short codes have n-grams too).
+
+    :param text: text to split.
+    :param n: number of characters of each n-gram.
+    '''
+    padded= ' '+text.lower()+' '
+    return set(padded[i:i+n] for i in range(max(len(padded)-n+1, 1)))
+
+class ParametricIndex(object):
+    ''' Inverted indexes to search the parametric concepts by its
+        parameter labels, by its options and by approximate code.
+
+    :ivar labelIndex: codes of the concepts indexed by parameter label.
+    :ivar optionIndex: (code, parameter label) pairs indexed by option.
+    :ivar wordIndex: (code, parameter label) pairs indexed by the words of
+                     the options.
+    :ivar ngramIndex: codes of the concepts indexed by the n-grams of the
+                      code.
+    :ivar ngramCounts: number of n-grams of each code.
+    '''
+    ngramLength= 3
+
+    def __init__(self, parametricConcepts= None):
+        ''' Constructor.
+
+        :param parametricConcepts: dictionary containing the parametric
+                                   concepts indexed by code.
+        '''
+        self.labelIndex= dict()
+        self.optionIndex= dict()
+        self.wordIndex= dict()
+        self.ngramIndex= dict()
+        self.ngramCounts= dict()
+        if(parametricConcepts):
+            for code in parametricConcepts:
+                self.append(code, parametricConcepts[code])
+
+    def __len__(self):
+        ''' Return the number of indexed concepts.'''
+        return len(self.ngramCounts)
+
+    def append(self, code, parametricConcept):
+        ''' Append the parametric concept to the indexes.
+
+        :param code: code of the parametric concept.
+        :param parametricConcept: parametric concept to index.
+        '''
+        labelStatements= parametricConcept.parameters.parameterLabelStatements
+        for label in labelStatements:
+            self.labelIndex.setdefault(normalize_text(label), set()).add(code)
+            for option in labelStatements[label]:
+                item= (code, label)
+                self.optionIndex.setdefault(normalize_text(option), set()).add(item)
+                for word in get_words(option):
+                    self.wordIndex.setdefault(word, set()).add(item)
+        ngrams= get_ngrams(code, self.ngramLength)
+        for ngram in ngrams:
+            self.ngramIndex.setdefault(ngram, set()).add(code)
+        self.ngramCounts[code]= len(ngrams)
+
+    def findByLabel(self, label):
+        ''' Return the codes of the concepts having a parameter with the
+            label argument.
+
+        :param label: parameter label.
+        '''
+        return sorted(self.labelIndex.get(normalize_text(label), set()))
+
+    def findByOption(self, option, label= None):
+        ''' Return the codes of the concepts that offer the option argument.
+            If there is no option with exactly that text, return the concepts
+            having options that contain all the words of the text.
+
+        :param option: text of the option (i.e. 'DN200').
+        :param label: if not None, search only in the options of the
+                      parameters with this label.
+        '''
+        items= self.optionIndex.get(normalize_text(option), None)
+        if(items is None): # search by words.
+            items= None
+            for word in get_words(option):
+                wordItems= self.wordIndex.get(word, set())
+                if(items is None):
+                    items= set(wordItems)
+                else:
+                    items&= wordItems
+                if(not items):
+                    break
+        retval= set()
+        if(items):
+            if(label is not None):
+                label= normalize_text(label)
+                retval= set(code for (code, itemLabel) in items if normalize_text(itemLabel)==label)
+            else:
+                retval= set(code for (code, itemLabel) in items)
+        return sorted(retval)
+
+    def findCloseCodes(self, code, n= 10, cutoff= 0.3):
+        ''' Return the codes most similar to the argument (the similarity
+            is measured by the number of common n-grams).
+
+        :param code: code to search for.
+        :param n: maximum number of codes to return.
+        :param cutoff: minimum similarity (between 0 and 1) of the returned
+                       codes.
+        '''
+        ngrams= get_ngrams(code, self.ngramLength)
+        commonCounts= dict()
+        for ngram in ngrams:
+            for candidate in self.ngramIndex.get(ngram, ()):
+                commonCounts[candidate]= commonCounts.get(candidate, 0)+1
+        scores= list()
+        for candidate, common in commonCounts.items():
+            score= 2.0*common/(len(ngrams)+self.ngramCounts[candidate])
+            if(score>=cutoff):
+                scores.append((-score, candidate))
+        scores.sort()
+        return [candidate for (score, candidate) in scores[:n]]
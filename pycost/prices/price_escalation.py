@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+''' Escalation of prices by type (vectorized).'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import numpy as np
+from pycost.utils import fixed_point
+
+def get_escalated_prices(prices, types, coefficients):
+    ''' Return the prices multiplied by the coefficient that corresponds
+        to their type, rounded half to even to hundredths (same values as
+        fixed_point.ppl_price computed for each price).
+
+    :param prices: prices to escalate.
+    :param types: type of each price (basic_types.mdo, basic_types.mat,...).
+    :param coefficients: dictionary containing the coefficient for each
+                         type (the prices of the other types are not
+                         modified).
+    :returns: array of integers (prices in hundredths).
+    '''
+    prices= np.asarray(prices, dtype= float)
+    types= np.asarray(types)
+    factors= np.ones(len(prices))
+    for typo in coefficients:
+        factors[types==typo]= coefficients[typo]
+    escalated= prices*factors
+    scaled= escalated*fixed_point.priceScale
+    rounded= np.rint(scaled) # half to even.
+    # The products are not exact, but the error only matters near the ties
+    # (see fixed_point.round_scaled).
+    exact= (np.abs(scaled)>=fixed_point.fastPathLimit) | (np.abs(np.abs(scaled-rounded)-0.5)<=np.abs(scaled)*fixed_point.scaledFloatError)
+    retval= np.zeros(len(prices), dtype= np.int64)
+    fast= ~exact
+    retval[fast]= rounded[fast].astype(np.int64)
+    for i in np.flatnonzero(exact):
+        retval[i]= fixed_point.ppl_price(float(escalated[i]))
+    return retval
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+''' Bottom-up evaluation of the prices of a price table.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import sys
+import logging
+from pycost.utils import measurable
+from pycost.utils import concept_dict
+
+def get_dependencies(concept):
+    ''' Return the concepts (prices) that appear in the decomposition of
+        the argument (an empty list for the elementary prices).
+
+    :param concept: concept to get the dependencies from.
+    '''
+    retval= list()
+    components= getattr(concept, 'components', None)
+    if(components):
+        for component in components:
+            ent= component.ent
+            if(hasattr(ent, 'getRoundedPrice') and (ent not in retval)): # not a pending link.
+                retval.append(ent)
+    return retval
+
+class PriceEvaluation(object):
+    ''' Prices of a set of concepts evaluated in dependency order (each
+        concept is evaluated only once, after the concepts of its
+        decomposition).
+
+    :ivar prices: rounded prices indexed by concept code.
+    :ivar order: codes of the concepts in evaluation order.
+    :ivar cycles: cycles (lists of codes) found in the decompositions, the
+                  concepts in (or depending on) a cycle are not evaluated.
+    :ivar priceRevision: value of Measurable.priceRevision corresponding
+                         to the evaluated prices.
+    :ivar conceptsRevision: value of ConceptDict.revision corresponding
+                            to the evaluated prices.
+    '''
+    def __init__(self, concepts= None):
+        ''' Constructor.
+
+        :param concepts: concepts to evaluate (the concepts of their
+                         decompositions are evaluated too).
+        '''
+        self.prices= dict()
+        self.order= list()
+        self.cycles= list()
+        self.priceRevision= None
+        self.conceptsRevision= None
+        if(concepts):
+            self.compute(concepts)
+
+    def __len__(self):
+        ''' Return the number of evaluated concepts.'''
+        return len(self.prices)
+
+    def __contains__(self, code):
+        ''' Return true if the concept with the given code has been
+            evaluated.'''
+        return code in self.prices
+
+    def isValid(self):
+        ''' Return true if neither the prices nor the contents of the price
+            tables have changed since the prices were evaluated.'''
+        return (self.priceRevision==measurable.Measurable.priceRevision) and (self.conceptsRevision==concept_dict.ConceptDict.revision)
+
+    def getPrice(self, code):
+        ''' Return the rounded price of the concept with the given code
+            (None if not evaluated).
+
+        :param code: code of the concept.
+        '''
+        return self.prices.get(code, None)
+
+    @staticmethod
+    def sortConcepts(concepts):
+        ''' Return the concepts (and the ones in their decompositions)
+            sorted so each one comes after its dependencies, and the
+            dependencies of the concepts that cannot be sorted because
+            they are in (or depend on) a cycle.
+
+        :param concepts: concepts to sort.
+        '''
+        # Collect the concepts and their dependencies.
+        dependencies= dict()
+        pending= list(concepts)
+        while(pending):
+            concept= pending.pop()
+            if(id(concept) not in dependencies):
+                deps= get_dependencies(concept)
+                dependencies[id(concept)]= (concept, deps)
+                pending.extend(deps)
+        # Kahn's algorithm.
+        dependents= dict()
+        inDegree= dict()
+        for key, (concept, deps) in dependencies.items():
+            inDegree[key]= len(deps)
+            for dep in deps:
+                dependents.setdefault(id(dep), list()).append(concept)
+        ready= [concept for (concept, deps) in dependencies.values() if(len(deps)==0)]
+        retval= list()
+        while(ready):
+            concept= ready.pop()
+            retval.append(concept)
+            for dependent in dependents.get(id(concept), list()):
+                key= id(dependent)
+                inDegree[key]-= 1
+                if(inDegree[key]==0):
+                    ready.append(dependent)
+        unsorted= dict()
+        for key, (concept, deps) in dependencies.items():
+            if(inDegree[key]>0):
+                unsorted[key]= (concept, deps)
+        return retval, unsorted
+
+    @staticmethod
+    def findCycles(unsorted):
+        ''' Return the cycles found among the concepts that cannot be sorted.
+
+        :param unsorted: dictionary containing the concepts and its
+                         dependencies (see sortConcepts).
+        '''
+        retval= list()
+        visited= set()
+        for key in unsorted:
+            path= list()
+            pathIndex= dict()
+            while(key not in visited):
+                visited.add(key)
+                pathIndex[key]= len(path)
+                concept, deps= unsorted[key]
+                path.append(concept)
+                # follow any dependency that cannot be sorted either.
+                key= next(id(dep) for dep in deps if(id(dep) in unsorted))
+            if(key in pathIndex): # new cycle.
+                retval.append([concept.Codigo() for concept in path[pathIndex[key]:]])
+        return retval
+
+    def compute(self, concepts):
+        ''' Evaluate the prices of the concepts in dependency order.
+
+        :param concepts: concepts to evaluate.
+        '''
+        sortedConcepts, unsorted= self.sortConcepts(concepts)
+        conceptIds= set(id(concept) for concept in concepts)
+        for concept in sortedConcepts:
+            code= concept.Codigo()
+            if(code in self.prices):
+                # The concepts to evaluate take precedence over the (replaced)
+                # ones with the same code found in the decompositions.
+                if(id(concept) in conceptIds):
+                    self.prices[code]= concept.getRoundedPrice()
+            else:
+                self.prices[code]= concept.getRoundedPrice()
+                self.order.append(code)
+        if(unsorted):
+            self.cycles.extend(self.findCycles(unsorted))
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            logging.error(className+'.'+methodName+'; cycles found in the price decompositions: '+str(self.cycles)+'; '+str(len(unsorted))+' concepts not evaluated.')
+        self.priceRevision= measurable.Measurable.priceRevision
+        self.conceptsRevision= concept_dict.ConceptDict.revision
+        return self.prices
@@ -10,6 +10,7 @@ __email__= "l.pereztato@ciccp.es"
 import pylatex
 from pycost.prices.price_justification import PriceJustificationRecordContainer
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from decimal import Decimal
 
 class PriceJustificationList(object):
@@ -92,6 +93,25 @@ class PriceJustificationList(object):
     def getTotalCP1(self):
         return basic_types.ppl_price(float(self.getRoundedTotal()))
 
+    def getScaledItems(self):
+        ''' Return the (type, isPercentage, price, productionRate) tuples
+            of the records (see fixed_point.get_justification_total).'''
+        retval= list()
+        for container in [self.mano_de_obra, self.materiales, self.maquinaria, self.otros, self.labor_perc, self.materials_perc, self.machinery_perc, self.percentages]:
+            for record in container:
+                retval.append(record.getScaledItem(container.tipo))
+        return retval
+
+    def getScaledTotal(self):
+        ''' Return the total computed with integer arithmetic, in units of
+            1/fixed_point.justificationUnit (see getTotal).'''
+        return fixed_point.get_justification_total(self.getScaledItems(), self.cumulated_percentages)
+
+    def getScaledRoundedTotal(self):
+        ''' Return the rounded total computed with integer arithmetic, in
+            hundredths (see getTotalCP1).'''
+        return fixed_point.get_justification_rounded_total(self.getScaledItems(), self.cumulated_percentages)
+
     def getLtxPriceString(self):
         ''' Return the price number in a human readable form.'''
         return basic_types.human_readable_currency(self.getTotalCP1())
@@ -9,6 +9,7 @@ __email__= "l.pereztato@ciccp.es"
 
 
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from pycost.utils import pylatex_utils
 
 class PriceJustificationRecord(object):
@@ -60,6 +61,18 @@ class PriceJustificationRecord(object):
         retval*= self.rdto
         return retval
 
+    def getScaledItem(self, typo):
+        ''' Return the (type, isPercentage, price, productionRate) tuple
+            used by the integer arithmetic (see
+            fixed_point.get_justification_total).
+
+        :param typo: type of the record.
+        '''
+        price= 0
+        if(not self.is_percentage):
+            price= fixed_point.ppl_price(self.unitario)
+        return (typo, self.is_percentage, price, fixed_point.round_scaled(self.rdto, fixed_point.productScale))
+
     def getStrUnary(self):
         if self.is_percentage:
             retval= basic_types.human_readable(self.unitario) + pylatex_utils.ltx_percent # Percentage
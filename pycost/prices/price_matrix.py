@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+''' Sparse matrix representation of the price decompositions, used to
+    compute all the prices and all the elementary quantities of a project
+    with sparse matrix-vector products.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import sys
+import logging
+import numpy as np
+from scipy import sparse
+from pycost.prices import price_evaluation
+from pycost.utils import basic_types
+from pycost.utils import fixed_point
+
+def div_half_even(numerators, denominator):
+    ''' Return the integer quotients of the arguments rounded half to even
+        (vectorized version of fixed_point.div_half_even).
+
+    :param numerators: array of integers.
+    :param denominator: positive integer denominator.
+    '''
+    retval, remainders= np.divmod(numerators, denominator)
+    twice= 2*remainders
+    retval+= (twice>denominator) | ((twice==denominator) & (retval % 2==1))
+    return retval
+
+class PriceMatrix(object):
+    ''' Component graph of a set of concepts stored as CSR matrices:
+        the coefficient (i, j) corresponds to the product of the factor and
+        the production rate of the concept j in the decomposition of the
+        unit price i.
+
+        The prices are computed with 64 bit integers (prices in hundredths
+        and rounded products in thousandths) making the same roundings as
+        the price justification (see fixed_point.get_justification_total),
+        so they are equal to the rounded prices computed with Decimal
+        arithmetic (see getPriceMismatches).
+
+    :ivar codes: codes of the concepts (the index of each code is its
+                 row and column in the matrices).
+    :ivar index: row (and column) of each code.
+    :ivar concepts: concepts in the same order as the codes.
+    :ivar laborMatrix: rounded products (in thousandths) of the labor
+                       components.
+    :ivar priceMatrix: rounded products (in thousandths) of the material,
+                       machinery and not classified components (the
+                       percentages and the components whose type is not
+                       considered in the price justification are excluded).
+    :ivar percentages: (type, rounded product) tuples of the percentages
+                       of each unit price that has them, indexed by row.
+    :ivar quantityMatrix: coefficients used to compute the quantities (all
+                          the components).
+    :ivar elementary: true for the elementary concepts.
+    :ivar elementaryPrices: rounded prices in hundredths of the elementary
+                            concepts (zero for the unit prices).
+    :ivar levels: row indexes of the unit prices grouped by level (the
+                  decomposition of a level-n price only contains concepts of
+                  levels lower than n).
+    :ivar cycles: cycles found in the decompositions (see
+                  PriceEvaluation.findCycles), the concepts in or depending
+                  on a cycle are not considered.
+    '''
+    def __init__(self, concepts):
+        ''' Constructor.
+
+        :param concepts: concepts to export (the concepts of their
+                         decompositions are exported too).
+        '''
+        sortedConcepts, unsorted= price_evaluation.PriceEvaluation.sortConcepts(concepts)
+        self.cycles= list()
+        if(unsorted):
+            self.cycles= price_evaluation.PriceEvaluation.findCycles(unsorted)
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            logging.error(className+'.'+methodName+'; cycles found in the price decompositions: '+str(self.cycles)+'; '+str(len(unsorted))+' concepts ignored.')
+        self.concepts= sortedConcepts
+        self.codes= [concept.Codigo() for concept in sortedConcepts]
+        self.index= dict((code, i) for (i, code) in enumerate(self.codes))
+        size= len(self.codes)
+        self.elementary= np.zeros(size, dtype= bool)
+        self.elementaryPrices= np.zeros(size, dtype= np.int64)
+        self.percentages= dict()
+        conceptLevels= np.zeros(size, dtype= int)
+        laborTriplets= ([], [], [])
+        priceTriplets= ([], [], [])
+        quantityTriplets= ([], [], [])
+        for i, concept in enumerate(sortedConcepts):
+            components= getattr(concept, 'components', None)
+            if(components is None): # elementary price.
+                self.elementary[i]= True
+                self.elementaryPrices[i]= fixed_point.rescale(concept.getScaledRoundedPrice(), 10**concept.precision, fixed_point.priceScale)
+                continue
+            level= 0
+            for component in components:
+                if(not hasattr(component.ent, 'getRoundedPrice')): # pending link.
+                    continue
+                j= self.index[component.ent.Codigo()]
+                level= max(level, conceptLevels[j])
+                quantityTriplets[0].append(i)
+                quantityTriplets[1].append(j)
+                quantityTriplets[2].append(component.getProduct())
+                typo= component.getType()
+                if(typo in fixed_point.justificationTypes):
+                    roundedProduct= component.getScaledRoundedProduct()
+                    if(component.isPercentage()):
+                        self.percentages.setdefault(i, list()).append((typo, roundedProduct))
+                    else:
+                        triplets= laborTriplets if(typo==basic_types.mdo) else priceTriplets
+                        triplets[0].append(i)
+                        triplets[1].append(j)
+                        triplets[2].append(roundedProduct)
+            conceptLevels[i]= level+1
+        self.laborMatrix= sparse.csr_matrix((np.array(laborTriplets[2], dtype= np.int64), (laborTriplets[0], laborTriplets[1])), shape= (size, size))
+        self.priceMatrix= sparse.csr_matrix((np.array(priceTriplets[2], dtype= np.int64), (priceTriplets[0], priceTriplets[1])), shape= (size, size))
+        self.quantityMatrix= sparse.csr_matrix((quantityTriplets[2], (quantityTriplets[0], quantityTriplets[1])), shape= (size, size))
+        self.levels= list()
+        for level in range(1, int(conceptLevels.max(initial= 0))+1):
+            self.levels.append(np.flatnonzero(conceptLevels==level))
+
+    def __len__(self):
+        ''' Return the number of concepts.'''
+        return len(self.codes)
+
+    def getPercentagesCost(self, row, basePrice):
+        ''' Return the cost of the percentages of the unit price
+            corresponding to the row argument, in units of
+            1/fixed_point.justificationUnit (cumulated percentages, see
+            fixed_point.get_justification_total).
+
+        :param row: row of the unit price.
+        :param basePrice: price in hundredths the percentages apply to.
+        '''
+        retval= 0
+        typeBases= dict() # cumulated base of each type.
+        for (typo, roundedProduct) in self.percentages[row]:
+            currentBase= typeBases.get(typo, basePrice*fixed_point.productScale)
+            total= fixed_point.div_half_even(currentBase, fixed_point.productScale)*roundedProduct
+            retval+= total
+            typeBases[typo]= currentBase+total
+        return retval
+
+    def computePrices(self):
+        ''' Return the vector with the rounded prices in hundredths of all
+            the concepts, computed level by level (two sparse matrix-vector
+            products by level).'''
+        retval= self.elementaryPrices.copy()
+        toJustification= fixed_point.justificationUnit//fixed_point.justificationScale
+        for rows in self.levels:
+            labor= self.laborMatrix[rows]@retval
+            base= div_half_even(labor, toJustification)*toJustification+self.priceMatrix[rows]@retval
+            total= div_half_even(base, toJustification)*toJustification
+            for k, row in enumerate(rows.tolist()):
+                if(row in self.percentages): # only a few prices have them.
+                    basePrice= fixed_point.div_half_even(int(base[k]), fixed_point.productScale)
+                    total[k]+= self.getPercentagesCost(row, basePrice)
+            retval[rows]= div_half_even(total, fixed_point.productScale)
+        return retval
+
+    def getPrices(self):
+        ''' Return a dictionary containing the rounded prices (Decimal)
+            indexed by code.'''
+        retval= dict()
+        for code, price in zip(self.codes, self.computePrices().tolist()):
+            retval[code]= fixed_point.to_decimal(price, fixed_point.priceScale)
+        return retval
+
+    def getPriceMismatches(self):
+        ''' Return the (code, price, reference price) tuples of the concepts
+            whose price is not equal to the reference (the rounded price
+            computed with Decimal arithmetic, see getRoundedPrice).'''
+        retval= list()
+        prices= self.getPrices()
+        for code, concept in zip(self.codes, self.concepts):
+            reference= concept.getRoundedPrice()
+            if(prices[code]!=reference):
+                retval.append((code, prices[code], reference))
+        return retval
+
+    def getQuantityVector(self, quantitiesReport):
+        ''' Return the vector of measured quantities corresponding to the
+            report argument.
+
+        :param quantitiesReport: total measurement for each price
+                                 (QuantitiesReport object).
+        '''
+        retval= np.zeros(len(self.codes))
+        for price in quantitiesReport:
+            i= self.index.get(price.Codigo(), None)
+            if(i is not None):
+                retval[i]+= float(quantitiesReport[price])
+            else:
+                className= type(self).__name__
+                methodName= sys._getframe(0).f_code.co_name
+                logging.error(className+'.'+methodName+'; price: '+str(price.Codigo())+' not found.')
+        return retval
+
+    def computeQuantities(self, quantities):
+        ''' Return the vector with the total quantities of all the concepts
+            (the measured ones plus the ones used by the unit prices),
+            computed level by level from the top.
+
+        :param quantities: vector of measured quantities (see
+                           getQuantityVector).
+        '''
+        retval= np.array(quantities, dtype= float)
+        for rows in reversed(self.levels):
+            retval+= self.quantityMatrix[rows].T@retval[rows]
+        return retval
+
+    def getElementaryQuantities(self, quantitiesReport):
+        ''' Return a dictionary containing the total quantity of each
+            elementary price indexed by code (unlike
+            QuantitiesReport.getElementaryQuantities, the components repeated
+            in a decomposition are counted as many times as they appear).
+
+        :param quantitiesReport: total measurement for each price
+                                 (QuantitiesReport object).
+        '''
+        quantities= self.computeQuantities(self.getQuantityVector(quantitiesReport))
+        retval= dict()
+        for i in np.flatnonzero(self.elementary):
+            if(quantities[i]!=0.0):
+                retval[self.codes[i]]= float(quantities[i])
+        return retval
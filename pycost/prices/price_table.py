@@ -9,6 +9,7 @@ __email__= "l.pereztato@ciccp.es"
 
 from pycost.prices import elementary_price_container
 from pycost.prices import unit_price_container
+from pycost.prices import price_evaluation
 from pycost.bc3 import codigos_obra
 from pycost.utils import EntPyCost as epc
 from pycost.utils import basic_types
@@ -18,11 +19,20 @@ class CuaPre(epc.EntPyCost):
 
     :ivar elementos: elementary prices.
     :ivar unidades: composed prices.
+    :ivar evaluation: prices computed by the last call to computeAllPrices.
+    :ivar evaluationSource: object whose computeAllPrices method computed
+                            the evaluation (this table or the chapter that
+                            contains it).
     '''
+    evaluation= None
+    evaluationSource= None
+    
     def __init__(self):
         super(CuaPre,self).__init__()
         self.elementos= elementary_price_container.ElementaryPrices() #Precios elementales.
         self.unidades= unit_price_container.Descompuestos() #Unidades de obra.
+        self.evaluation= None
+        self.evaluationSource= None
 
     def Elementales(self):
         ''' Return the container of the elementary prices.'''
@@ -103,6 +113,42 @@ class CuaPre(epc.EntPyCost):
         return self.unidades.getConceptsThatDependOn(priceCode)
         
     
+    def getConcepts(self):
+        ''' Return the elementary and compound prices of this table.'''
+        return list(self.elementos.concepts.values())+list(self.unidades.concepts.values())
+
+    def computeAllPrices(self):
+        ''' Evaluate the prices of all the concepts of this table in
+            dependency order (each concept only once) and return the
+            resulting evaluation (code -> rounded price table and cycles
+            found).'''
+        self.evaluation= price_evaluation.PriceEvaluation(self.getConcepts())
+        self.evaluationSource= self
+        return self.evaluation
+
+    def getComputedPrice(self, code):
+        ''' Return the rounded price of the concept with the given code
+            as computed by the last call to computeAllPrices (the price is
+            evaluated if it is not in the table). If the prices or the
+            price tables have changed since then, the prices are computed
+            again.
+
+        :param code: code of the concept.
+        '''
+        retval= None
+        if(self.evaluation is not None):
+            if(not self.evaluation.isValid()): # stale prices.
+                source= self.evaluationSource
+                if(source is None):
+                    source= self
+                source.computeAllPrices()
+            retval= self.evaluation.getPrice(code)
+        if(retval is None):
+            concept= self.findPrice(code)
+            if(concept is not None):
+                retval= concept.getRoundedPrice()
+        return retval
+    
     def appendComponent(self, cod_ud, cod_el, r, f= 1.0):
         self.unidades.appendComponent(elementos,cod_ud,cod_el,r,f)
 
@@ -110,11 +156,11 @@ class CuaPre(epc.EntPyCost):
         ''' Read elementary prices.'''
         self.elementos.readBC3(elem)
 
-    def LeeBC3DescompFase1(self, descomp):
-        self.unidades.LeeBC3Fase1(descomp)
+    def LeeBC3DescompFase1(self, descomp, decodedRecords= None):
+        self.unidades.LeeBC3Fase1(descomp, decodedRecords= decodedRecords)
 
-    def LeeBC3DescompFase2(self, descomp, rootChapter):
-        return self.unidades.LeeBC3Fase2(descomp, rootChapter= rootChapter)
+    def LeeBC3DescompFase2(self, descomp, rootChapter, decodedRecords= None):
+        return self.unidades.LeeBC3Fase2(descomp, rootChapter= rootChapter, decodedRecords= decodedRecords)
 
     def searchForUnitPrice(self, cod):
         return self.unidades.Busca(cod)
@@ -247,4 +293,6 @@ class CuaPre(epc.EntPyCost):
         '''removes all items from the chapter.'''
         self.unidades.clear()
         self.elementos.clear()
+        self.evaluation= None
+        self.evaluationSource= None
         
@@ -17,6 +17,7 @@ from pycost.utils import pylatex_utils
 from pycost.utils import basic_types
 from pycost.bc3 import fr_entity
 from pycost.bc3 import bc3_component
+from pycost.bc3 import fiebdc3
 from decimal import Decimal
 
 class UnitPrice(ms.Measurable):
@@ -24,11 +25,24 @@ class UnitPrice(ms.Measurable):
         to build a building unit.
 
     :ivar components: components of the cost (materials,...).
+    :ivar cachedPrice: price computed by the last call to getPrice (None
+                       if not computed yet or if any of the components
+                       has changed since).
+    :ivar cachedElementaryDecomposition: elementary prices of the
+                                         decomposition (see
+                                         getElementaryDecomposition).
+    :ivar cachedElementaryFactors: (code, coefficient) tuples of the
+                                   elementary prices of the decomposition
+                                   (see getElementaryFactors).
+    :ivar missingComponents: codes of the components not found when
+                             reading the decomposition (None if all of them
+                             were found).
     '''
     precision= 2
     places= Decimal(10) ** -precision
     formatString= '{0:.'+str(precision)+'f}'
     descriptionColumnWidth= 60 # Width of the description column in mm.
+    missingComponents= None
 
     def __init__(self, cod="", desc="", ud="", ld= None):
         ''' Constructor.
@@ -39,8 +53,60 @@ class UnitPrice(ms.Measurable):
         :param ld: long description.
         '''
         super(UnitPrice,self).__init__(cod= cod, tit= desc, ud= ud, ld= ld)
+        self.cachedPrice= None
+        self.cachedElementaryDecomposition= None
+        self.cachedElementaryFactors= None
         self.components= component_list.ComponentList()
-        
+
+    def __getstate__(self):
+        ''' Return the object state for pickling.'''
+        retval= super(UnitPrice,self).__getstate__()
+        retval['cachedPrice']= None
+        retval['cachedElementaryDecomposition']= None
+        retval['cachedElementaryFactors']= None
+        return retval
+
+    def __setstate__(self, state):
+        ''' Restore the object state.
+
+        :param state: state returned by __getstate__.
+        '''
+        if('components' in state): # pickled before being a property.
+            state['_components']= state.pop('components')
+        state.setdefault('cachedPrice', None)
+        state.setdefault('cachedElementaryDecomposition', None)
+        state.setdefault('cachedElementaryFactors', None)
+        super(UnitPrice,self).__setstate__(state)
+        self._components.parentPrice= self
+
+    @property
+    def components(self):
+        ''' Return the components of the price.'''
+        return self._components
+
+    @components.setter
+    def components(self, value):
+        ''' Set the components of the price.
+
+        :param value: component list.
+        '''
+        oldValue= getattr(self, '_components', None)
+        if((oldValue is not None) and (oldValue is not value)):
+            oldValue.parentPrice= None # its components no longer depend on this price.
+        value.parentPrice= self
+        self._components= value
+        self.invalidatePrice()
+
+    def invalidatePrice(self):
+        ''' Discard the cached price of this object and the prices that
+            depend on it.'''
+        ms.Measurable.priceRevision+= 1
+        if((self.cachedPrice is not None) or (self.cachedRoundedPrice is not None) or (self.cachedScaledPrice is not None) or (self.cachedElementaryDecomposition is not None)):
+            self.cachedPrice= None
+            self.cachedElementaryDecomposition= None
+            self.cachedElementaryFactors= None
+            super(UnitPrice,self).invalidatePrice()
+
     def getType(self):
         return 0
 
@@ -82,6 +148,23 @@ class UnitPrice(ms.Measurable):
         '''
         return self.components.getElementaryComponentFactors(parentPrices= parentPrices, parentFactor= parentFactor)
 
+    def getElementaryDecomposition(self):
+        ''' Return the elementary prices of the decomposition of this price
+            (see ComponentList.getElementaryDecomposition), computed only
+            once until the decomposition changes.'''
+        if(self.cachedElementaryDecomposition is None):
+            self.cachedElementaryDecomposition= self.components.getElementaryDecomposition()
+        return self.cachedElementaryDecomposition
+
+    def getElementaryFactors(self):
+        ''' Return the (code, coefficient) tuples of the elementary prices
+            of the decomposition of this price (the quantity of each
+            elementary price is the coefficient times the quantity of this
+            price), computed only once until the decomposition changes.'''
+        if(self.cachedElementaryFactors is None):
+            self.cachedElementaryFactors= [(ent.Codigo(), productionRate*factor**repetitions) for (ent, productionRate, factor, repetitions) in self.getElementaryDecomposition().values()]
+        return self.cachedElementaryFactors
+
     def getElementaryComponents(self, parentPrices, parentFactor= 1.0):
         ''' Return the elementary components of this price.
 
@@ -100,7 +183,19 @@ class UnitPrice(ms.Measurable):
         return self.components.getNumberOfWorkers()
             
     def getPrice(self):
-        return self.components.getPrice()
+        ''' Return the price of this unit (computed only once, until
+            something changes).'''
+        if(self.cachedPrice is None):
+            self.cachedPrice= self.components.getPrice()
+        return self.cachedPrice
+
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price in hundredths computed with integer
+            arithmetic (see ComponentList.getScaledRoundedPrice), equal to
+            getRoundedPrice()*100.'''
+        if(self.cachedScaledPrice is None):
+            self.cachedScaledPrice= self.components.getScaledRoundedPrice()
+        return self.cachedScaledPrice
 
     def AsignaFactor(self, f):
         self.components.AsignaFactor(f)
@@ -114,22 +209,62 @@ class UnitPrice(ms.Measurable):
         '''Lee la unidad a falta de la descomposición.'''
         super(UnitPrice,self).readBC3(r)
 
+    def LeeBC3Fase1FromTuple(self, decoded):
+        '''Lee la unidad a falta de la descomposición.
+
+        :param decoded: (code, title, unit, long description, price, components)
+                        tuple (see bc3_record.decode_unit_price_records).
+        '''
+        self.codigo= decoded[0]
+        self.title= decoded[1]
+        self.unidad= decoded[2]
+        self.long_description= decoded[3]
+
     def LeeBC3Fase2(self, r, rootChapter):
         ''' Read the components of the unit.
 
+        :param rootChapter: root chapter (access to the already 
+                            defined concepts).
+        '''
+        return self.setBC3Components(r.Datos().desc, r.Datos().getPrice(), rootChapter= rootChapter)
+
+    def LeeBC3Fase2FromTuple(self, decoded, rootChapter):
+        ''' Read the components of the unit.
+
+        :param decoded: (code, title, unit, long description, price, components)
+                        tuple (see bc3_record.decode_unit_price_records).
+        :param rootChapter: root chapter (access to the already 
+                            defined concepts).
+        '''
+        descBC3= list()
+        for (code, factor, productionRate) in decoded[5]:
+            comp= fiebdc3.regBC3_desc(Str= None)
+            comp.setValues(c= code, f= factor, pr= productionRate)
+            descBC3.append(comp)
+        return self.setBC3Components(descBC3, decoded[4], rootChapter= rootChapter)
+
+    def setBC3Components(self, descBC3, price, rootChapter):
+        ''' Set the components of the unit.
+
+        :param descBC3: decomposition read from the BC3 file.
+        :param price: price of the unit (used if there is no decomposition).
         :param rootChapter: root chapter (access to the already 
                             defined concepts).
         '''
         error= False
-        if(len(r.Datos().desc)>0):
-            tmp= UnitPrice.getPointers(r.Datos().desc, error, rootChapter= rootChapter)
+        self.missingComponents= None
+        if(len(descBC3)>0):
+            missingCodes= list()
+            tmp= UnitPrice.getPointers(descBC3, error, rootChapter= rootChapter, missingCodes= missingCodes)
+            if(missingCodes):
+                self.missingComponents= missingCodes
             if not error:
                 self.components= tmp
             else:
                 logging.error("Error reading components of unit: " + self.Codigo() + '\n')
 
         else:
-            self.components= self.GetSindesco(r.Datos().getPrice(),rootChapter.precios)
+            self.components= self.GetSindesco(price,rootChapter.precios)
         return error
 
     def GetSindesco(self, productionRate, bp):
@@ -147,20 +282,24 @@ class UnitPrice(ms.Measurable):
         return retval
 
     @staticmethod
-    def getPointers(descBC3, error, rootChapter):
+    def getPointers(descBC3, error, rootChapter, missingCodes= None):
         '''Get the pointers to the component prices.
 
         :param rootChapter: root chapter (access to the already 
                             defined concepts).
+        :param missingCodes: if not None, list to append the codes of the
+                             components not found.
         '''
         retval= component_list.ComponentList()
         ent= None
         for i in descBC3:
-            ent= rootChapter.getUnitPrice((i).codigo)
+            ent= rootChapter.findPrice((i).codigo)
             if not ent:
-                className= type(self).__name__
+                className= UnitPrice.__name__
                 methodName= sys._getframe(0).f_code.co_name
-                logging.warning(className+'.'+methodName+"; component: " + (i).codigo + 'not found.')
+                logging.warning(className+'.'+methodName+"; component: " + (i).codigo + ' not found.')
+                if(missingCodes is not None):
+                    missingCodes.append((i).codigo)
                 error= True
                 continue
             else:
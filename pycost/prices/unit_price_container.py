@@ -10,10 +10,13 @@ __email__= "l.pereztato@ciccp.es"
 import pylatex
 import logging
 import sys
-import difflib
+import concurrent.futures
+from pycost.bc3 import bc3_record
+from pycost.bc3 import bc3_component
 from pycost.prices import elementary_price_container
 from pycost.prices import unit_price
 from pycost.prices import parametric
+from pycost.prices import parametric_index
 from pycost.utils import concept_dict
 from pycost.utils import pylatex_utils
 
@@ -21,10 +24,15 @@ class Descompuestos(concept_dict.ConceptDict):
     '''Unidades de obra.
 
     :ivar parametricConcepts: parametric concepts dictionary.
+    :ivar parametricIndex: search index over the parametric concepts
+                           (built on demand by getParametricIndex).
     '''
+    parametricIndex= None
+
     def __init__(self):
         super().__init__()
         self.parametricConcepts= dict()
+        self.parametricIndex= None
 
     def size(self, filterBy= None):
         ''' Return the number of compound prices in this container. If 
@@ -77,48 +85,96 @@ class Descompuestos(concept_dict.ConceptDict):
 
         :param conceptToRemoveCode: code of the concept to remove.
         '''
-        for key in self.concepts:
-            concept= self.concepts[key]
-            if(concept.dependsOnConcept(conceptToRemoveCode)):
-                concept.removeConcept(conceptToRemoveCode)
+        for dependentPrice in self.getConceptsThatDependOn(conceptToRemoveCode):
+            dependentPrice.removeConcept(conceptToRemoveCode)
 
     def getConceptsThatDependOn(self, priceCode):
         ''' Return the prices which depend on the one whose code
-            is passed as parameter.
+            is passed as parameter. The prices are obtained from the
+            components that refer to that code (see
+            BC3Component.getComponentsThatReferTo) instead of checking all
+            the prices of this container.
 
         :param priceCode: code of the price on which the returned prices depend.
         '''
         retval= list()
-        for key in self.concepts:
-            concept= self.concepts[key]
-            if(concept.dependsOnConcept(priceCode)):
-                retval.append(concept)
+        visited= set()
+        for component in bc3_component.BC3Component.getComponentsThatReferTo(priceCode):
+            up= component.getParentPrice()
+            if((up is not None) and (id(up) not in visited)):
+                visited.add(id(up))
+                if(self.concepts.get(up.Codigo()) is up): # in this container.
+                    retval.append(up)
+        return retval
+
+    @staticmethod
+    def decodeBC3(cds, numWorkers, chunkSize= None):
+        ''' Decode the records of the (not parametric) unit prices using
+            a pool of worker processes. The linking of the components is
+            left to LeeBC3Fase2.
+
+        :param cds: unit price records.
+        :param numWorkers: number of worker processes.
+        :param chunkSize: number of records decoded by each task (if None
+                          split the records in four chunks for each worker).
+        :returns: dictionary containing the decoded records (see
+                  bc3_record.decode_unit_price_records) indexed by its code.
+        '''
+        records= [cds[key] for key in cds if not '$' in key]
+        retval= dict()
+        if(len(records)>0):
+            with concurrent.futures.ProcessPoolExecutor(max_workers= numWorkers) as executor:
+                if(chunkSize is None):
+                    numChunks= 4*numWorkers
+                    chunkSize= max(1, -(-len(records)//numChunks))
+                chunks= [records[i:i+chunkSize] for i in range(0, len(records), chunkSize)]
+                for decodedChunk in executor.map(bc3_record.decode_unit_price_records, chunks):
+                    for decoded in decodedChunk:
+                        retval[decoded[0]]= decoded
         return retval
 
-    def LeeBC3Fase1(self, cds):
-        '''Read the units whitout its components.'''
+    def LeeBC3Fase1(self, cds, decodedRecords= None):
+        '''Read the units whitout its components.
+
+        :param cds: unit price records.
+        :param decodedRecords: records already decoded by decodeBC3 (optional).
+        '''
         for key in cds:
             if('$' in key): # parametric concept.
                 reg= cds.getParametricData(key)
                 self.parametricConcepts[key]= parametric.Parametric(c= reg.datos.concept, t= reg.datos.txt, p= reg.datos.parameters)
+                self.parametricIndex= None
             else: # not a parametric concept.
-                reg= cds.getUnitPriceData(key)
                 ud= unit_price.UnitPrice()
-                ud.LeeBC3Fase1(reg)
+                if(decodedRecords is None):
+                    reg= cds.getUnitPriceData(key)
+                    ud.LeeBC3Fase1(reg)
+                else:
+                    ud.LeeBC3Fase1FromTuple(decodedRecords[key])
                 self.Append(ud)
 
-    def LeeBC3Fase2(self, cds, rootChapter):
-        '''Reads the components of the unit.'''
+    def LeeBC3Fase2(self, cds, rootChapter, decodedRecords= None):
+        '''Reads the components of the unit.
+
+        :param cds: unit price records.
+        :param rootChapter: root chapter (access to the already 
+                            defined concepts).
+        :param decodedRecords: records already decoded by decodeBC3 (optional).
+        '''
         ud= None
         error= False
         retval= set()
         for key in cds:
             if(not '$' in key): # not a parametric concept.
-                reg= cds.getUnitPriceData(key)
-                ud= self.Busca(reg.Codigo())
-                error= ud.LeeBC3Fase2(reg, rootChapter= rootChapter)
+                if(decodedRecords is None):
+                    reg= cds.getUnitPriceData(key)
+                    ud= self.Busca(reg.Codigo())
+                    error= ud.LeeBC3Fase2(reg, rootChapter= rootChapter)
+                else:
+                    ud= self.Busca(key)
+                    error= ud.LeeBC3Fase2FromTuple(decodedRecords[key], rootChapter= rootChapter)
                 if error:
-                    retval.add(reg.Codigo())
+                    retval.add(key)
         return retval
 
     def WriteSpre(self, os):
@@ -332,12 +388,70 @@ class Descompuestos(concept_dict.ConceptDict):
             className= type(self).__name__
             methodName= sys._getframe(0).f_code.co_name
             logging.error(className+'.'+methodName+'; parametric concept: \''+str(key)+'\' not found. Candidates are:')
-            candidate_keys= self.parametricConcepts.keys()
+            candidate_keys= list(self.parametricConcepts.keys())
             if(len(candidate_keys)>10): # Do not fill the console with data.
-                candidate_keys= difflib.get_close_matches(key, candidate_keys)
+                candidate_keys= self.getParametricIndex().findCloseCodes(key)
             logging.error(str(candidate_keys))
         return retval
 
+    def getParametricIndex(self):
+        ''' Return the search index over the parametric concepts (building
+            it if needed).'''
+        if(self.parametricIndex is None):
+            self.parametricIndex= parametric_index.ParametricIndex(self.parametricConcepts)
+        return self.parametricIndex
+
+    def findParametricConcepts(self, label= None, option= None):
+        ''' Return the codes of the parametric concepts that have a parameter
+            with the label argument and/or that offer the option argument.
+
+        :param label: parameter label (i.e. 'diameter').
+        :param option: text of the option (i.e. 'DN200').
+        '''
+        index= self.getParametricIndex()
+        if(option is not None):
+            retval= index.findByOption(option, label= label)
+        elif(label is not None):
+            retval= index.findByLabel(label)
+        else:
+            retval= sorted(self.parametricConcepts.keys())
+        return retval
+
+    def removeParametricConcept(self, key):
+        ''' Remove the parametric concept identified by the key.
+
+        :param key: identifier of the parametric concept.
+        '''
+        del self.parametricConcepts[key]
+        self.parametricIndex= None
+
+    def getParametricUnitPrices(self, key, rootChapter, optionsList= None, append= False):
+        ''' Return the unit prices obtained instantiating the parametric
+            concept identified by the key for each of the options in the
+            list (see Parametric.getUnitPrices).
+
+        :param key: identifier of the parametric concept.
+        :param rootChapter: root chapter (access to the already
+                            defined concepts).
+        :param optionsList: list of options, each one being a list of
+                            (parameterKey, parameterOption) tuples. If None
+                            all the combinations of the parameter options
+                            are instantiated.
+        :param append: if true, append the new unit prices to this
+                       container.
+        '''
+        retval= list()
+        parametricConcept= self.getParametricConcept(key)
+        if(parametricConcept):
+            if(optionsList is None):
+                optionsList= parametricConcept.getOptionsProduct()
+            retval= parametricConcept.getUnitPrices(code= key, optionsList= optionsList, rootChapter= rootChapter)
+            if(append):
+                for unitPrice in retval:
+                    if(unitPrice is not None): # valid options.
+                        self.Append(unitPrice)
+        return retval
+
     def writeParametricConcepts(self, os= sys.stdout):
         ''' Writes a report of the parametrics concepts.'''
         for key in self.parametricConcepts:
@@ -384,6 +498,7 @@ class Descompuestos(concept_dict.ConceptDict):
                     param= parametric.Parametric()
                     param.setFromDict(value)
                     self.parametricConcepts[key]= param
+                self.parametricIndex= None
         else:
             logging.info('No parametric prices.')
         return pendingLinks
@@ -395,3 +510,4 @@ class Descompuestos(concept_dict.ConceptDict):
         #     p.clear()
         super(Descompuestos, self).clear()
         self.parametricConcepts.clear()
+        self.parametricIndex= None
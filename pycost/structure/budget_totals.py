@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+''' Rounded totals of the chapters and the unit price quantities of a
+    project, updated incrementally when the unit prices change.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.utils import measurable
+
+def get_structure_key(rootChapter):
+    ''' Return a tuple that changes when the chapters of the tree, their
+        factors or their quantities change (see
+        ChapterQuantities.revision).
+
+    :param rootChapter: root of the chapter tree.
+    '''
+    retval= list()
+    for chapter in rootChapter.getChaptersDepthFirst():
+        retval.append((id(chapter), id(chapter.quantities), chapter.quantities.revision, chapter.fr.getRoundedProduct()))
+    return tuple(retval)
+
+class BudgetTotals(object):
+    ''' Rounded totals of the chapters and the unit price quantities of a
+        chapter tree (computed as Chapter.getRoundedPrice).
+
+    :ivar chapters: list of [chapter, parent index, depth, rounded total]
+                    items (the root chapter first).
+    :ivar quantities: lists of [unit price quantities, chapter index,
+                      rounded total] items indexed by the code of their
+                      unit price.
+    :ivar priceRevision: value of Measurable.priceRevision corresponding
+                         to the totals.
+    :ivar structureKey: chapter tree and quantities used to compute the
+                        totals (see get_structure_key).
+    '''
+    def __init__(self, rootChapter):
+        ''' Constructor.
+
+        :param rootChapter: chapter whose totals will be computed.
+        '''
+        self.chapters= list()
+        self.quantities= dict()
+        self.computeChapterTotal(rootChapter, parentIndex= None, depth= 0)
+        self.priceRevision= measurable.Measurable.priceRevision
+        self.structureKey= get_structure_key(rootChapter)
+
+    def isValid(self, rootChapter):
+        ''' Return true if neither the prices nor the chapters or their
+            quantities have changed since the totals were computed (or
+            updated by the last call to update).
+
+        :param rootChapter: chapter whose totals were computed.
+        '''
+        retval= (self.priceRevision==measurable.Measurable.priceRevision)
+        if(retval):
+            retval= (self.structureKey==get_structure_key(rootChapter))
+        return retval
+
+    def computeChapterTotal(self, chapter, parentIndex, depth):
+        ''' Compute the rounded totals of the chapter argument and its
+            contents and return the total of the chapter.
+
+        :param chapter: chapter to compute.
+        :param parentIndex: index of the parent chapter (None for the root).
+        :param depth: depth of the chapter in the tree.
+        '''
+        index= len(self.chapters)
+        item= [chapter, parentIndex, depth, None]
+        self.chapters.append(item)
+        subChaptersTotal= 0
+        for subChapter in chapter.subcapitulos:
+            subChaptersTotal+= self.computeChapterTotal(subChapter, parentIndex= index, depth= depth+1)
+        quantitiesTotal= 0
+        for upq in chapter.quantities:
+            total= upq.getRoundedPrice()
+            self.quantities.setdefault(upq.getUnitPriceCode(), list()).append([upq, index, total])
+            quantitiesTotal+= total
+        item[3]= (subChaptersTotal+quantitiesTotal)*chapter.fr.getRoundedProduct()
+        return item[3]
+
+    def getTotal(self):
+        ''' Return the rounded total of the root chapter.'''
+        return self.chapters[0][3]
+
+    def update(self, unitPrices):
+        ''' Update the totals of the quantities of the unit prices argument
+            and the totals of the chapters that contain them, and return the
+            (object, old total, new total) tuples of the totals that have
+            changed (the chapters from the bottom up, the root chapter
+            last). The unit prices argument must contain all the prices
+            changed since the totals were computed.
+
+        :param unitPrices: unit prices whose price has changed.
+        '''
+        retval= list()
+        chapterDeltas= dict()
+        for unitPrice in unitPrices:
+            for item in self.quantities.get(unitPrice.Codigo(), list()):
+                upq, chapterIndex, oldTotal= item
+                newTotal= upq.getRoundedPrice()
+                if(newTotal!=oldTotal):
+                    item[2]= newTotal
+                    retval.append((upq, oldTotal, newTotal))
+                    chapterDeltas[chapterIndex]= chapterDeltas.get(chapterIndex, 0)+(newTotal-oldTotal)
+        # Push the deltas up the chapter tree (deepest chapters first).
+        levels= dict()
+        for chapterIndex in chapterDeltas:
+            levels.setdefault(self.chapters[chapterIndex][2], set()).add(chapterIndex)
+        depth= max(levels, default= -1)
+        while(depth>=0):
+            for chapterIndex in sorted(levels.pop(depth, set())):
+                item= self.chapters[chapterIndex]
+                chapter, parentIndex, oldTotal= item[0], item[1], item[3]
+                delta= chapterDeltas[chapterIndex]*chapter.fr.getRoundedProduct()
+                if(delta!=0):
+                    item[3]= oldTotal+delta
+                    retval.append((chapter, oldTotal, item[3]))
+                    if(parentIndex is not None):
+                        chapterDeltas[parentIndex]= chapterDeltas.get(parentIndex, 0)+delta
+                        levels.setdefault(depth-1, set()).add(parentIndex)
+            depth-= 1
+        self.priceRevision= measurable.Measurable.priceRevision
+        return retval
@@ -22,6 +22,8 @@ from pycost.bc3 import bc3_entity
 from pycost.bc3 import bc3_component
 from pycost.structure import chapter_container
 from pycost.prices import price_table
+from pycost.prices import price_evaluation
+from pycost.prices import graph_validation
 from pycost.prices import unit_price_container
 from pycost.structure import unit_price_quantities
 from pycost.utils import pylatex_utils
@@ -82,6 +84,8 @@ class Chapter(bc3_entity.EntBC3):
         '''
         presup=self.getRootChapter()
         currentPrice=presup.getUnitPrice(code)
+        if(currentPrice is None): # not found (error already logged).
+            return
         currentQuantities= UnitPriceQuantities(currentPrice)
         if type(lstQuants[0]) is not list:
             lstQuants=[lstQuants]
@@ -236,6 +240,14 @@ class Chapter(bc3_entity.EntBC3):
             return paths
 
     
+    def getChaptersDepthFirst(self):
+        ''' Return a list containing this chapter and all the chapters that
+            hang from it (depth-first order).'''
+        retval= [self]
+        for chapter in self.subcapitulos:
+            retval.extend(chapter.getChaptersDepthFirst())
+        return retval
+
     def printTree(self, os= sys.stdout, includeTitles= False):
         tree_utils.print_tree(self, includeTitles= includeTitles, os= os)
         
@@ -287,7 +299,10 @@ class Chapter(bc3_entity.EntBC3):
         :param measurements: list of (remark, numberOfUnits, lenght, width, height) tuples.
         '''
         root= self.getRootChapter()
-        quantities= unit_price_quantities.UnitPriceQuantities(root.getUnitPrice(priceCode))
+        price= root.getUnitPrice(priceCode)
+        if(price is None): # not found (error already logged).
+            return
+        quantities= unit_price_quantities.UnitPriceQuantities(price)
         for row in measurements:
 
             quantities.appendMeasurement(textComment=row[0], nUnits= row[1], length= row[2], width= row[3], height= row[4])
@@ -531,7 +546,54 @@ class Chapter(bc3_entity.EntBC3):
         priceQuant= self.quantities.getPrice()
         factor= self.fr.getProduct()
         return (priceSubC + priceQuant)*factor 
+
+    def getPrices(self, retval= None):
+        ''' Return a dictionary containing the prices of this chapter and
+            all its sub-chapters indexed by the object identifier. Each
+            price is computed only once (bottom-up).
+
+        :param retval: dictionary to populate (optional).
+        '''
+        if(retval is None):
+            retval= dict()
+        priceSubC= 0.0
+        for chapter in self.subcapitulos:
+            chapter.getPrices(retval)
+            priceSubC+= retval[id(chapter)]
+        priceQuant= self.quantities.getPrice()
+        factor= self.fr.getProduct()
+        retval[id(self)]= (priceSubC + priceQuant)*factor
+        return retval
     
+    def getConcepts(self, retval= None):
+        ''' Return the elementary and compound prices of this chapter and
+            all its sub-chapters.
+
+        :param retval: list to populate (optional).
+        '''
+        if(retval is None):
+            retval= list()
+        retval.extend(self.precios.getConcepts())
+        for chapter in self.subcapitulos:
+            chapter.getConcepts(retval)
+        return retval
+
+    def computeAllPrices(self):
+        ''' Evaluate the prices of all the concepts of this chapter and
+            its sub-chapters in dependency order (each concept only once)
+            and return the resulting evaluation (code -> rounded price table
+            and cycles found).'''
+        self.precios.evaluation= price_evaluation.PriceEvaluation(self.getConcepts())
+        self.precios.evaluationSource= self
+        return self.precios.evaluation
+
+    def validateComponentGraph(self):
+        ''' Check the decompositions of the prices of this chapter and its
+            sub-chapters (cycles and references to concepts that don't
+            exist) and return the problems found (see
+            graph_validation.GraphDiagnostics).'''
+        return graph_validation.validate_component_graph(self.getConcepts())
+
     def getRoundedPrice(self):
         retval= self.subcapitulos.getRoundedPrice() + self.quantities.getRoundedPrice()
         retval*= self.fr.getRoundedProduct()
@@ -869,17 +931,13 @@ class Chapter(bc3_entity.EntBC3):
             price= rootChapter.findPrice(key)
             if(price):
                 if(price.isCompound()): # compound price.
-                    parentPrices= [price.Codigo()]
-                    elementaryComponents= price.getElementaryComponents(parentPrices= parentPrices)
-                    for code in elementaryComponents:
-                        ec= elementaryComponents[code]
-                        elementaryCode= ec.CodigoEntidad()
+                    for (ent, productionRate, factor, repetitions) in price.getElementaryDecomposition().values():
+                        elementaryCode= ent.Codigo()
                         if(filterByType):
-                            if(ec.isOfType(filterByType)):
+                            if(ent.getType()==filterByType):
                                 retval.add(elementaryCode)
                         else:
                             retval.add(elementaryCode)
-                    parentPrices.pop()
                 else: # elementary price.
                     code= price.Codigo()
                     if(filterByType):
@@ -7,6 +7,7 @@ __license__= "GPL"
 __version__= "3.0"
 __email__= "l.pereztato@ciccp.es"
 
+import sys
 import logging
 from decimal import Decimal
 import pylatex
@@ -165,13 +166,52 @@ class Subcapitulos(list, epc.EntPyCost):
             self.newChapterFromRecord(comp)
 
     def LeeBC3Caps(self, co):
-        ''' Carga los datos de los subcapítulos de (self).'''
-        sc= codes.Codigos(co.GetDatosCaps())
+        ''' Carga los datos de los subcapítulos de (self).
+
+        :param co: BC3 records (CodigosObra object).
+        '''
+        sc= co.GetDatosCaps()
         if len(sc)<1:
             logging.error("No se encontraron subcapitulos." + '\n')
-
+        # Read the chapter tree.
+        visitedChapters= dict()
+        self.readBC3ChapterTree(co, visitedChapters)
+        # Each elementary price belongs to the first chapter (in depth-first
+        # order) that contains it.
+        visitOrder= dict()
+        for chapterCode in visitedChapters:
+            visitOrder[chapterCode]= len(visitOrder)
+        elementaryPriceOwner= dict()
+        for elementaryCode, parentChapters in co.getParentChaptersIndex().items():
+            visitedParents= [c for c in parentChapters if c in visitOrder]
+            if(visitedParents):
+                elementaryPriceOwner[elementaryCode]= min(visitedParents, key= visitOrder.get)
+        # Read the elementary prices of each chapter.
+        elementos= co.GetDatosElementos()
+        readElementaryPrices= codes.Codigos()
+        for chapterCode, i in visitedChapters.items():
+            elementos_capitulo= codes.Codigos()
+            for comp in sc[chapterCode].GetDesc():
+                record= elementos.find(comp.codigo)
+                if(record is not None) and (elementaryPriceOwner.get(record.code, None)==chapterCode):
+                    elementos_capitulo[record.code]= record
+            if(elementos_capitulo):
+                i.LeeBC3Elementales(elementos_capitulo)
+                logging.info("  Loaded " + str(len(elementos_capitulo))
+                             + u" elementary prices of the chapter '"
+                             + str(chapterCode) + "'.\n")
+                readElementaryPrices.update(elementos_capitulo)
+        co.BorraElementales(readElementaryPrices); #Borra los ya leídos.
+
+    def readBC3ChapterTree(self, co, visitedChapters):
+        ''' Read the chapters and its subchapters (depth-first order).
+
+        :param co: BC3 records (CodigosObra object).
+        :param visitedChapters: dictionary to store the chapters read,
+                                indexed by the code of its BC3 record.
+        '''
+        sc= co.GetDatosCaps()
         chapterNames= co.getChapterCodes()
-
         for i in self:
             code= i.Codigo()
             j= sc.findChapter(code)
@@ -180,22 +220,11 @@ class Subcapitulos(list, epc.EntPyCost):
                 if i:
                     logging.info(u"Loading sub-chapter: '" + reg.Datos().getTitle() + "'\n")
                     i.readBC3(reg) # Title
-
-                    #Lee los elementales del capítulo.
-                    elementos_capitulo= co.FiltraElementales(reg.Datos().desc)
-                    i.LeeBC3Elementales(elementos_capitulo)
-                    if(elementos_capitulo):
-                      logging.info("  Loaded " + str(len(elementos_capitulo))
-                                   + u" elementary prices of the chapter."
-                                   + '\n')
-                    co.BorraElementales(elementos_capitulo); #Borra los ya leídos.
-                    logging.info("  They remain " + str(len(co.GetDatosElementos())) + " elementary prices." + '\n')
-
+                    if(j.code not in visitedChapters):
+                        visitedChapters[j.code]= i
                     #Lee los subcapítulos.
                     i.subcapitulos.newChapters(reg.Datos().filterChapters(chapterNames))
-                    i.subcapitulos.LeeBC3Caps(co); #Carga los subcapitulos.
-
-
+                    i.subcapitulos.readBC3ChapterTree(co, visitedChapters); #Carga los subcapitulos.
             else:
                 className= type(self).__name__
                 methodName= sys._getframe(0).f_code.co_name
@@ -205,10 +234,9 @@ class Subcapitulos(list, epc.EntPyCost):
     def WriteDescompBC3(self, os, cod):
         if(len(self)<1): return
         os.write("~D" + '|'
-           + cod + '|')
-        for i in self:
-            (i).getBC3Component().WriteBC3(os)
-        os.write('|' + '\n')
+           + cod + '|'
+           + ''.join((i).getBC3Component().getBC3String() for i in self)
+           + '|' + '\n')
 
 
     def WritePreciosBC3(self, os):
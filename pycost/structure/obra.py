@@ -15,86 +15,46 @@ from dicttoxml import dicttoxml
 import xml.dom.minidom
 import pickle
 import logging
+import concurrent.futures
+import numpy as np
 import pylatex
 from pycost.structure import chapter as cp
 from pycost.structure import unit_price_quantities
+from pycost.structure import budget_totals
 from pycost.utils import percentages as pc
 from pycost.bc3 import codigos_obra as cod
+from pycost.bc3 import codes
 from pycost.prices import elementary_price
 from pycost.prices import unit_price
+from pycost.prices import unit_price_container
+from pycost.prices import price_escalation
 from pycost.utils import pylatex_utils
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
+from pycost.utils import concept_index
 from pycost.bc3 import fiebdc3
-import tempfile
-import re # strip comments
+from pycost.bc3 import bc3_index
+from pycost.bc3 import bc3_writer
 from openpyxl import Workbook
 
 
-def preprocess_file(inputFile):
-    ''' Put each BC3 record in one line.
-
-    :param inputFile: input file.
-    '''
-    separator= '~'
-    def stripComments(code):
-        code = str(code)
-        return re.sub(r'(?m)#.*\n', '\n', code)
-    def each_chunk(stream):
-        buffer = ''
-        while True:  # until EOF
-            chunk = stream.read(4096)
-            if not chunk:  # EOF?
-                yield buffer
-                break
-            buffer+= chunk
-            while True:  # until no separator is found
-                try:
-                    part, buffer = buffer.split(separator, 1)
-                except ValueError:
-                    break
-                else:
-                    yield part
-    def replace_newlines_inside_string(inputString):
-        ''' Replace \n characters between double quotation marks (").
-
-        :param inputString: input string.
-        '''
-        retval= ''
-        insideDoubleQuotation= False
-        for c in inputString:
-            if(c=='"'):
-                insideDoubleQuotation= not insideDoubleQuotation
-            if(c=='\n') and insideDoubleQuotation:
-                c= ' '#'std::endl' # for later processing.
-            retval+= c
-        return retval
-    tmpFile= tempfile.NamedTemporaryFile(suffix='.bc3', mode='w', encoding='utf-8', delete=False)
-    for chunk in each_chunk(inputFile):
-        if(len(chunk)>0):
-            if(chunk[0]=='P'): # Parametric concept.
-                chunk= stripComments(chunk) # Remove comments.
-                chunk= replace_newlines_inside_string(chunk)
-                chunk= re.sub('\n\n+', '\n', chunk) # Remove multiple \n
-                chunk= re.sub('\s+\n', '\n', chunk) # Remove spaces
-                chunk= re.sub('\n\s+', '\n', chunk)
-                chunk= chunk.replace('\t',' ')
-                chunk= chunk.replace('=\n','= ')
-                chunk= chunk.replace('+\n','+ ')
-                chunk= chunk.replace(',\n',', ')
-                chunk= chunk.replace('.\n','. ')
-                chunk= chunk.replace('\n',fiebdc3.parameter_tokens_separator) # replace newline characters.
-            else:    
-                chunk= chunk.replace('\n','') # remove newline characters.
-            chunk= separator+chunk+'\n'
-            tmpFile.write(chunk)  # writing chunk by chunk.
-    tmpFile.close()
-    return tmpFile.name
-
 class Obra(cp.Chapter):
     ''' Construction site class.
 
     :ivar percentages: percentage tables.
+    :ivar budgetTotals: rounded totals of the chapters and quantities
+                        updated by setElementaryPrice (see
+                        computeBudgetTotals).
+    :ivar graphDiagnostics: problems found in the decompositions of the
+                            prices read by the last call to readBC3 (see
+                            validateComponentGraph).
+    :ivar conceptIndex: code -> concept index of the price tables of all
+                        the chapters (see getConceptIndex).
     '''
+    budgetTotals= None
+    graphDiagnostics= None
+    conceptIndex= None
+
     def __init__(self, cod="ObraSinCod", tit="ObraSinTit"):
         ''' Constructor.
 
@@ -105,6 +65,8 @@ class Obra(cp.Chapter):
         elem= elementary_price.ElementaryPrice("SINDESCO",basic_types.sin_desc_string,"",1.0,basic_types.mat)
         self.precios.Elementales().Append(elem)
         self.percentages= pc.Percentages()
+        self.bc3Index= None # Index of a FIEBDC-3 file (see openBC3Index).
+        self.bc3Hashes= None # Hashes of the records read from FIEBDC-3 (see updateFromBC3).
 
     def isRootChapter(self):
         ''' Returns true.'''
@@ -122,20 +84,200 @@ class Obra(cp.Chapter):
         precios.WriteSpre()
         logging.error(u"Exportación de capítulos no implementada." + '\n')
 
+    def openBC3Index(self, fileName, encoding= 'utf-8'):
+        ''' Open the FIEBDC-3 file argument in read-only "index mode": the
+            file is memory-mapped and only the byte offsets of the records of
+            each concept are read. The prices are created when requested
+            by findPrice or getUnitPrice.
+
+        :param fileName: name of the FIEBDC-3 file.
+        :param encoding: encoding of the file.
+        '''
+        self.closeBC3Index()
+        self.bc3Index= bc3_index.BC3Index(fileName, encoding= encoding)
+        return self.bc3Index
+
+    def closeBC3Index(self):
+        ''' Close the FIEBDC-3 file opened in "index mode" (if any). The
+            prices already created are kept.'''
+        if(self.bc3Index is not None):
+            self.bc3Index.close()
+            self.bc3Index= None
+
+    def readPriceFromBC3Index(self, cod):
+        ''' Create the elementary or unit price corresponding to the code
+            argument from the records of the BC3 index (see openBC3Index).
+            The components of the unit prices are created as needed.
+
+        :param cod: code of the price.
+        '''
+        retval= None
+        records= self.bc3Index.getRecords(cod)
+        if(records):
+            key= next(iter(records))
+            record= records[key]
+            if(record.isChapterOrObra() or record.isParametric()):
+                className= type(self).__name__
+                methodName= sys._getframe(0).f_code.co_name
+                logging.warning(className+'.'+methodName+"; concept: '"+str(cod)+"' is not an elementary price nor a unit price.")
+            elif(record.isElementaryCost()):
+                retval= elementary_price.ElementaryPrice()
+                retval.readBC3(records.GetDatosElementaryPrice(key))
+                self.precios.elementos.Append(retval)
+            else:
+                reg= records.getUnitPriceData(key)
+                retval= unit_price.UnitPrice()
+                retval.LeeBC3Fase1(reg)
+                self.precios.unidades.Append(retval) # before reading the components.
+                retval.LeeBC3Fase2(reg, rootChapter= self)
+        return retval
+
+    def __getstate__(self):
+        ''' Return the object state for pickling (without the concept index,
+            it's rebuilt on demand).'''
+        retval= self.__dict__.copy()
+        retval.pop('conceptIndex', None)
+        return retval
+
+    def getConceptIndex(self):
+        ''' Return the code -> concept index of the price tables of all the
+            chapters, building it if needed. The price tables keep it up to
+            date when their concepts are appended or removed; call
+            resetConceptIndex after adding or removing chapters.'''
+        if(self.conceptIndex is None):
+            self.conceptIndex= concept_index.ConceptIndex()
+            for container in self.getPriceContainers():
+                self.conceptIndex.attach(container)
+        return self.conceptIndex
+
+    def resetConceptIndex(self):
+        ''' Discard the concept index (it will be built again when
+            needed).'''
+        if(self.conceptIndex is not None):
+            self.conceptIndex.detach()
+            self.conceptIndex= None
+
+    def getPriceContainers(self):
+        ''' Return the containers of the elementary and compound prices of
+            all the chapters.'''
+        retval= list()
+        for chapter in self.getChaptersDepthFirst():
+            retval.append(chapter.precios.elementos)
+            retval.append(chapter.precios.unidades)
+        return retval
+
+    def checkConceptIndex(self):
+        ''' Compare the concept index with the contents of the price tables
+            and return a list of strings describing the inconsistencies
+            found (empty if there are none).'''
+        return self.getConceptIndex().getInconsistencies(self.getPriceContainers())
+
+    def findPrice(self, cod):
+        ''' Return the concept with the code corresponding to the argument.
+            The concept is searched in the concept index (see
+            getConceptIndex) and, if not found there, in the chapter tree.
+            If not found and there is a BC3 index (see openBC3Index)
+            the concept is created from its records.
+
+        :param cod: code of the concept to find.
+        '''
+        conceptIndex= self.getConceptIndex()
+        retval= conceptIndex.find(cod)
+        if(retval is None): # not indexed or more than one concept with this code.
+            retval= super(Obra,self).findPrice(cod)
+            if(retval and (not conceptIndex.contains(retval))): # chapters added after building the index.
+                self.resetConceptIndex()
+        if((not retval) and (self.bc3Index is not None)):
+            retval= self.readPriceFromBC3Index(cod)
+        return retval
+
     def getUnitPrice(self, cod):
         ''' Tries to return the unit price identified by the code argument.
-            Issues an error if failed.
+            Issues an error and returns None if failed.
 
         :param cod: unit price identifier.
         '''
-        retval= super(Obra,self).findPrice(cod)
+        retval= self.findPrice(cod)
         if not retval:
             className= type(self).__name__
             methodName= sys._getframe(0).f_code.co_name
-            logging.error(className+'.'+methodName+'; unit price: '+ cod + ' not found.')
-            exit(1)
+            logging.error(className+'.'+methodName+'; unit price: '+ str(cod) + ' not found.')
+            retval= None
         return retval
     
+    def computeBudgetTotals(self):
+        ''' Compute the rounded totals of the chapters and the quantities of
+            the project, that setElementaryPrice updates incrementally (they
+            are computed again if the prices, the chapters or their
+            quantities have changed meanwhile, see BudgetTotals.isValid).'''
+        self.budgetTotals= budget_totals.BudgetTotals(self)
+        return self.budgetTotals
+
+    def setElementaryPrice(self, cod, newPrice):
+        ''' Change the price of the elementary price identified by the code
+            argument and return the (object, old value, new value) tuples
+            of the prices and totals that change: the elementary price, the
+            unit prices that depend on it, their quantities and the chapters
+            that contain them (the root chapter last). Only those prices and
+            totals are recomputed.
+
+        :param cod: elementary price identifier.
+        :param newPrice: new price.
+        '''
+        price= self.findPrice(cod)
+        if((not price) or price.isCompound()):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            logging.error(className+'.'+methodName+'; elementary price: '+ str(cod) + ' not found.')
+            return None
+        if((self.budgetTotals is None) or (not self.budgetTotals.isValid(self))):
+            self.computeBudgetTotals()
+        dependentPrices= price.getDependentPrices()
+        oldPrices= [price.getRoundedPrice()]+[p.getRoundedPrice() for p in dependentPrices]
+        price.precio= newPrice # the cached prices of the dependent prices are discarded.
+        retval= list()
+        changedPrices= list()
+        for p, oldPrice in zip([price]+dependentPrices, oldPrices):
+            newRoundedPrice= p.getRoundedPrice()
+            if(newRoundedPrice!=oldPrice):
+                retval.append((p, oldPrice, newRoundedPrice))
+                changedPrices.append(p)
+        retval.extend(self.budgetTotals.update(changedPrices))
+        return retval
+
+    def escalatePrices(self, coefficients):
+        ''' Multiply the elementary prices by the coefficient that corresponds
+            to their type, round the results (see basic_types.ppl_price) and
+            evaluate again all the prices bottom-up (see computeAllPrices).
+            Return a dictionary containing, for each type, the number of
+            escalated prices and the sum of those prices before and after
+            the escalation.
+
+        :param coefficients: dictionary containing the coefficient for each
+                             type (i.e. {basic_types.mdo: 1.05,
+                             basic_types.mat: 1.03}).
+        '''
+        prices= list()
+        visited= set()
+        for concept in self.getConcepts():
+            if((not concept.isCompound()) and (id(concept) not in visited) and (concept.getType() in coefficients)):
+                visited.add(id(concept))
+                prices.append(concept)
+        # Compute all the new prices at once (in hundredths).
+        types= np.array([p.getType() for p in prices])
+        oldPrices= np.array([p.getScaledRoundedPrice() for p in prices], dtype= np.int64)
+        newPrices= price_escalation.get_escalated_prices([p.getPrice() for p in prices], types, coefficients)
+        # Summary.
+        retval= dict()
+        for typo in coefficients:
+            mask= (types==typo)
+            retval[typo]= {'num_prices': int(np.count_nonzero(mask)), 'before': fixed_point.to_decimal(int(oldPrices[mask].sum()), fixed_point.priceScale), 'after': fixed_point.to_decimal(int(newPrices[mask].sum()), fixed_point.priceScale)}
+        for p, newPrice in zip(prices, newPrices.tolist()):
+            p.precio= newPrice/fixed_point.priceScale # discards the cached prices that depend on it.
+        self.computeAllPrices()
+        self.budgetTotals= None # see computeBudgetTotals.
+        return retval
+
     def replacePrices(self, replacementsTable):
         ''' Replace the prices as indicated by the pairs 
             [oldPriceCode, newPriceCode] in the argument table.
@@ -152,10 +294,17 @@ class Obra(cp.Chapter):
                 newReplacementsTable.append([oldPriceCode, newPrice])
         # Call the ancestor method with de-referenced new prices.
         super(Obra, self).replacePrices(newReplacementsTable)
+        self.budgetTotals= None # quantities may have changed.
         
     def CodigoBC3(self):
         return super(Obra,self).CodigoBC3() + "#"
 
+    def clear(self):
+        '''removes all items from the construction site.'''
+        super(Obra,self).clear()
+        self.budgetTotals= None
+        self.resetConceptIndex()
+
     def newChapter(self, cap_padre, cap):
         ''' Appends the chapter to the sub-chapter
             obtained from the string of the form 1\2\1\4.
@@ -257,8 +406,7 @@ class Obra(cp.Chapter):
 
 
     def findChapterMedicion(self,ruta):
-        ruta.pop(-1) #Eliminamos el último elemento que es la posición.
-        return self.BuscaSubcapitulo(ruta)
+        return self.BuscaSubcapitulo(ruta[:-1]) #Sin el último elemento que es la posición.
 
 
     def LeeBC3DatosObra(self, rootChapterDict):
@@ -274,16 +422,20 @@ class Obra(cp.Chapter):
         components= reg.Datos().desc
         self.subcapitulos.newChapters(components)
 
-    def readQuantitiesFromBC3(self, co):
+    def readQuantitiesFromBC3(self, co, quantityCodes= None):
         ''' Read measurements records from a FIEBDC-3 file.
 
         :param co: measurement records.
+        :param quantityCodes: if not None, read only the ~M records with
+                              those codes.
         '''
         retval= True
         med= co.getQuantityData()
         if(len(med)<1):
             logging.info("No quantities in BC3 file.")
         for i in med:
+            if(quantityCodes is not None) and (i.rpartition('@')[0] not in quantityCodes):
+                continue
             reg= med.GetDatosMedicion(i)
             # UnitPrice *ud= precios.searchForUnitPrice(reg.CodigoUnidad())
             tmp= reg.CodigoUnidad()
@@ -324,17 +476,29 @@ class Obra(cp.Chapter):
                         retval= False
         return retval
 
-    def readBC3(self, inputFile):
+    def readBC3(self, inputFile, numWorkers= None):
         ''' Read data from FIEBDC 3 file.
 
         :param inputFile: input file to read from.
+        :param numWorkers: if greater than one, decode the unit prices
+                           using this number of worker processes.
         '''
-        tmpFileName= preprocess_file(inputFile)
-        tmpFile= open(tmpFileName, 'r')
         co= cod.CodigosObra()
         logging.info("Reading FIEBDC 3 records...")
-        co.readBC3(tmpFile) #Reads BC3 records.
+        co.readBC3(inputFile) #Reads BC3 records.
         logging.info("done." + '\n')
+        return self.readBC3Records(co, numWorkers= numWorkers)
+
+    def readBC3Records(self, co, numWorkers= None):
+        ''' Read data from the FIEBDC 3 records argument.
+
+        :param co: FIEBDC 3 records (CodigosObra object).
+        :param numWorkers: if greater than one, decode the unit prices
+                           using this number of worker processes.
+        '''
+        self.bc3Hashes= co.getRecordHashes() # see updateFromBC3
+        self.budgetTotals= None # see computeBudgetTotals
+        self.resetConceptIndex() # chapters will be added.
         logging.info(u"Leyendo estructura de capítulos...")
         self.LeeBC3DatosObra(co.GetDatosObra())
         self.subcapitulos.LeeBC3Caps(co); #Lee capitulos y precios elementales.
@@ -345,13 +509,16 @@ class Obra(cp.Chapter):
 
         #LeeBC3DescFase1(co); #Lee descompuestos de capitulos.
         unitCosts= co.GetDatosUnidades()
-        self.precios.LeeBC3DescompFase1(unitCosts)
+        decodedUnitCosts= None
+        if(numWorkers and (numWorkers>1)):
+            decodedUnitCosts= unit_price_container.Descompuestos.decodeBC3(unitCosts, numWorkers= numWorkers)
+        self.precios.LeeBC3DescompFase1(unitCosts, decodedRecords= decodedUnitCosts)
 
         logging.info("done." + '\n')
         logging.info("Leyendo descomposiciones...")
 
         #pendientes= LeeBC3DescFase2(co); #Lee descomposiciones.
-        pendientes= self.precios.LeeBC3DescompFase2(unitCosts, rootChapter= self)
+        pendientes= self.precios.LeeBC3DescompFase2(unitCosts, rootChapter= self, decodedRecords= decodedUnitCosts)
 
         logging.info("done." + '\n')
         # logging.info("Leyendo precios globales...")
@@ -375,8 +542,135 @@ class Obra(cp.Chapter):
 
         retval= self.readQuantitiesFromBC3(co)
         logging.info("done." + '\n')
+        logging.info("Checking price decompositions...")
+        self.graphDiagnostics= self.validateComponentGraph()
+        if(not self.graphDiagnostics.isValid()):
+            self.graphDiagnostics.logMessages()
+            retval= False
+        logging.info("done." + '\n')
+        return retval
+
+    def updateFromBC3(self, inputFile):
+        ''' Update the object from a new version of the FIEBDC 3 file
+            that was read previously. The hash of the records of each
+            concept is compared with the one stored in the previous
+            import, and only the elementary prices, unit prices and
+            quantities whose records have changed are added, removed or
+            patched. The existing price objects are updated in place, so
+            the references to them remain valid. If any chapter record
+            has changed the chapter tree and its quantities are rebuilt
+            (reusing the existing price objects).
+
+        :param inputFile: input file to read from.
+        :returns: change set: dictionary with the codes of the added, 
+                  removed and modified chapters, elementary prices, unit
+                  prices and quantities (~M record codes).
+        '''
+        co= cod.CodigosObra()
+        co.readBC3(inputFile) #Reads BC3 records.
+        newHashes= co.getRecordHashes()
+        oldHashes= self.bc3Hashes
+        if(oldHashes is None): # Nothing to compare with.
+            oldHashes= dict()
+            for category in newHashes:
+                oldHashes[category]= dict()
+        retval= dict()
+        for category in newHashes:
+            old= oldHashes[category]
+            new= newHashes[category]
+            retval[category]= {'added': [key for key in new if key not in old],
+                               'removed': [key for key in old if key not in new],
+                               'modified': [key for key in new if (key in old) and (old[key]!=new[key])]}
+        if(self.bc3Hashes is None): # First import.
+            self.readBC3Records(co)
+            return retval
+        self.budgetTotals= None # see computeBudgetTotals.
+        elementaryChanges= retval['elementary_prices']
+        unitChanges= retval['unit_prices']
+        # Remove the prices that are no longer in the file.
+        for code in unitChanges['removed']:
+            self.removeConcept(code) # remove its references.
+            if(code in self.precios.unidades.parametricConcepts):
+                self.precios.unidades.removeParametricConcept(code)
+            elif(code in self.precios.unidades.concepts):
+                del self.precios.unidades.concepts[code]
+        for code in elementaryChanges['removed']:
+            self.removeConcept(code)
+        # Update the elementary prices.
+        elementaryPrices= co.GetDatosElementos()
+        for code in elementaryChanges['modified']+elementaryChanges['added']:
+            el= self.findPrice(code)
+            if(el is None) or el.isCompound(): # new price.
+                el= elementary_price.ElementaryPrice()
+                el.readBC3(elementaryPrices.GetDatosElementaryPrice(code))
+                self.precios.elementos.Append(el)
+            else: # patch the existing one.
+                el.readBC3(elementaryPrices.GetDatosElementaryPrice(code))
+        # Update the unit prices.
+        unitCosts= codes.Codigos()
+        for code in unitChanges['modified']+unitChanges['added']:
+            unitCosts[code]= co.GetDatosUnidades()[code]
+        for code in list(unitCosts.keys()):
+            if('$' not in code): # not a parametric concept.
+                ud= self.precios.unidades.Busca(code)
+                if(ud is not None): # patch the existing one.
+                    ud.LeeBC3Fase1(unitCosts.getUnitPriceData(code))
+                    del unitCosts[code] # already read.
+        self.precios.LeeBC3DescompFase1(unitCosts) # new prices.
+        for code in unitChanges['modified']+unitChanges['added']:
+            if('$' not in code):
+                self.precios.unidades.Busca(code).LeeBC3Fase2(co.GetDatosUnidades().getUnitPriceData(code), rootChapter= self)
+        # Update chapters and quantities.
+        chapterChanges= retval['chapters']
+        quantityChanges= retval['quantities']
+        chaptersChanged= (len(chapterChanges['added'])+len(chapterChanges['removed'])+len(chapterChanges['modified'])>0)
+        if(chaptersChanged):
+            self.rebuildChaptersFromBC3(co)
+        else:
+            changedQuantities= quantityChanges['removed']+quantityChanges['modified']
+            for code in changedQuantities:
+                chapterCode, sep, unitPriceCode= code.rpartition('\\')
+                chapter= self.BuscaCodigo(chapterCode)
+                if(chapter is not None):
+                    upq= chapter.quantities.getQuantitiesForPrice(unitPriceCode)
+                    while(upq is not None):
+                        chapter.quantities.remove(upq)
+                        upq= chapter.quantities.getQuantitiesForPrice(unitPriceCode)
+            self.readQuantitiesFromBC3(co, quantityCodes= set(quantityChanges['added']+quantityChanges['modified']))
+        self.bc3Hashes= newHashes
         return retval
 
+    def rebuildChaptersFromBC3(self, co):
+        ''' Rebuild the chapter tree and its quantities from the FIEBDC 3
+            records argument, keeping the existing price objects.
+
+        :param co: FIEBDC 3 records (CodigosObra object).
+        '''
+        self.budgetTotals= None # see computeBudgetTotals.
+        # Existing elementary prices.
+        existingPrices= dict()
+        for chapter in self.getChaptersDepthFirst():
+            existingPrices.update(chapter.precios.elementos.concepts)
+        # Rebuild the chapter tree.
+        self.quantities.clear()
+        self.subcapitulos.clear()
+        self.LeeBC3DatosObra(co.GetDatosObra())
+        self.subcapitulos.LeeBC3Caps(co)
+        # Put the existing price objects in the new chapters.
+        for chapter in self.getChaptersDepthFirst()[1:]:
+            chapterPrices= chapter.precios.elementos.concepts
+            for code in chapterPrices:
+                existingPrice= existingPrices.pop(code, None)
+                if(existingPrice is not None):
+                    chapterPrices[code]= existingPrice
+                    self.precios.elementos.removeConcept(code)
+        self.resetConceptIndex() # new chapters.
+        # The remaining ones belong to the root chapter.
+        for code, existingPrice in existingPrices.items():
+            if(code not in self.precios.elementos.concepts):
+                self.precios.elementos.Append(existingPrice)
+        self.readQuantitiesFromBC3(co)
+
     def ImprLtxPresEjecMat(self, doc, signaturesFileName= 'firmas'):
         ''' Write the budget for material execution.
 
@@ -433,13 +727,32 @@ class Obra(cp.Chapter):
             chapter.append(pylatex.Command('input{'+signaturesFileName+'}'))
         doc.append(chapter)
 
-    def WriteBC3(self, os, pos= ''):
-        os.write("~V|XC, S.L.|FIEBDC-3/2012|pyCost 0.1|\n")
-        self.WritePreciosBC3(os)
-        self.WriteConceptoBC3(os)
-        self.WriteDescompBC3(os)
-        self.WriteQuantitiesBC3(os,pos)
-        self.WriteSubChaptersBC3(os,pos)
+    def WriteBC3(self, os, pos= '', numWorkers= None, bufferSize= 1<<20):
+        ''' Write the construction site in FIEBDC-3 format. The records
+            are accumulated in a buffer and written in large chunks.
+
+        :param os: output stream.
+        :param pos: position string of the root chapter.
+        :param numWorkers: if greater than one, write the sub-chapters
+                           using this number of worker processes.
+        :param bufferSize: number of characters to accumulate before
+                           writing them to the output stream.
+        '''
+        writer= bc3_writer.BC3Writer(os, bufferSize= bufferSize)
+        writer.setChapterPrices(self)
+        writer.write("~V|XC, S.L.|FIEBDC-3/2012|pyCost 0.1|\n")
+        self.WritePreciosBC3(writer)
+        self.WriteConceptoBC3(writer)
+        self.WriteDescompBC3(writer)
+        self.WriteQuantitiesBC3(writer,pos)
+        if(numWorkers and (numWorkers>1) and (len(self.subcapitulos)>1)):
+            tasks= [(i, pos+str(i+1)+'\\') for i in range(len(self.subcapitulos))]
+            with concurrent.futures.ProcessPoolExecutor(max_workers= numWorkers, initializer= bc3_writer.set_worker_root_chapter, initargs= (self,)) as executor:
+                for text in executor.map(bc3_writer.write_subchapter_bc3, tasks):
+                    writer.write(text)
+        else:
+            self.WriteSubChaptersBC3(writer,pos)
+        writer.flush()
 
     def ImprLtxPresGen(self, doc):
         ''' Write the general budget.
@@ -728,6 +1041,7 @@ class Obra(cp.Chapter):
         '''
         super().solvePendingLinks(pendingLinks= pendingLinks)
         self.setOwner(parent= self) # Compute chapters ownership.
+        self.resetConceptIndex() # chapters may have been added.
         return pendingLinks
         
     def readFromYaml(self, inputFileName):
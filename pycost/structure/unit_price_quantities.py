@@ -25,14 +25,19 @@ class UnitPriceQuantities(ptp.UnitPriceQuantitiesBase):
     def getRoundedTotal(self):
         return self.quantities.getRoundedTotal()
 
+    def getScaledRoundedTotal(self):
+        ''' Return the rounded total in thousandths computed with integer
+            arithmetic (see getRoundedTotal).'''
+        return self.quantities.getScaledRoundedTotal()
+
     def readBC3(self, m):
         ''' Read quantities from BC3 record.'''
-        empty= len(m.med.lista_med.lines)==0
-        if(empty):
+        lines= m.med.lista_med
+        if(len(lines)==0):
             rm= mr.MeasurementRecord("",m.med.med_total)
             self.quantities.append(rm)
         else:
-            self.quantities.readBC3(m.med.lista_med.lines)
+            self.quantities.readBC3(lines)
 
     def getDict(self):
         ''' Return a dictionary containing the object data.'''
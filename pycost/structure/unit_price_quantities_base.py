@@ -12,6 +12,7 @@ import logging
 from pycost.prices import unit_price_report
 from pycost.measurements import measurement_detail
 from pycost.utils import basic_types
+from pycost.utils import fixed_point
 from pycost.utils import EntPyCost as epc
 from pycost.utils import pylatex_utils
 
@@ -51,6 +52,13 @@ class UnitPriceQuantitiesBase(epc.EntPyCost):
         retval*= self.getUnitRoundedPrice()
         return retval.quantize(self.ud.places)
 
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price in hundredths computed with integer
+            arithmetic; same value as getRoundedPrice()*100.'''
+        unitScale= 10**self.ud.precision
+        retval= fixed_point.div_half_even(self.getScaledRoundedTotal()*self.ud.getScaledRoundedPrice(), fixed_point.quantityScale)
+        return fixed_point.rescale(retval, unitScale, fixed_point.priceScale)
+
     def getLtxPriceString(self):
         return basic_types.human_readable_currency(self.getRoundedPrice())
 
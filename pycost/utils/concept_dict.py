@@ -16,11 +16,33 @@ class KeyMap(dict):
 
 
 class ConceptDict(epy.EntPyCost):
+    ''' Concept dictionary.
+
+    :ivar concepts: concepts indexed by its code.
+    :ivar conceptIndex: index of the concepts of the project updated when
+                        the concepts of this container are appended or
+                        removed (see concept_index.ConceptIndex and
+                        Obra.getConceptIndex).
+    :ivar revision: counter incremented each time a concept is appended to
+                    or removed from any concept dictionary (used to detect
+                    changes of the price tables, see
+                    price_evaluation.PriceEvaluation.isValid).
+    '''
     #claves= KeyMap() claves key map has been DEPRECATED.
+    conceptIndex= None
+    revision= 0
+    
     def __init__(self):
         ''' Constructor.'''
         super(ConceptDict,self).__init__()
         self.concepts= dict()
+
+    def __getstate__(self):
+        ''' Return the object state for pickling (without the index of the
+            concepts of the project, it's rebuilt on demand).'''
+        retval= self.__dict__.copy()
+        retval.pop('conceptIndex', None)
+        return retval
         
     def __len__(self):
         return len(self.concepts)
@@ -30,6 +52,9 @@ class ConceptDict(epy.EntPyCost):
         key= u.Codigo()
         #self.claves[key]= u
         self.concepts[key]= u
+        ConceptDict.revision+= 1
+        if(self.conceptIndex is not None):
+            self.conceptIndex.register(self, u)
         return u
 
     @staticmethod
@@ -81,7 +106,10 @@ class ConceptDict(epy.EntPyCost):
 
     def clear(self):
         '''removes all items from the container.'''
+        if(self.conceptIndex is not None):
+            self.conceptIndex.unregisterContainer(self)
         self.concepts.clear()
+        ConceptDict.revision+= 1
         
 
 def find_concept(conceptName):
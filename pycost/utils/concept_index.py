@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+''' Hash index code -> concept of the price tables of a project.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+class ConceptIndex(object):
+    ''' Hash index code -> concept of a set of concept containers (the
+        price tables of the chapters of a project). The containers attached
+        to the index update it when concepts are appended or removed (see
+        ConceptDict.Append).
+
+    :ivar entries: dictionary containing, for each code, the list of
+                   (container, concept) pairs of the containers that store
+                   a concept with that code.
+    :ivar containers: containers attached to the index, indexed by their id.
+    '''
+    def __init__(self):
+        ''' Constructor.'''
+        self.entries= dict()
+        self.containers= dict()
+
+    def attach(self, container):
+        ''' Register the concepts of the container argument and keep the
+            index up to date when the container changes.
+
+        :param container: concept container (ConceptDict object).
+        '''
+        container.conceptIndex= self
+        self.containers[id(container)]= container
+        for concept in container.concepts.values():
+            self.register(container, concept)
+
+    def detach(self):
+        ''' Stop updating the index from the attached containers and remove
+            all the entries.'''
+        for container in self.containers.values():
+            if(container.conceptIndex is self):
+                container.conceptIndex= None
+        self.containers.clear()
+        self.entries.clear()
+
+    def register(self, container, concept):
+        ''' Register the concept argument as stored in the given container
+            (replaces the concept with the same code stored in the
+            container, if any).
+
+        :param container: container that stores the concept.
+        :param concept: concept to register.
+        '''
+        code= concept.Codigo()
+        items= [item for item in self.entries.get(code, list()) if item[0] is not container]
+        items.append((container, concept))
+        self.entries[code]= items
+
+    def unregister(self, container, code):
+        ''' Remove the entry of the concept with the given code stored in
+            the container argument.
+
+        :param container: container that stored the concept.
+        :param code: code of the concept.
+        '''
+        items= [item for item in self.entries.get(code, list()) if item[0] is not container]
+        if(items):
+            self.entries[code]= items
+        else:
+            self.entries.pop(code, None)
+
+    def unregisterContainer(self, container):
+        ''' Remove the entries of all the concepts stored in the container
+            argument.
+
+        :param container: container whose concepts will be removed.
+        '''
+        for code in container.concepts:
+            self.unregister(container, code)
+
+    def find(self, code):
+        ''' Return the concept with the given code, or None if there is no
+            such concept or the code corresponds to more than one concept
+            (in that case the chapter tree must be searched to respect its
+            precedence, see Chapter.findPrice).
+
+        :param code: code of the concept to find.
+        '''
+        retval= None
+        items= self.entries.get(code)
+        if(items):
+            retval= items[0][1]
+            for (container, concept) in items:
+                if((concept is not retval) or (container.concepts.get(code) is not concept)):
+                    retval= None
+                    break
+        return retval
+
+    def contains(self, concept):
+        ''' Return true if the concept argument is registered in the index.
+
+        :param concept: concept to search for.
+        '''
+        return any((item[1] is concept) for item in self.entries.get(concept.Codigo(), list()))
+
+    def getInconsistencies(self, containers):
+        ''' Compare the index with the contents of the containers argument
+            and return a list of strings describing the differences found
+            (empty if the index is consistent).
+
+        :param containers: containers that must be indexed (i.e. the price
+                           tables of all the chapters of the project).
+        '''
+        retval= list()
+        expected= dict()
+        for container in containers:
+            if(id(container) not in self.containers):
+                retval.append('container not attached to the index.')
+            for code, concept in container.concepts.items():
+                expected[(id(container), code)]= concept
+        registered= dict()
+        for code, items in self.entries.items():
+            for (container, concept) in items:
+                registered[(id(container), code)]= concept
+        for (containerId, code), concept in expected.items():
+            if(registered.get((containerId, code)) is not concept):
+                retval.append("concept: '"+str(code)+"' is not in the index.")
+        for (containerId, code), concept in registered.items():
+            if(expected.get((containerId, code)) is not concept):
+                retval.append("concept: '"+str(code)+"' is in the index but not in the price tables.")
+        return retval
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+''' Fixed point (scaled integer) arithmetic for the price rounding.
+
+The functions of this module work with integers that represent the
+amounts in hundredths (prices), thousandths (production rates,
+percentages, quantities) or their products, and reproduce exactly the
+rounding made by basic_types.ppl_price, basic_types.ppl_justification,
+basic_types.ppl_percentage, EntFR.getRoundedProduct and
+EntBC3.getRoundedPrice (formatting with a fixed number of decimals, that
+rounds half to even the exact value of the argument) without building
+any string or Decimal object.
+'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from decimal import Decimal
+from pycost.utils import basic_types
+
+priceScale= 10**basic_types.pricePrecision # hundredths.
+justificationScale= 10**basic_types.justificationPrecision # thousandths.
+percentageScale= 10**basic_types.percentagePrecision # thousandths.
+productScale= 1000 # thousandths (see EntFR.precision).
+quantityScale= 1000 # thousandths (see MeasurementRecord.precision).
+
+# Scaled floats greater than this limit are rounded using exact rational
+# arithmetic.
+fastPathLimit= 2.0**50
+# Bound of the relative error of the product of a float by the scale.
+scaledFloatError= 2.0**-52
+
+def div_half_even(numerator, denominator):
+    ''' Return the integer quotient of the arguments rounded half to even.
+
+    :param numerator: integer numerator.
+    :param denominator: positive integer denominator.
+    '''
+    retval, remainder= divmod(numerator, denominator)
+    twice= 2*remainder
+    if((twice>denominator) or ((twice==denominator) and (retval & 1))):
+        retval+= 1
+    return retval
+
+def div_half_up(numerator, denominator):
+    ''' Return the integer quotient of the arguments rounded half away from
+        zero (like decimal.ROUND_HALF_UP).
+
+    :param numerator: integer numerator.
+    :param denominator: positive integer denominator.
+    '''
+    retval, remainder= divmod(abs(numerator), denominator)
+    if(2*remainder>=denominator):
+        retval+= 1
+    if(numerator<0):
+        retval= -retval
+    return retval
+
+def round_scaled(value, scale):
+    ''' Return value*scale rounded half to even to an integer, computed
+        from the exact value of the argument, so
+        Decimal('{0:.2f}'.format(value)) == to_decimal(round_scaled(value, 100), 100).
+
+    :param value: number to round (int, float or Decimal).
+    :param scale: power of ten (100 for hundredths, 1000 for thousandths...).
+    '''
+    if(type(value) is int):
+        return value*scale
+    if(type(value) is float):
+        scaled= value*scale
+        if(abs(scaled)<fastPathLimit):
+            retval= round(scaled)
+            # the product is not exact, but the error only matters near
+            # the ties.
+            if(abs(abs(scaled-retval)-0.5)>abs(scaled)*scaledFloatError):
+                return retval
+    numerator, denominator= value.as_integer_ratio()
+    return div_half_even(numerator*scale, denominator)
+
+def rescale(value, scale, newScale):
+    ''' Return the scaled integer argument expressed with the new scale
+        (rounded half to even if the new scale is smaller).
+
+    :param value: scaled integer.
+    :param scale: power of ten used to scale the value.
+    :param newScale: new scale.
+    '''
+    if(scale==newScale):
+        return value
+    return div_half_even(value*newScale, scale)
+
+def to_decimal(value, scale):
+    ''' Return the Decimal corresponding to the scaled integer argument
+        (i.e. to_decimal(1234, 100) == Decimal('12.34')).
+
+    :param value: scaled integer.
+    :param scale: power of ten used to scale the value.
+    '''
+    return Decimal(value).scaleb(-(len(str(scale))-1))
+
+def ppl_price(price):
+    ''' Return the price in hundredths, rounded as basic_types.ppl_price.
+
+    :param price: price to round.
+    '''
+    return round_scaled(price, priceScale)
+
+def ppl_justification(value):
+    ''' Return the value in thousandths, rounded as
+        basic_types.ppl_justification.
+
+    :param value: value to round.
+    '''
+    return round_scaled(value, justificationScale)
+
+def ppl_percentage(perc):
+    ''' Return the percentage in thousandths, rounded as
+        basic_types.ppl_percentage.
+
+    :param perc: percentage to round.
+    '''
+    return round_scaled(perc, percentageScale)
+
+# Price justification.
+justificationTypes= [basic_types.mdo, basic_types.mat, basic_types.maq, basic_types.sin_clasif]
+justificationUnit= priceScale*productScale # price in hundredths x production rate in thousandths.
+
+def get_justification_total(items, cumulatedPercentages= True):
+    ''' Return the total of a price justification as an integer in units of
+        1/justificationUnit, computed as PriceJustificationList.getTotal.
+
+    :param items: list of (type, isPercentage, price, productionRate) tuples
+                  with the price in hundredths (ignored for the percentages)
+                  and the (rounded) production rate in thousandths.
+    :param cumulatedPercentages: True if the percentages are cumulated.
+    '''
+    typeTotals= dict()
+    percentages= dict()
+    for (typo, isPercentage, price, productionRate) in items:
+        if(isPercentage):
+            percentages.setdefault(typo, list()).append(productionRate)
+        else:
+            typeTotals[typo]= typeTotals.get(typo, 0)+price*productionRate
+    # Base (the labor total is rounded to thousandths).
+    toJustification= justificationUnit//justificationScale
+    base= div_half_even(typeTotals.get(basic_types.mdo, 0), toJustification)*toJustification
+    for typo in justificationTypes[1:]:
+        base+= typeTotals.get(typo, 0)
+    # Percentages.
+    basePrice= div_half_even(base, productScale)
+    percentagesCost= 0
+    for typo in justificationTypes:
+        currentBase= basePrice*productScale
+        for productionRate in percentages.get(typo, list()):
+            total= div_half_even(currentBase, productScale)*productionRate
+            percentagesCost+= total
+            if(cumulatedPercentages):
+                currentBase+= total
+    base= div_half_even(base, toJustification)*toJustification
+    return base+percentagesCost
+
+def get_justification_rounded_total(items, cumulatedPercentages= True):
+    ''' Return the rounded total of a price justification in hundredths,
+        computed as PriceJustificationList.getTotalCP1.
+
+    :param items: list of (type, isPercentage, price, productionRate) tuples
+                  (see get_justification_total).
+    :param cumulatedPercentages: True if the percentages are cumulated.
+    '''
+    total= get_justification_total(items, cumulatedPercentages)
+    return div_half_even(total, productScale)
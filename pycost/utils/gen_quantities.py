@@ -18,6 +18,8 @@ def gen_quantities(currentChapter, cod, lst_med):
     ''' 
     rootChapter= currentChapter.getRootChapter()
     currentPrice= rootChapter.getUnitPrice(cod)
+    if(currentPrice is None): # not found (error already logged).
+        return
     currentQuantities= unit_price_quantities.UnitPriceQuantities(currentPrice)
     for lmed in lst_med:
         txt= lmed[0]
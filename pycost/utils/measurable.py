@@ -7,6 +7,7 @@ __license__= "GPL"
 __version__= "3.0"
 __email__= "l.pereztato@ciccp.es"
 
+import weakref
 from pycost.bc3 import bc3_entity as eBC3
 from pycost.bc3 import codes
 
@@ -15,7 +16,20 @@ class Measurable(eBC3.EntBC3):
 
     :param unidad: unit of measurement.
     :param long_description: description of the measurable thing.
+    :ivar dependents: components (of other prices) that refer to this
+                      object (reverse dependency graph used to invalidate
+                      the cached prices).
+    :ivar cachedRoundedPrice: rounded price computed by the last call to
+                              getRoundedPrice (None if not computed yet).
+    :ivar cachedScaledPrice: rounded price computed by the last call to
+                             getScaledRoundedPrice (None if not computed
+                             yet).
+    :ivar priceRevision: counter incremented each time the price of any
+                         measurable object is invalidated (used to detect
+                         changes of the prices, see
+                         budget_totals.BudgetTotals.isValid).
     '''
+    priceRevision= 0
 
     def __init__(self, cod, tit, ud, ld= None):
         ''' Constructor.
@@ -26,12 +40,92 @@ class Measurable(eBC3.EntBC3):
         :param ld: long description.
         '''
         super(Measurable,self).__init__(cod,tit)
+        self.dependents= weakref.WeakSet()
+        self.cachedRoundedPrice= None
+        self.cachedScaledPrice= None
         self.unidad= ud
         if(ld):
           self.long_description= ld #unicode(ld,encoding='utf-8')
         else:
           self.long_description= ''
 
+    def __getstate__(self):
+        ''' Return the object state for pickling (without the cached prices
+            and the dependents, they are restored by the components, see
+            BC3Component.__setstate__).'''
+        retval= self.__dict__.copy()
+        retval.pop('dependents', None)
+        retval['cachedRoundedPrice']= None
+        retval['cachedScaledPrice']= None
+        return retval
+
+    def __setstate__(self, state):
+        ''' Restore the object state.
+
+        :param state: state returned by __getstate__.
+        '''
+        self.__dict__.update(state)
+        self.__dict__.setdefault('cachedRoundedPrice', None)
+        self.__dict__.setdefault('cachedScaledPrice', None)
+        self.getDependents()
+
+    def getDependents(self):
+        ''' Return the components (of other prices) that refer to this
+            object.'''
+        return self.__dict__.setdefault('dependents', weakref.WeakSet())
+
+    def invalidatePrice(self):
+        ''' Discard the cached price of this object and the prices that
+            depend on it.'''
+        Measurable.priceRevision+= 1
+        self.cachedRoundedPrice= None
+        self.cachedScaledPrice= None
+        for component in list(self.getDependents()):
+            component.invalidateParentPrice()
+
+    def getDirectDependentPrices(self):
+        ''' Return the unit prices whose decomposition contains this object
+            (the components removed from their prices are ignored).'''
+        retval= list()
+        visited= set()
+        for component in list(self.getDependents()):
+            parentPrice= None
+            if(component.parentList is not None):
+                parentPrice= component.parentList.parentPrice
+            if((parentPrice is not None) and (id(parentPrice) not in visited)):
+                visited.add(id(parentPrice))
+                retval.append(parentPrice)
+        return retval
+
+    def getDependentPrices(self):
+        ''' Return the unit prices that depend on this object, directly or
+            through other unit prices.'''
+        retval= list()
+        visited= set()
+        pending= [self]
+        while(pending):
+            concept= pending.pop()
+            for parentPrice in concept.getDirectDependentPrices():
+                if(id(parentPrice) not in visited):
+                    visited.add(id(parentPrice))
+                    retval.append(parentPrice)
+                    pending.append(parentPrice)
+        return retval
+
+    def getRoundedPrice(self):
+        ''' Return the rounded price (computed only once, until something
+            changes).'''
+        if(self.cachedRoundedPrice is None):
+            self.cachedRoundedPrice= super(Measurable,self).getRoundedPrice()
+        return self.cachedRoundedPrice
+
+    def getScaledRoundedPrice(self):
+        ''' Return the rounded price as an integer in units of
+            10**-precision (computed only once, until something changes).'''
+        if(self.cachedScaledPrice is None):
+            self.cachedScaledPrice= super(Measurable,self).getScaledRoundedPrice()
+        return self.cachedScaledPrice
+
     def isCompound(self):
         ''' Return true if it is a compound concept instead of a simple one.'''
         return False
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+''' Deterministic generator of synthetic FIEBDC-3 projects.'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import sys
+import random
+
+# Units of the generated concepts by type (0: unit price, 1: labour,
+# 2: machinery, 3: materials).
+units= {0: ['m', 'm2', 'm3', 'ud', 'kg'], 1: ['h'], 2: ['h'], 3: ['kg', 'm3', 'ud', 't']}
+
+# Parameters and formulas of the parametric concepts ({0} and {1} are
+# the codes of its components and {2} is the concept number).
+parametric_template= '''\\THICKNESS\\10 cm\\20 cm\\30 cm\\
+\\FINISH\\smooth\\rough\\
+%T(3)= 1, 1.5, 2
+{0} : %T(%A)
+{1} : 0.5*(%B=b) + 0.2
+\\ RESUMEN \\ Parametric concept {2} $A $B. \\
+\\ TEXTO \\ Parametric concept {2} with thickness $A and finish $B. \\'''
+
+class SyntheticProject(object):
+    ''' Parameters of a synthetic FIEBDC-3 project.
+
+    :ivar numConcepts: approximate number of concepts (prices) of the
+                       project.
+    :ivar decompositionDepth: number of levels of unit prices (the unit
+                              prices of level i are decomposed in unit
+                              prices of level i-1 and elementary prices).
+    :ivar chapterDepth: number of chapter levels under the root chapter.
+    :ivar numParametric: number of parametric concepts.
+    :ivar numMeasurementLines: number of lines of each measurement.
+    :ivar seed: seed of the random number generator.
+    '''
+    def __init__(self, numConcepts= 10000, decompositionDepth= 2, chapterDepth= 2, numParametric= 10, numMeasurementLines= 3, seed= 1):
+        ''' Constructor.
+
+        :param numConcepts: approximate number of concepts (prices) of
+                            the project.
+        :param decompositionDepth: number of levels of unit prices.
+        :param chapterDepth: number of chapter levels under the root
+                             chapter.
+        :param numParametric: number of parametric concepts.
+        :param numMeasurementLines: number of lines of each measurement.
+        :param seed: seed of the random number generator.
+        '''
+        self.numConcepts= numConcepts
+        self.decompositionDepth= max(decompositionDepth, 1)
+        self.chapterDepth= max(chapterDepth, 1)
+        self.numParametric= numParametric
+        self.numMeasurementLines= numMeasurementLines
+        self.seed= seed
+
+    def getParameters(self):
+        ''' Return a dictionary containing the parameters of the project.'''
+        return {'num_concepts': self.numConcepts, 'decomposition_depth': self.decompositionDepth, 'chapter_depth': self.chapterDepth, 'num_parametric': self.numParametric, 'num_measurement_lines': self.numMeasurementLines, 'seed': self.seed}
+
+    def getNumbers(self):
+        ''' Return the number of elementary prices and unit prices of the
+            project and the branching of its chapter tree.'''
+        numPrices= max(self.numConcepts-self.numParametric, 4)
+        numElementary= max(numPrices*2//5, 2)
+        numUnit= max(numPrices-numElementary, 2)
+        # Each leaf chapter has about 20 unit prices.
+        numLeafs= max(numUnit//(20*self.decompositionDepth), 1)
+        branching= max(int(round(numLeafs**(1.0/self.chapterDepth))), 1)
+        return numElementary, numUnit, branching
+
+    def writeElementaryPrices(self, os, rnd, numElementary):
+        ''' Write the elementary prices and return its codes.
+
+        :param os: output stream.
+        :param rnd: random number generator.
+        :param numElementary: number of elementary prices.
+        '''
+        retval= list()
+        for i in range(numElementary):
+            code= 'E%07d' % i
+            conceptType= 1+i%3
+            unit= units[conceptType][i%len(units[conceptType])]
+            price= rnd.uniform(0.5, 500.0)
+            os.write('~C|'+code+'|'+unit+'|Elementary price '+str(i)+'|'+'{0:.2f}'.format(price)+'|010122|'+str(conceptType)+'|\n')
+            retval.append(code)
+        return retval
+
+    def writeUnitPrices(self, os, rnd, numUnit, elementaryCodes):
+        ''' Write the unit prices and return its codes grouped by levels.
+
+        :param os: output stream.
+        :param rnd: random number generator.
+        :param numUnit: number of unit prices.
+        :param elementaryCodes: codes of the elementary prices.
+        '''
+        retval= [list() for level in range(self.decompositionDepth)]
+        for i in range(numUnit):
+            level= i*self.decompositionDepth//numUnit
+            code= 'U%07d' % i
+            unit= units[0][i%len(units[0])]
+            os.write('~C|'+code+'|'+unit+'|Unit price '+str(i)+'||010122|0|\n')
+            os.write('~T|'+code+'|Long description of the unit price '+str(i)+'.|\n')
+            components= list()
+            for componentCode in rnd.sample(elementaryCodes, min(4, len(elementaryCodes))):
+                components.append(componentCode+'\\1\\'+'{0:.3f}'.format(rnd.uniform(0.01, 5.0))+'\\')
+            if(level>0): # auxiliary unit prices.
+                auxiliaryCodes= retval[level-1]
+                for componentCode in rnd.sample(auxiliaryCodes, min(2, len(auxiliaryCodes))):
+                    components.append(componentCode+'\\1\\'+'{0:.3f}'.format(rnd.uniform(0.01, 2.0))+'\\')
+            os.write('~D|'+code+'|'+''.join(components)+'|\n')
+            retval[level].append(code)
+        return retval
+
+    def writeParametricConcepts(self, os, rnd, elementaryCodes):
+        ''' Write the parametric concepts and return its codes.
+
+        :param os: output stream.
+        :param rnd: random number generator.
+        :param elementaryCodes: codes of the elementary prices.
+        '''
+        retval= list()
+        for i in range(self.numParametric):
+            code= 'P%05d$' % i
+            components= rnd.sample(elementaryCodes, 2)
+            os.write('~C|'+code+'|m2|Parametric concept '+str(i)+'||010122||\n')
+            os.write('~P|'+code+'|'+parametric_template.format(components[0], components[1], i)+'|\n')
+            retval.append(code)
+        return retval
+
+    def writeChapters(self, os, rnd, branching, measuredCodes):
+        ''' Write the chapter tree and the measurements of the unit prices
+            in its leaf chapters. Return the number of leaf chapters.
+
+        :param os: output stream.
+        :param rnd: random number generator.
+        :param branching: number of sub-chapters of each chapter.
+        :param measuredCodes: codes of the unit prices to measure.
+        '''
+        os.write('~C|ROOT##||Synthetic project|||0|\n')
+        chapters= [('ROOT#', list())]
+        for depth in range(self.chapterDepth):
+            newChapters= list()
+            for (parentCode, parentPath) in chapters:
+                subChapters= list()
+                for j in range(branching):
+                    path= parentPath+[str(j+1)]
+                    code= 'C'+'.'.join(path)
+                    newChapters.append((code, path))
+                    subChapters.append(code)
+                os.write('~D|'+parentCode+'#|'+''.join(c+'#\\1\\1\\' for c in subChapters)+'|\n')
+            for (code, path) in newChapters:
+                os.write('~C|'+code+'#||Chapter '+code+'|||0|\n')
+            chapters= newChapters
+        # Measurements in the leaf chapters.
+        retval= len(chapters)
+        for k, (chapterCode, path) in enumerate(chapters):
+            first= k*len(measuredCodes)//retval
+            last= max((k+1)*len(measuredCodes)//retval, first+1)
+            quantities= list()
+            for pos, code in enumerate(measuredCodes[first:last]):
+                lines= list()
+                total= 0.0
+                for n in range(self.numMeasurementLines):
+                    numUnits= rnd.randint(1, 4)
+                    length= round(rnd.uniform(1.0, 10.0), 2)
+                    width= round(rnd.uniform(0.5, 3.0), 2)
+                    total+= numUnits*length*width
+                    lines.append('\\Line '+str(n)+'\\'+str(numUnits)+'\\'+'{0:.2f}'.format(length)+'\\'+'{0:.2f}'.format(width)+'\\\\')
+                quantities.append(code+'\\1\\'+'{0:.3f}'.format(total)+'\\')
+                os.write('~M|'+chapterCode+'#\\'+code+'|'+'\\'.join(path+[str(pos+1)])+'\\|'+'{0:.3f}'.format(total)+'|'+''.join(lines)+'|\n')
+            os.write('~D|'+chapterCode+'#|'+''.join(quantities)+'|\n')
+        return retval
+
+    def write(self, os= sys.stdout):
+        ''' Write the project in FIEBDC-3 format. Return a dictionary with
+            the number of elementary prices, unit prices, parametric
+            concepts and leaf chapters written.
+
+        :param os: output stream.
+        '''
+        rnd= random.Random(self.seed)
+        numElementary, numUnit, branching= self.getNumbers()
+        os.write('~V||FIEBDC-3/2016|pyCost benchmark|\\|utf-8||\n')
+        elementaryCodes= self.writeElementaryPrices(os, rnd, numElementary)
+        unitCodesByLevel= self.writeUnitPrices(os, rnd, numUnit, elementaryCodes)
+        parametricCodes= self.writeParametricConcepts(os, rnd, elementaryCodes)
+        # Only the unit prices of the last level are measured.
+        numLeafs= self.writeChapters(os, rnd, branching, unitCodesByLevel[-1])
+        return {'elementary_prices': numElementary, 'unit_prices': numUnit, 'parametric_concepts': len(parametricCodes), 'leaf_chapters': numLeafs}
+
+def write_project(outputFileName, **kwargs):
+    ''' Write a synthetic project in the file argument and return the
+        number of concepts written (see SyntheticProject.write).
+
+    :param outputFileName: name of the output file.
+    :param kwargs: parameters of the project (see SyntheticProject).
+    '''
+    project= SyntheticProject(**kwargs)
+    with open(outputFileName, mode= 'w', encoding= 'utf-8') as outputFile:
+        retval= project.write(outputFile)
+    return retval
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+''' Run the benchmark scenarios on a synthetic FIEBDC-3 project, write the
+    results in a JSON file and compare them with a stored baseline.
+
+Example:
+
+    python run_benchmarks.py --concepts 100000 --output results.json --baseline baseline.json
+'''
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import sys
+import io
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import pylatex
+from openpyxl import Workbook
+from pycost.structure import obra
+from pycost.prices import price_matrix
+from pycost.utils import fixed_point
+import bc3_generator
+
+def scenario_generate(context):
+    ''' Write the synthetic project.'''
+    with open(context['bc3_file'], mode= 'w', encoding= 'utf-8') as outputFile:
+        context['project'].write(outputFile)
+
+def scenario_import_bc3(context):
+    ''' Read the synthetic project.'''
+    site= obra.Obra(cod= 'benchmark', tit= 'Benchmark')
+    with open(context['bc3_file'], mode= 'r', encoding= 'utf-8') as inputFile:
+        site.readBC3(inputFile)
+    context['site']= site
+
+def scenario_price_evaluation(context):
+    ''' Compute the price of the project (float and rounded).'''
+    site= context['site']
+    context['price']= site.getPrice()
+    context['rounded_price']= site.getRoundedPrice()
+
+def get_rounding_workload(site):
+    ''' Return the component lists of the unit prices and the quantities
+        of the chapters of the project.'''
+    componentLists= list()
+    for concept in site.getConcepts():
+        if(concept.isCompound()):
+            componentLists.append(concept.components)
+    quantities= list()
+    pending= [site]
+    while(pending):
+        chapter= pending.pop()
+        quantities.append(chapter.quantities)
+        pending.extend(chapter.subcapitulos)
+    return componentLists, quantities
+
+def scenario_decimal_rounding(context):
+    ''' Compute the rounded prices of the unit prices and the quantities
+        using Decimal arithmetic.'''
+    componentLists, quantities= get_rounding_workload(context['site'])
+    prices= [components.getRoundedPrice() for components in componentLists]
+    prices.extend(q.getRoundedPrice() for q in quantities)
+    context['decimal_rounding']= prices
+
+def scenario_fixed_point_rounding(context):
+    ''' Compute the rounded prices of the unit prices and the quantities
+        using integer arithmetic.'''
+    componentLists, quantities= get_rounding_workload(context['site'])
+    prices= [components.getScaledRoundedPrice() for components in componentLists]
+    prices.extend(q.getScaledRoundedPrice() for q in quantities)
+    context['fixed_point_rounding']= prices
+
+def scenario_price_matrix(context):
+    ''' Compute all the prices and the elementary quantities of the project
+        using sparse matrices.'''
+    site= context['site']
+    matrix= price_matrix.PriceMatrix(site.getConcepts())
+    context['price_matrix']= matrix.getPrices()
+    context['elementary_quantities']= matrix.getElementaryQuantities(site.getQuantitiesReport())
+
+def scenario_export_bc3(context):
+    ''' Write the project in FIEBDC-3 format.'''
+    context['site'].WriteBC3(io.StringIO())
+
+def scenario_latex_output(context):
+    ''' Write the budget in LaTeX format.'''
+    doc= pylatex.Document(documentclass= 'book')
+    context['site'].writeIntoLatexDocument(doc)
+    doc.dumps()
+
+def scenario_spreadsheet_output(context):
+    ''' Write the quantities, prices and budget in a spreadsheet.'''
+    site= context['site']
+    book= Workbook()
+    site.writeSpreadsheetQuantities(book.create_sheet('Mediciones'))
+    book.create_sheet('CuaPre1')
+    book.create_sheet('Elementales')
+    site.precios.writeSpreadsheet(book)
+    site.writeSpreadsheetBudget(book.create_sheet('PreParc'))
+    book.save(os.path.join(context['tmp_dir'], 'benchmark.xlsx'))
+
+def scenario_json_round_trip(context):
+    ''' Write the project in JSON format and read it back.'''
+    fileName= os.path.join(context['tmp_dir'], 'benchmark.json')
+    context['site'].writeJson(fileName)
+    site= obra.Obra(cod= 'benchmark', tit= 'Benchmark')
+    site.readFromJson(fileName)
+
+def scenario_yaml_round_trip(context):
+    ''' Write the project in YAML format and read it back.'''
+    fileName= os.path.join(context['tmp_dir'], 'benchmark.yaml')
+    context['site'].writeYaml(fileName)
+    site= obra.Obra(cod= 'benchmark', tit= 'Benchmark')
+    site.readFromYaml(fileName)
+
+# Scenarios in execution order (each one may use the results of the
+# previous ones).
+scenarios= {'generate': scenario_generate,
+            'import_bc3': scenario_import_bc3,
+            'price_evaluation': scenario_price_evaluation,
+            'decimal_rounding': scenario_decimal_rounding,
+            'fixed_point_rounding': scenario_fixed_point_rounding,
+            'price_matrix': scenario_price_matrix,
+            'export_bc3': scenario_export_bc3,
+            'latex_output': scenario_latex_output,
+            'spreadsheet_output': scenario_spreadsheet_output,
+            'json_round_trip': scenario_json_round_trip,
+            'yaml_round_trip': scenario_yaml_round_trip}
+
+# Scenarios that are always executed because the other ones need them.
+required_scenarios= ['generate', 'import_bc3']
+
+def run_scenario(scenario, context, trackMemory= True):
+    ''' Run the scenario argument and return a dictionary with the elapsed
+        time (seconds) and the peak of memory allocated (bytes).
+
+    :param scenario: function to run.
+    :param context: dictionary to share data between scenarios.
+    :param trackMemory: if true, measure the memory allocated with
+                        tracemalloc (the elapsed times increase).
+    '''
+    retval= dict()
+    if(trackMemory):
+        tracemalloc.start()
+    start= time.perf_counter()
+    scenario(context)
+    retval['time']= time.perf_counter()-start
+    if(trackMemory):
+        current, peak= tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retval['peak_memory']= peak
+    return retval
+
+def run_benchmarks(project, scenarioNames= None, trackMemory= True):
+    ''' Run the benchmark scenarios on the synthetic project argument and
+        return the results.
+
+    :param project: synthetic project (SyntheticProject object).
+    :param scenarioNames: names of the scenarios to run (if None run all
+                          of them).
+    :param trackMemory: if true, measure the memory allocated by each
+                        scenario.
+    '''
+    if(scenarioNames is None):
+        scenarioNames= list(scenarios.keys())
+    retval= {'python': platform.python_version(),
+             'platform': platform.platform(),
+             'project': project.getParameters(),
+             'track_memory': trackMemory,
+             'scenarios': dict()}
+    logging.disable(logging.WARNING) # the output of the scenarios is not checked here.
+    with tempfile.TemporaryDirectory() as tmpDir:
+        context= {'project': project, 'tmp_dir': tmpDir, 'bc3_file': os.path.join(tmpDir, 'benchmark.bc3')}
+        for name, scenario in scenarios.items():
+            if(name in scenarioNames) or (name in required_scenarios):
+                retval['scenarios'][name]= run_scenario(scenario, context, trackMemory= trackMemory)
+        retval['price']= context['site'].getPrice()
+        if(('decimal_rounding' in context) and ('fixed_point_rounding' in context)): # both paths must give the same values.
+            mismatches= 0
+            for decimalPrice, scaledPrice in zip(context['decimal_rounding'], context['fixed_point_rounding']):
+                if(decimalPrice!=fixed_point.to_decimal(scaledPrice, fixed_point.priceScale)):
+                    mismatches+= 1
+            retval['rounding_mismatches']= mismatches
+    logging.disable(logging.NOTSET)
+    return retval
+
+def compare_results(results, baseline, tolerance= 0.2):
+    ''' Compare the results with the baseline argument and return a list
+        of tuples (scenario, metric, baseline value, value, ratio,
+        regression) where regression is true if the ratio exceeds
+        1+tolerance.
+
+    :param results: benchmark results.
+    :param baseline: baseline results.
+    :param tolerance: relative increase considered a regression.
+    '''
+    retval= list()
+    if(results['project']!=baseline['project']):
+        logging.warning('the project parameters are not the same as those of the baseline.')
+    for name, values in results['scenarios'].items():
+        baselineValues= baseline['scenarios'].get(name, None)
+        if(baselineValues is None):
+            continue
+        for metric, value in values.items():
+            baselineValue= baselineValues.get(metric, None)
+            if(baselineValue):
+                ratio= value/baselineValue
+                retval.append((name, metric, baselineValue, value, ratio, ratio>1.0+tolerance))
+    return retval
+
+def main(argv= None):
+    parser= argparse.ArgumentParser(description= 'Run pyCost benchmarks on a synthetic FIEBDC-3 project.')
+    parser.add_argument('--concepts', type= int, default= 10000, help= 'number of concepts of the project (i.e. 10000, 100000, 1000000).')
+    parser.add_argument('--decomposition-depth', type= int, default= 2, help= 'number of levels of unit prices.')
+    parser.add_argument('--chapter-depth', type= int, default= 2, help= 'number of chapter levels.')
+    parser.add_argument('--parametric', type= int, default= 10, help= 'number of parametric concepts.')
+    parser.add_argument('--measurement-lines', type= int, default= 3, help= 'number of lines of each measurement.')
+    parser.add_argument('--seed', type= int, default= 1, help= 'seed of the random number generator.')
+    parser.add_argument('--scenarios', default= None, help= 'comma separated list of scenarios to run ('+', '.join(scenarios.keys())+').')
+    parser.add_argument('--no-memory', action= 'store_true', help= 'do not measure the memory allocations (faster).')
+    parser.add_argument('--output', default= None, help= 'JSON file to write the results into.')
+    parser.add_argument('--baseline', default= None, help= 'JSON file with the results to compare with.')
+    parser.add_argument('--tolerance', type= float, default= 0.2, help= 'relative increase considered a regression.')
+    args= parser.parse_args(argv)
+
+    project= bc3_generator.SyntheticProject(numConcepts= args.concepts, decompositionDepth= args.decomposition_depth, chapterDepth= args.chapter_depth, numParametric= args.parametric, numMeasurementLines= args.measurement_lines, seed= args.seed)
+    scenarioNames= None
+    if(args.scenarios):
+        scenarioNames= args.scenarios.split(',')
+    results= run_benchmarks(project, scenarioNames= scenarioNames, trackMemory= not args.no_memory)
+    for name, values in results['scenarios'].items():
+        line= '{0:<20} {1:10.3f} s'.format(name, values['time'])
+        if('peak_memory' in values):
+            line+= ' {0:10.1f} MB'.format(values['peak_memory']/1e6)
+        print(line)
+    if('rounding_mismatches' in results):
+        print('{0:<20} {1:10d}'.format('rounding_mismatches', results['rounding_mismatches']))
+    if(args.output):
+        with open(args.output, mode= 'w') as outputFile:
+            json.dump(results, outputFile, indent= 2)
+    retval= 0
+    if(args.baseline):
+        with open(args.baseline, mode= 'r') as inputFile:
+            baseline= json.load(inputFile)
+        for (name, metric, baselineValue, value, ratio, regression) in compare_results(results, baseline, tolerance= args.tolerance):
+            print('{0:<20} {1:<12} {2:8.3f}{3}'.format(name, metric, ratio, ' REGRESSION' if regression else ''))
+            if(regression):
+                retval= 1
+    return retval
+
+if __name__ == '__main__':
+    sys.exit(main())
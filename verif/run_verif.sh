@@ -42,6 +42,9 @@ python tests/raw_pycost/test_05.py
 python tests/raw_pycost/test_06.py
 python tests/raw_pycost/test_07.py
 python tests/raw_pycost/test_indirect_cost.py
+python tests/raw_pycost/test_price_cache.py
+python tests/raw_pycost/test_fixed_point.py
+python tests/raw_pycost/test_elementary_factors.py
 
 echo "$BLEU" "  Misc tests." "$NORMAL"
 python tests/test_bad_price_component.py
@@ -54,6 +57,8 @@ python tests/database_manipulation/test_employed_prices_01.py
 python tests/database_manipulation/test_employed_prices_02.py
 python tests/database_manipulation/test_concept_substitution_01.py
 python tests/database_manipulation/test_remove_concept_01.py
+python tests/database_manipulation/test_reverse_dependency_index.py
+python tests/database_manipulation/test_concept_index.py
 python tests/database_manipulation/test_quantities_report_01.py
 python tests/database_manipulation/test_quantities_report_02.py
 python tests/database_manipulation/test_quantities_report_03.py
@@ -79,6 +84,26 @@ python tests/bc3/test_parametric_concept_03.py
 python tests/bc3/test_parametric_concept_04.py
 python tests/bc3/test_parametric_concept_05.py
 python tests/bc3/test_measurements_outside_chapter.py
+python tests/bc3/test_tokenize_records.py
+python tests/bc3/test_record_views_cache.py
+python tests/bc3/test_concept_classification.py
+python tests/bc3/test_parent_chapters_index.py
+python tests/bc3/test_read_bc3_parallel.py
+python tests/bc3/test_bc3_index_mode.py
+python tests/bc3/test_measurement_record_decoding.py
+python tests/bc3/test_update_from_bc3.py
+python tests/bc3/test_write_bc3_buffered.py
+python tests/bc3/test_synthetic_bc3_generator.py
+python tests/bc3/test_parametric_compiled_formulas.py
+python tests/bc3/test_parametric_bulk_instantiation.py
+python tests/bc3/test_parametric_instance_cache.py
+python tests/bc3/test_parametric_text_templates.py
+python tests/bc3/test_parametric_index.py
+python tests/bc3/test_compute_all_prices.py
+python tests/bc3/test_price_matrix.py
+python tests/bc3/test_set_elementary_price.py
+python tests/bc3/test_component_graph_validation.py
+python tests/bc3/test_escalate_prices.py
 echo "$BLEU" "  YAML read tests." "$NORMAL"
 python tests/yaml/test_read_yaml_01.py
 python tests/yaml/test_read_yaml_02.py
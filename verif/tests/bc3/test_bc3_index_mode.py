@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+'''Check the read-only "index mode" for FIEBDC-3 files.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.structure import obra
+
+import os
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+fileName= pth+'/../data/bc3/test_file_05.bc3'
+
+# Full import.
+site= obra.Obra(cod="test", tit="Test title")
+with open(fileName, mode='r', encoding="utf-8") as inputFile:
+    site.readBC3(inputFile)
+refUnitPrice= site.getUnitPrice('DMOVI3001')
+refElementaryPrice= site.findPrice('PEON')
+
+# Index mode.
+catalogue= obra.Obra(cod="catalogue", tit="Catalogue")
+index= catalogue.openBC3Index(fileName, encoding= 'utf-8')
+numIndexedConcepts= len(index)
+unitPrice= catalogue.getUnitPrice('DMOVI3001')
+elementaryPrice= catalogue.findPrice('PEON')
+notFound= catalogue.findPrice('THIS_CODE_DOES_NOT_EXIST')
+numUnitPrices= len(catalogue.precios.unidades)
+numElementaryPrices= len(catalogue.precios.elementos)
+catalogue.closeBC3Index()
+
+# Empty file.
+emptyFileName= pth+'/empty_index_mode.bc3'
+open(emptyFileName, mode='w').close()
+emptyCatalogue= obra.Obra(cod="empty", tit="Empty catalogue")
+emptyIndex= emptyCatalogue.openBC3Index(emptyFileName, encoding= 'utf-8')
+numEmptyIndexedConcepts= len(emptyIndex)
+emptyNotFound= emptyCatalogue.findPrice('PEON')
+emptyCatalogue.closeBC3Index()
+os.remove(emptyFileName)
+
+'''
+print(numIndexedConcepts)
+print(unitPrice.Codigo(), unitPrice.getTitle(), unitPrice.getPrice(), refUnitPrice.getPrice())
+print(elementaryPrice.Codigo(), elementaryPrice.getPrice(), refElementaryPrice.getPrice())
+print(numUnitPrices, numElementaryPrices)
+'''
+
+testOK= (numIndexedConcepts>300) and (notFound is None)
+testOK= testOK and (unitPrice.getPrice()==refUnitPrice.getPrice())
+testOK= testOK and (unitPrice.getTitle()==refUnitPrice.getTitle())
+testOK= testOK and (unitPrice.getLongDescription()==refUnitPrice.getLongDescription())
+testOK= testOK and (elementaryPrice.getPrice()==refElementaryPrice.getPrice())
+# Only the requested prices and its components have been created.
+testOK= testOK and (numUnitPrices==1) and (numElementaryPrices==5) # SINDESCO + 4 components.
+testOK= testOK and (catalogue.bc3Index is None)
+testOK= testOK and (numEmptyIndexedConcepts==0) and (emptyNotFound is None)
+
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+'''Check the validation of the price decompositions (cycles and references
+   to concepts that don't exist) after reading a FIEBDC-3 file.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+import os
+import logging
+from pycost.structure import obra
+from pycost.prices import price_table
+from pycost.prices import unit_price
+from pycost.prices import elementary_price
+from pycost.prices import graph_validation
+from pycost.utils import basic_types
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+# UP1 refers to a material that doesn't exist and UP2, UP3 and UP4 form a
+# cycle.
+bc3= '''~V||FIEBDC-3/2016|pyCost|\\|utf-8||
+~C|ROOT##||Root chapter||||
+~D|ROOT##|01#\\1\\1\\|
+~C|01#||Chapter 01||||
+~D|01#|UP1\\1\\10\\|
+~C|UP1|m3|Unit price 1|||||
+~D|UP1|mt01\\1\\2\\mt99\\1\\1\\|
+~C|UP2|m2|Unit price 2|||||
+~D|UP2|mt01\\1\\3\\UP3\\1\\1\\|
+~C|UP3|m2|Unit price 3|||||
+~D|UP3|UP4\\1\\1\\|
+~C|UP4|m2|Unit price 4|||||
+~D|UP4|UP2\\1\\1\\|
+~C|mt01|kg|Material 01|1.00|||3|
+~M|01#\\UP1|1\\1\\|10|
+'''
+site= obra.Obra(cod="test", tit="Test title")
+logging.disable(logging.ERROR) # Don't print the error messages.
+ok= site.readBC3(io.StringIO(bc3))
+missingPrice= site.getUnitPrice('mt99') # returns None instead of exiting.
+logging.disable(logging.NOTSET)
+diagnostics= site.graphDiagnostics
+up1= site.findPrice('UP1')
+# The price of UP1 is computed with the components that exist.
+price1= up1.getRoundedPrice()
+# The diagnostics can be serialized.
+dct= diagnostics.getDict()
+
+# A valid project.
+validSite= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+validOK= validSite.readBC3(inputFile)
+inputFile.close()
+validDiagnostics= validSite.graphDiagnostics
+
+# References to concepts that are not in the price tables and deep
+# decompositions.
+table= price_table.CuaPre()
+brick= elementary_price.ElementaryPrice(cod= 'BRICK', tit= 'Brick', ud= 'u', p= 0.2, tp= basic_types.mat)
+previous= brick
+for i in range(5000):
+    up= unit_price.UnitPrice(cod= 'WALL'+str(i), desc= 'Wall', ud= 'm2')
+    up.Append(previous, 1.0, 1.0)
+    table.unidades.Append(up)
+    previous= up
+deepDiagnostics= graph_validation.validate_component_graph(table.getConcepts())
+
+'''
+print(ok, missingPrice, price1)
+print(diagnostics.getMessages())
+print(dct)
+print(validOK, validDiagnostics.isValid(), validDiagnostics.numConcepts, validDiagnostics.numComponents)
+print(deepDiagnostics.getMessages(), deepDiagnostics.numConcepts)
+'''
+
+testOK= (not ok) and (missingPrice is None) and (not diagnostics.isValid())
+testOK= testOK and (diagnostics.danglingReferences==[('UP1', 'mt99')])
+testOK= testOK and (len(diagnostics.cycles)==1) and (sorted(diagnostics.cycles[0])==['UP2', 'UP3', 'UP4'])
+testOK= testOK and (diagnostics.unregisteredReferences==[]) and (price1==2)
+testOK= testOK and (dct['dangling_references']==[['UP1', 'mt99']]) and (len(diagnostics.getMessages())==2)
+testOK= testOK and validOK and validDiagnostics.isValid() and (validDiagnostics.numConcepts>300)
+testOK= testOK and (deepDiagnostics.unregisteredReferences==[('WALL0', 'BRICK')]) and (deepDiagnostics.cycles==[]) and (deepDiagnostics.numConcepts==5001)
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+'''Check the bottom-up evaluation of all the prices of a project.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import logging
+from pycost.structure import obra
+from pycost.prices import price_table
+from pycost.prices import unit_price
+from pycost.prices import elementary_price
+from pycost.utils import basic_types
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+def read_site():
+    ''' Read the test project.'''
+    retval= obra.Obra(cod="test", tit="Test title")
+    inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+    retval.readBC3(inputFile)
+    inputFile.close()
+    return retval
+
+# Evaluate all the prices at once.
+site= read_site()
+evaluation= site.computeAllPrices()
+# Evaluate each price on its own.
+refSite= read_site()
+refPrices= dict()
+for concept in refSite.getConcepts():
+    refPrices[concept.Codigo()]= concept.getRoundedPrice()
+sameValues= (evaluation.prices==refPrices)
+# Each concept comes after the concepts of its decomposition.
+position= dict((code, i) for (i, code) in enumerate(evaluation.order))
+ordered= True
+for concept in site.getConcepts():
+    for component in getattr(concept, 'components', list()):
+        ordered= ordered and (position[component.ent.Codigo()]<position[concept.Codigo()])
+# Read the prices from the table.
+code= evaluation.order[-1]
+computedPrice= site.precios.getComputedPrice(code)
+
+# The table is computed again when the prices change.
+site.setElementaryPrice('PEON', 2*site.findPrice('PEON').getPrice())
+changedPrices= dict((code, site.precios.getComputedPrice(code)) for code in refPrices)
+refChangedPrices= dict((concept.Codigo(), concept.getRoundedPrice()) for concept in site.getConcepts())
+updatedOK= (changedPrices==refChangedPrices) and (changedPrices!=refPrices)
+# or when a concept is replaced.
+peon= site.findPrice('PEON')
+site.precios.elementos.Append(elementary_price.ElementaryPrice(cod= 'PEON', tit= peon.getTitle(), ud= peon.Unidad(), p= 3*peon.getPrice(), tp= peon.getType()))
+updatedOK= updatedOK and (site.precios.getComputedPrice('PEON')==site.findPrice('PEON').getRoundedPrice())
+
+# Cycles are reported.
+table= price_table.CuaPre()
+brick= table.newElementaryPrice(code= 'BRICK', shortDescription= 'Brick', price= 0.2, typ= basic_types.mat, unit= 'u')
+wallA= unit_price.UnitPrice(cod= 'WALLA', desc= 'Wall A', ud= 'm2')
+wallB= unit_price.UnitPrice(cod= 'WALLB', desc= 'Wall B', ud= 'm2')
+wallC= unit_price.UnitPrice(cod= 'WALLC', desc= 'Wall C', ud= 'm2')
+wallA.Append(brick, 1.0, 50.0)
+wallA.Append(wallB, 1.0, 1.0)
+wallB.Append(wallA, 1.0, 1.0)
+wallC.Append(wallB, 1.0, 1.0)
+for up in [wallA, wallB, wallC]:
+    table.unidades.Append(up)
+logging.disable(logging.ERROR) # Don't print the error message.
+cyclicEvaluation= table.computeAllPrices()
+logging.disable(logging.NOTSET)
+
+'''
+print(len(evaluation), len(refPrices), sameValues, ordered, computedPrice, updatedOK)
+print(cyclicEvaluation.prices, cyclicEvaluation.cycles)
+'''
+
+testOK= (len(evaluation)>100) and sameValues and ordered
+testOK= testOK and (computedPrice==refPrices[code]) and updatedOK
+testOK= testOK and (cyclicEvaluation.prices=={'BRICK': brick.getRoundedPrice()})
+testOK= testOK and (len(cyclicEvaluation.cycles)==1) and (sorted(cyclicEvaluation.cycles[0])==['WALLA', 'WALLB'])
+testOK= testOK and (table.getComputedPrice('BRICK')==brick.getRoundedPrice())
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
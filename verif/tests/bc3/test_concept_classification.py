@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+'''Check the classification of the BC3 records in chapters, elementary
+   prices and unit prices.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+from pycost.bc3 import bc3_record
+from pycost.bc3 import codigos_obra
+
+bc3Text= '''~V||FIEBDC-3/2016|pyCost|\\|utf-8||
+~C|ROOT##||Root chapter||||
+~D|ROOT##|01#\\1\\1\\02#\\1\\1\\|
+~C|01#||Chapter 01||||
+~D|01#|EAS010\\1\\1\\|
+~C|02#||Chapter 02 (empty)||||
+~C|EAS010|kg|Steel||||
+~D|EAS010|mo045\\1\\0.02\\mt07ala010\\1\\1.05\\|
+~C|mo045|h|Welder|19.28|||1|
+~C|mt07ala010|kg|Steel profile|1.34|||3|
+~M|01#\\EAS010|1\\1\\|100|\\\\10\\10\\\\\\|
+'''
+
+co= codigos_obra.CodigosObra()
+co.readBC3(io.StringIO(bc3Text))
+
+buckets= co.GetDatosCaps().getConceptTypeBuckets()
+conceptTypes= set(buckets.keys())
+
+'''
+print('chapters: ', sorted(co.GetDatosCaps().keys()))
+print('elementary prices: ', sorted(co.GetDatosElementos().keys()))
+print('unit prices: ', sorted(co.GetDatosUnidades().keys()))
+print('quantities: ', len(co.getQuantityData()))
+print('concept types: ', conceptTypes)
+'''
+
+testOK= (sorted(co.GetDatosCaps().keys())==['01#', '02#', 'ROOT##'])
+testOK= testOK and (sorted(co.GetDatosElementos().keys())==['mo045', 'mt07ala010'])
+testOK= testOK and (list(co.GetDatosUnidades().keys())==['EAS010'])
+testOK= testOK and (len(co.getQuantityData())==1) and (len(co.resto)==0)
+testOK= testOK and (conceptTypes=={bc3_record.obra, bc3_record.capitulo})
+testOK= testOK and (co.GetDatosCaps()['02#'].getConceptType()==bc3_record.capitulo) # chapter without components.
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+'''Check the escalation of the elementary prices of a project by type.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import logging
+from decimal import Decimal
+from pycost.structure import obra
+from pycost.prices import price_escalation
+from pycost.utils import basic_types
+from pycost.utils import fixed_point
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+def read_site():
+    ''' Read the test project.'''
+    retval= obra.Obra(cod="test", tit="Test title")
+    inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+    retval.readBC3(inputFile)
+    inputFile.close()
+    return retval
+
+coefficients= {basic_types.mdo: 1.05, basic_types.maq: 1.02, basic_types.mat: 0.97}
+site= read_site()
+initialTotal= site.getRoundedPrice()
+site.computeBudgetTotals()
+summary= site.escalatePrices(coefficients)
+finalTotal= site.getRoundedPrice()
+budgetTotalsReset= (site.budgetTotals is None)
+
+# Compare with the escalation of the prices one by one.
+refSite= read_site()
+refSummary= dict()
+for concept in refSite.getConcepts():
+    if((not concept.isCompound()) and (concept.getType() in coefficients)):
+        before= concept.getRoundedPrice()
+        concept.precio= float(basic_types.ppl_price(concept.precio*coefficients[concept.getType()]))
+        item= refSummary.setdefault(concept.getType(), [0, Decimal(0), Decimal(0)])
+        item[0]+= 1
+        item[1]+= before
+        item[2]+= concept.getRoundedPrice()
+samePrices= True
+numUnitPrices= 0
+for concept, refConcept in zip(site.getConcepts(), refSite.getConcepts()):
+    samePrices= samePrices and (concept.Codigo()==refConcept.Codigo()) and (concept.getRoundedPrice()==refConcept.getRoundedPrice())
+    if(concept.isCompound()):
+        numUnitPrices+= 1
+        # Prices evaluated bottom-up after the escalation.
+        samePrices= samePrices and (site.precios.getComputedPrice(concept.Codigo())==refConcept.getRoundedPrice())
+sameSummary= True
+for typo in coefficients:
+    item= summary[typo]
+    sameSummary= sameSummary and ([item['num_prices'], item['before'], item['after']]==refSummary[typo])
+# Unclassified prices are not modified.
+unclassifiedOK= all(c.getRoundedPrice()==rc.getRoundedPrice() for c, rc in zip(site.getConcepts(), refSite.getConcepts()) if((not c.isCompound()) and (c.getType()==basic_types.sin_clasif)))
+
+# Vectorized rounding (ties included).
+prices= [0.125, 0.375, 1.005, 2.675, 10.0, 3.3333, 1e16]
+types= [basic_types.mdo, basic_types.mat, basic_types.sin_clasif, basic_types.mdo, basic_types.maq, basic_types.mat, basic_types.mat]
+escalated= price_escalation.get_escalated_prices(prices, types, coefficients).tolist()
+roundingOK= (escalated==[fixed_point.ppl_price(p*coefficients.get(t, 1.0)) for p, t in zip(prices, types)])
+
+'''
+print(initialTotal, finalTotal, refSite.getRoundedPrice())
+print(summary)
+print(samePrices, sameSummary, unclassifiedOK, numUnitPrices, budgetTotalsReset, roundingOK)
+'''
+
+testOK= samePrices and sameSummary and unclassifiedOK and budgetTotalsReset and roundingOK
+testOK= testOK and (numUnitPrices>100) and (summary[basic_types.mdo]['num_prices']>0)
+testOK= testOK and (finalTotal==refSite.getRoundedPrice()) and (finalTotal!=initialTotal)
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
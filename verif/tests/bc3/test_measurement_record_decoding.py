@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+'''Check the decoding of the ~M records.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.bc3 import fiebdc3
+from pycost.structure import unit_price_quantities
+from pycost.prices import unit_price
+
+# Fields of the record: ~M|01#\EAS010|1\2\|38|\Floor 1\2\10\\\\\Floor 2\\5\0.5\\|label|
+tokens= ['1\\2\\', '38', '\\Floor 1\\2\\10\\\\\\\\Floor 2\\\\5\\0.5\\\\', 'label', '']
+tokensCopy= list(tokens)
+m= fiebdc3.regBC3_m(tokens)
+lines= m.lista_med
+
+# Measurement without lines.
+emptyM= fiebdc3.regBC3_m(['1\\2\\', '12.5', ''])
+
+# Read the quantities.
+class Record(object):
+    ''' Mimics the data of a measurement record.'''
+    def __init__(self, med):
+        self.med= med
+price= unit_price.UnitPrice(cod= 'EAS010', desc= 'Steel', ud= 'kg')
+quantities= unit_price_quantities.UnitPriceQuantities(price)
+quantities.readBC3(Record(m))
+emptyQuantities= unit_price_quantities.UnitPriceQuantities(price)
+emptyQuantities.readBC3(Record(emptyM))
+
+'''
+print(m.ruta, m.med_total, m.etiqueta)
+print(lines.tipo, lines.comentario, lines.unidades, lines.largo, lines.ancho, lines.alto)
+print(quantities.getTotal(), emptyQuantities.getTotal())
+'''
+
+testOK= (tokens==tokensCopy) # tokens not modified.
+testOK= testOK and (m.ruta==['1', '2']) and (m.med_total==38.0) and (m.etiqueta=='label')
+testOK= testOK and (len(lines)==3) # the trailing backslash generates an empty line.
+testOK= testOK and (lines.comentario==['Floor 1', 'Floor 2', ''])
+testOK= testOK and (lines.unidades==[2.0, 1, 0]) and (lines.largo==[10.0, 5.0, 0])
+testOK= testOK and (lines.ancho==[1, 0.5, 0]) and (lines.alto==[1, 1, 0])
+testOK= testOK and (lines.lines[1]['comentario']=='Floor 2')
+testOK= testOK and (len(emptyM.lista_med)==0) and (emptyM.med_total==12.5)
+testOK= testOK and (len(quantities.quantities)==3) and (abs(quantities.getTotal()-22.5)<1e-6)
+testOK= testOK and (len(emptyQuantities.quantities)==1) and (abs(emptyQuantities.getTotal()-12.5)<1e-6)
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+'''Check the instantiation of a parametric concept for all the combinations
+   of its options.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import logging
+from pycost.structure import obra
+
+# Create main object.
+site= obra.Obra(cod="test", tit="Test title")
+
+# Read data from file.
+import os
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+inputFile= open(pth+'/../data/bc3/test_parametric_01.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+
+unitPrices= site.precios.unidades
+key= unitPrices.getParametricConceptsKeys()[0]
+pConcept= unitPrices.getParametricConcept(key= key)
+
+# Number of combinations.
+numCombinations= 1
+for parameterOptions in pConcept.parameters.parameterLabelStatements.values():
+    numCombinations*= len(parameterOptions)
+
+# Instantiate all the combinations.
+optionsList= pConcept.getOptionsProduct()
+variants= unitPrices.getParametricUnitPrices(key= key, rootChapter= site)
+variantCodes= [up.Codigo() for up in variants]
+
+# Compare with the instantiation one by one.
+differences= list()
+for options, variant in zip(optionsList, variants):
+    unitPrice= pConcept.getUnitPrice(code= key, options= options, rootChapter= site)
+    differences.append(abs(unitPrice.getPrice()-variant.getPrice()))
+    if((unitPrice.Codigo()!=variant.Codigo()) or (unitPrice.getTitle()!=variant.getTitle())):
+        differences.append(1.0)
+
+# Instantiate only some options.
+someOptions= pConcept.getOptionsProduct({'altura_de_apeo': ['<6 m'], 'condiciones_de_ejecución': ['Volumen escaso'], 'trabajo': ['Diurno', 'Nocturno'], 'banda_de_mantenimiento': ['i<3 horas']})
+table= pConcept.getUnitPricesTable(code= key, optionsList= someOptions, rootChapter= site)
+
+# Append the instantiated concepts to the container.
+numUnitPrices= len(unitPrices)
+unitPrices.getParametricUnitPrices(key= key, rootChapter= site, optionsList= someOptions, append= True)
+
+# Invalid options are not instantiated.
+invalidOptions= [list(someOptions[0]), [(someOptions[0][0][0], 'not an option')]+list(someOptions[0][1:])]
+logging.disable(logging.ERROR) # Don't print the error message.
+invalidVariants= pConcept.getUnitPrices(code= key, optionsList= invalidOptions, rootChapter= site)
+logging.disable(logging.NOTSET)
+invalidOK= (len(invalidVariants)==2) and (invalidVariants[0].Codigo()==table[1][0]) and (invalidVariants[1] is None)
+
+'''
+print(numCombinations, len(variants), variantCodes[:5])
+print(max(differences))
+for row in table:
+    print(row)
+'''
+
+testOK= (len(variants)==numCombinations) and (numCombinations>1)
+testOK= testOK and (len(set(variantCodes))==numCombinations) # different codes.
+testOK= testOK and (max(differences)<1e-9)
+testOK= testOK and (len(table)==3) and (table[0][0]=='code') and (table[0][-1]=='price')
+testOK= testOK and (table[1][2]=='Diurno') and (table[2][2]=='Nocturno')
+testOK= testOK and (table[2][-1]>table[1][-1]) # night work is more expensive.
+testOK= testOK and (len(unitPrices)==numUnitPrices+2) and invalidOK
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+'''Check the compiled formulas of the parametric concepts.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import json
+import pickle
+from pycost.bc3 import fiebdc3
+
+# Translation of the formulas.
+expressions= [fiebdc3.translate_parametric_formula('(%P(%A)*%O(%D))*(%B=a)'),
+              fiebdc3.translate_parametric_formula('%R(%B,%C) * (%F<c)'),
+              fiebdc3.translate_parametric_formula('1 * (%B=c @ %B=d) * (%A<>c & %A<>f)')]
+
+# Parametric concept with eight parameters (the letters of the parameter
+# indexes must not be confused with the lowercase letters of the
+# formulas: 'num', 'str', 'or', 'and').
+labels= ['\\PA\\a0\\a1\\', '\\PB\\b0\\b1\\b2\\', '\\PC\\c0\\c1\\', '\\PD\\d0\\d1\\', '\\PF\\f0\\f1\\', '\\PG\\g0\\g1\\', '\\PH\\h0\\h1\\', '\\PI\\i0\\i1\\i2\\']
+statements= ['%T(3)= 1, 1.5, 2', '%R(2,3)= 1, 2, 3, 4, 5, 6', 'X1 : %T(%B)*(%I=b @ %A=b)', 'X2 : %R(%A,%B)*(%H<>a & %G=a)', 'X3 : 0*%T(%A)']
+p= fiebdc3.regBC3_p([fiebdc3.parameter_tokens_separator.join(labels+statements)])
+concept= fiebdc3.regBC3_parametric(None, None, p)
+options= [('pa', 'a1'), ('pb', 'b2'), ('pc', 'c0'), ('pd', 'd0'), ('pf', 'f0'), ('pg', 'g0'), ('ph', 'h1'), ('pi', 'i1')]
+components= concept.getComponents(options)
+components2= concept.getComponents(options[:1]+[('pb', 'b0')]+options[2:6]+[('ph', 'h0'), ('pi', 'i0')])
+
+# The formulas are compiled once.
+compiledComponents= p.compiledComponents
+concept.getComponents(options)
+
+# Copy the parametric concept.
+pickledConcept= pickle.loads(pickle.dumps(concept))
+pickledComponents= pickledConcept.getComponents(options)
+
+'''
+print(expressions)
+print(components)
+print(components2)
+print(pickledComponents)
+'''
+
+testOK= (expressions[0]=='(numP[numA]*numO[numD])*(numB==0)')
+testOK= testOK and (expressions[1]=='numR[numB][numC] * (numF<2)')
+testOK= testOK and (expressions[2]=='1 * (numB==2  or  numB==3) * (numA!=2 and numA!=5)')
+testOK= testOK and (components=={'X1': 2.0, 'X2': 6.0})
+testOK= testOK and (components2=={'X1': 1.0})
+testOK= testOK and (p.compiledComponents is compiledComponents) and (len(compiledComponents)==3)
+testOK= testOK and ('__builtins__' not in p.variables) # variables not modified by eval.
+testOK= testOK and (len(json.dumps(concept.getDict()))>0)
+testOK= testOK and (pickledComponents==components)
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''Check the search index over the parametric concepts.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+from pycost.structure import obra
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+# Read the parametric concepts of the test files.
+site= obra.Obra(cod="test", tit="Test title")
+unitPrices= site.precios.unidades
+for i, code in enumerate(['AAA010$', 'AAB010$', 'EBA010$', 'EPD010$', 'SAA010$']):
+    tmp= obra.Obra(cod="tmp", tit="Tmp")
+    inputFile= open(pth+'/../data/bc3/test_parametric_0'+str(i+1)+'.bc3',mode='r')
+    tmp.readBC3(inputFile)
+    inputFile.close()
+    for key, concept in tmp.precios.unidades.parametricConcepts.items():
+        unitPrices.parametricConcepts[code]= concept
+
+# Search by label and option.
+index= unitPrices.getParametricIndex()
+byLabel= unitPrices.findParametricConcepts(label= 'Trabajo')
+byOption= unitPrices.findParametricConcepts(option= 'nocturno')
+byLabelAndOption= unitPrices.findParametricConcepts(label= 'operación', option= 'Montaje')
+byWords= unitPrices.findParametricConcepts(option= '88,9 mm')
+notFound= unitPrices.findParametricConcepts(option= 'DN200')
+# Approximate code search.
+closeCodes= index.findCloseCodes('EBA01$')
+# The index is built once and rebuilt after removing a concept.
+sameIndex= (unitPrices.getParametricIndex() is index)
+unitPrices.removeParametricConcept('SAA010$')
+newIndex= unitPrices.getParametricIndex()
+
+'''
+print(byLabel)
+print(byOption)
+print(byLabelAndOption)
+print(byWords)
+print(closeCodes)
+print(len(index), len(newIndex))
+'''
+
+testOK= (byLabel==['AAA010$', 'AAB010$', 'EBA010$'])
+testOK= testOK and (byOption==['AAA010$', 'AAB010$', 'EBA010$'])
+testOK= testOK and (byLabelAndOption==['EBA010$', 'EPD010$'])
+testOK= testOK and (byWords==['AAB010$']) and (notFound==[])
+testOK= testOK and (closeCodes[0]=='EBA010$')
+testOK= testOK and sameIndex and (newIndex is not index) and (len(newIndex)==4)
+
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+'''Check the cache of the unit prices obtained from a parametric concept.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import logging
+from pycost.structure import obra
+from pycost.prices import elementary_price
+
+# Create main object.
+site= obra.Obra(cod="test", tit="Test title")
+
+# Read data from file.
+import os
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+inputFile= open(pth+'/../data/bc3/test_parametric_01.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+
+key= site.precios.unidades.getParametricConceptsKeys()[0]
+pConcept= site.precios.unidades.getParametricConcept(key= key)
+
+options= [('altura_de_apeo', '<6 m'), ('condiciones_de_ejecución', 'Volumen escaso'), ('trabajo', 'Diurno'), ('banda_de_mantenimiento', 'i<3 horas')]
+unitPrice= pConcept.getUnitPrice(code= key, options= options, rootChapter= site)
+price= unitPrice.getPrice()
+# Same options in other order.
+unitPrice2= pConcept.getUnitPrice(code= key, options= list(reversed(options)), rootChapter= site)
+stats= pConcept.getInstanceCacheStats()
+
+# Change the price of a component (the cached unit price uses the same
+# component objects, so it remains valid).
+component= unitPrice.components[0].ent
+componentCode= component.Codigo()
+component.precio*= 2
+unitPriceB= pConcept.getUnitPrice(code= key, options= options, rootChapter= site)
+priceB= unitPriceB.getPrice()
+statsB= pConcept.getInstanceCacheStats()
+
+# Replace the component by other object with the same code.
+newComponent= elementary_price.ElementaryPrice(cod= componentCode, tit= component.getTitle(), ud= component.Unidad(), p= 3*component.precio, tp= component.getType())
+site.precios.elementos.Append(newComponent)
+unitPrice3= pConcept.getUnitPrice(code= key, options= options, rootChapter= site)
+price3= unitPrice3.getPrice()
+stats3= pConcept.getInstanceCacheStats()
+newComponentOK= (unitPrice3.components[0].ent is newComponent)
+
+# Remove the component.
+site.removeConcept(componentCode)
+logging.disable(logging.ERROR) # Don't print the error message.
+unitPrice5= pConcept.getUnitPrice(code= key, options= options, rootChapter= site)
+logging.disable(logging.NOTSET)
+stats5= pConcept.getInstanceCacheStats()
+removedOK= (unitPrice5 is not unitPrice3) and (stats5['invalidations']==2)
+removedOK= removedOK and all((c.ent.Codigo()!=componentCode) for c in unitPrice5.components)
+site.precios.elementos.Append(newComponent) # restore it.
+
+# Least recently used unit prices are discarded.
+pConcept.clearInstanceCache()
+pConcept.instanceCacheSize= 2
+optionsList= pConcept.getOptionsProduct()[:3]
+for opt in optionsList:
+    pConcept.getUnitPrice(code= key, options= opt, rootChapter= site)
+pConcept.getUnitPrice(code= key, options= optionsList[2], rootChapter= site) # hit.
+pConcept.getUnitPrice(code= key, options= optionsList[0], rootChapter= site) # miss.
+stats4= pConcept.getInstanceCacheStats()
+
+'''
+print(unitPrice.Codigo(), unitPrice2.Codigo(), price, priceB, price3)
+print(stats)
+print(statsB)
+print(stats3)
+print(stats5)
+print(stats4)
+'''
+
+testOK= (unitPrice2 is unitPrice) and (stats['hits']==1) and (stats['misses']==1)
+testOK= testOK and (unitPriceB is unitPrice) and (statsB['invalidations']==0) and (priceB>price)
+testOK= testOK and (unitPrice3 is not unitPrice) and (stats3['invalidations']==1) and (stats3['misses']==2)
+testOK= testOK and newComponentOK and (price3>priceB)
+testOK= testOK and removedOK
+testOK= testOK and (stats4['hits']==1) and (stats4['misses']==4) and (stats4['size']==2)
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
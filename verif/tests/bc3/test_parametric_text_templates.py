@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+'''Check the rendering of the summary and text templates of the parametric
+   concepts.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.bc3 import fiebdc3
+
+# Tokenization of the templates.
+tokens= fiebdc3.tokenize_substitution_statement('Tube $A ($L(a,%B)/$M(%B)) 10 % $X(y)')
+
+# Parametric concept.
+labels= ['\\DIAMETER\\100 mm\\200 mm\\', '\\SHIFT\\day\\night\\']
+statements= ['%T(2)= 1.5, 2.5', '$L(2,2)= "D", "N", "Daytime work", "Night work"', '$M(2)= "day shift", "night shift"', '$X= "Flanged."', '\\ RESUMEN \\ Tube $A ($L(a,%B)). \\', '\\ TEXTO \\ Tube of diameter $A, weight %T(%A) kg/m. $L(b,%B). $X $Y 10 % \\']
+p= fiebdc3.regBC3_p([fiebdc3.parameter_tokens_separator.join(labels+statements)])
+concept= fiebdc3.regBC3_parametric(None, None, p)
+options= [('diameter', '200 mm'), ('shift', 'night')]
+summary= concept.getSummary(options)
+text= concept.getText(options)
+
+'''
+print(tokens)
+print(p.substitutionTemplates)
+print(summary)
+print(text)
+'''
+
+testOK= (tokens==['Tube ', ('strA', [], '$A'), ' (', ('strL', [0, 'numB'], '$L(a,%B)'), '/', ('strM', ['numB'], '$M(%B)'), ') 10 % ', ('strX', [24], '$X(y)')])
+testOK= testOK and (summary.strip()=='Tube 200 mm (N).')
+testOK= testOK and (text.strip()=='Tube of diameter 200 mm, weight 2.5 kg/m. Night work. Flanged. $Y 10 %') # unknown variables are not replaced.
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
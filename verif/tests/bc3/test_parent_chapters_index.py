@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+'''Check the assignment of the elementary prices to the chapters that
+   contain them.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+from pycost.bc3 import codigos_obra
+from pycost.structure import obra
+
+bc3Text= '''~V||FIEBDC-3/2016|pyCost|\\|utf-8||
+~C|ROOT##||Root chapter||||
+~D|ROOT##|01#\\1\\1\\02#\\1\\1\\|
+~C|01#||Chapter 01||||
+~D|01#|01.01#\\1\\1\\mt01\\1\\1\\|
+~C|01.01#||Chapter 01.01||||
+~D|01.01#|mt02\\1\\1\\mt01\\1\\1\\|
+~C|02#||Chapter 02||||
+~D|02#|mt02\\1\\1\\|
+~C|mt01|kg|Material 01|1.00|||3|
+~C|mt02|kg|Material 02|2.00|||3|
+~C|mt03|kg|Material 03|3.00|||3|
+'''
+
+co= codigos_obra.CodigosObra()
+co.readBC3(io.StringIO(bc3Text))
+index= co.getParentChaptersIndex()
+
+site= obra.Obra(cod="test", tit="Test title")
+site.readBC3(io.StringIO(bc3Text))
+chapter01= site.subcapitulos[0]
+chapter0101= chapter01.subcapitulos[0]
+chapter02= site.subcapitulos[1]
+def elementaryCodes(chapter):
+    return sorted(chapter.precios.elementos.concepts.keys())
+
+'''
+print(index)
+print(elementaryCodes(site), elementaryCodes(chapter01), elementaryCodes(chapter0101), elementaryCodes(chapter02))
+'''
+
+testOK= (index=={'mt01':['01#', '01.01#'], 'mt02':['01.01#', '02#']})
+# The elementary price belongs to the first chapter that contains it.
+testOK= testOK and (elementaryCodes(chapter01)==['mt01'])
+testOK= testOK and (elementaryCodes(chapter0101)==['mt02'])
+testOK= testOK and (elementaryCodes(chapter02)==[])
+testOK= testOK and ('mt03' in elementaryCodes(site)) and ('mt01' not in elementaryCodes(site))
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
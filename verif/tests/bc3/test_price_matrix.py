@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+'''Check the computation of the prices and the elementary quantities of a
+   project using sparse matrices.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import logging
+from pycost.structure import obra
+from pycost.prices import price_table
+from pycost.prices import unit_price
+from pycost.prices import price_matrix
+from pycost.utils import basic_types
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+
+# Prices (some of them with percentages).
+matrix= price_matrix.PriceMatrix(site.getConcepts())
+mismatches= matrix.getPriceMismatches()
+prices= matrix.getPrices()
+code= matrix.codes[-1]
+samePrice= (prices[code]==site.getUnitPrice(code).getRoundedPrice())
+
+# Elementary quantities.
+quantitiesReport= site.getQuantitiesReport()
+refQuantities= quantitiesReport.getElementaryQuantities()
+quantities= matrix.getElementaryQuantities(quantitiesReport)
+# PEON and UCOMP0202 appear twice in some decompositions and
+# QuantitiesReport counts them only once.
+repeated= ['PEON', 'UCOMP0202']
+quantitiesOK= (set(quantities)==set(refQuantities))
+for key in refQuantities:
+    if(key not in repeated):
+        quantitiesOK= quantitiesOK and (abs(quantities[key]-float(refQuantities[key]))<1e-6*max(1.0, abs(quantities[key])))
+repeatedOK= True
+for key in repeated:
+    repeatedOK= repeatedOK and (quantities[key]>float(refQuantities[key]))
+
+# Cycles are reported.
+table= price_table.CuaPre()
+brick= table.newElementaryPrice(code= 'BRICK', shortDescription= 'Brick', price= 0.2, typ= basic_types.mat, unit= 'u')
+wallA= unit_price.UnitPrice(cod= 'WALLA', desc= 'Wall A', ud= 'm2')
+wallB= unit_price.UnitPrice(cod= 'WALLB', desc= 'Wall B', ud= 'm2')
+wallC= unit_price.UnitPrice(cod= 'WALLC', desc= 'Wall C', ud= 'm2')
+wallA.Append(brick, 1.0, 50.0)
+wallA.Append(wallB, 1.0, 1.0)
+wallB.Append(wallA, 1.0, 1.0)
+wallC.Append(brick, 1.0, 45.0)
+for up in [wallA, wallB, wallC]:
+    table.unidades.Append(up)
+logging.disable(logging.ERROR) # Don't print the error message.
+cyclicMatrix= price_matrix.PriceMatrix(table.getConcepts())
+logging.disable(logging.NOTSET)
+cyclicPrices= cyclicMatrix.getPrices()
+
+'''
+print(len(matrix), len(matrix.levels), len(matrix.percentages), mismatches, samePrice)
+print(len(quantities), quantitiesOK, repeatedOK)
+print(cyclicPrices, cyclicMatrix.cycles)
+'''
+
+testOK= (len(matrix)>100) and (len(matrix.percentages)>0) and (len(mismatches)==0) and samePrice
+testOK= testOK and (len(quantities)>10) and quantitiesOK and repeatedOK
+testOK= testOK and (sorted(cyclicPrices)==['BRICK', 'WALLC']) and (cyclicPrices['WALLC']==wallC.getRoundedPrice())
+testOK= testOK and (len(cyclicMatrix.cycles)==1) and (sorted(cyclicMatrix.cycles[0])==['WALLA', 'WALLB'])
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
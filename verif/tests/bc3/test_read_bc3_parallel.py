@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+'''Check that the parallel decoding of the unit prices gives the same
+   results that the sequential one.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.bc3 import codigos_obra
+from pycost.prices import unit_price_container
+from pycost.structure import obra
+
+import os
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+fileName= pth+'/../data/bc3/test_file_05.bc3'
+
+if __name__ == '__main__': # worker processes must not run the test.
+    # Decode the unit prices.
+    co= codigos_obra.CodigosObra()
+    with open(fileName, mode='r', encoding="utf-8") as inputFile:
+        co.readBC3(inputFile)
+    unitCosts= co.GetDatosUnidades()
+    decoded= unit_price_container.Descompuestos.decodeBC3(unitCosts, numWorkers= 2, chunkSize= 10)
+
+    # Sequential import.
+    sequentialSite= obra.Obra(cod="test", tit="Test title")
+    with open(fileName, mode='r', encoding="utf-8") as inputFile:
+        sequentialSite.readBC3(inputFile)
+
+    # Parallel import.
+    parallelSite= obra.Obra(cod="test", tit="Test title")
+    with open(fileName, mode='r', encoding="utf-8") as inputFile:
+        parallelSite.readBC3(inputFile, numWorkers= 2)
+
+    price= parallelSite.getPrice()
+    refPrice= sequentialSite.getPrice()
+
+    '''
+    print(len(decoded), len(unitCosts))
+    print(decoded[next(iter(decoded))])
+    print(price, refPrice)
+    '''
+
+    testOK= (len(decoded)==len(unitCosts)) and (price==refPrice)
+    testOK= testOK and (parallelSite.getDict()==sequentialSite.getDict())
+
+    import logging
+    fname= os.path.basename(__file__)
+    if testOK:
+        print('test: '+fname+': ok.')
+    else:
+        logging.error('test: '+fname+' ERROR.')
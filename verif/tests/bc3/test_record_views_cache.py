@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+'''Check that the views of the BC3 records are decoded only once.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+from pycost.bc3 import bc3_record
+from pycost.structure import obra
+
+# Single record.
+record= bc3_record.RegBC3('EAS010')
+record.c= ['kg', 'Steel', '1.25', '', '3']
+record.d= ['MT07ala010\\1\\1.05\\']
+bc3_record.RegBC3.resetSavedDecodes()
+concept= record.GetConcepto()
+sameConcept= record.GetConcepto() # from cache.
+desc= record.GetDesc()
+sameDesc= record.GetDesc() # from cache.
+savedDecodes= bc3_record.RegBC3.getSavedDecodes()
+tokensKept= (record.c==['kg', 'Steel', '1.25', '', '3'])
+# New tokens invalidate the view.
+record.c= ['kg', 'Stainless steel', '5.5', '', '3']
+newConcept= record.GetConcepto()
+
+# Read data from file.
+import os
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+bc3_record.RegBC3.resetSavedDecodes()
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r', encoding="utf-8")
+site.readBC3(inputFile)
+inputFile.close()
+importSavedDecodes= bc3_record.RegBC3.getSavedDecodes()
+
+'''
+print(concept.resumen, concept.precio, concept.tipo)
+print(savedDecodes)
+print(newConcept.resumen, newConcept.precio)
+print(importSavedDecodes)
+'''
+
+testOK= (concept is sameConcept) and (desc is sameDesc) and (savedDecodes==2) and tokensKept
+testOK= testOK and (concept.resumen=='Steel') and (concept.precio==1.25) and (concept.tipo==3)
+testOK= testOK and (desc[0].codigo=='MT07ala010') and (desc[0].productionRate==1.05)
+testOK= testOK and (newConcept is not concept) and (newConcept.resumen=='Stainless steel')
+testOK= testOK and (importSavedDecodes>0)
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
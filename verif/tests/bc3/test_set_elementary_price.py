@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+'''Check the incremental update of the prices and the totals of a project
+   when an elementary price changes.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+import os
+import logging
+from pycost.structure import obra
+from pycost.structure import budget_totals
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+def read_site():
+    ''' Read the test project.'''
+    retval= obra.Obra(cod="test", tit="Test title")
+    inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+    retval.readBC3(inputFile)
+    inputFile.close()
+    return retval
+
+def get_totals(site):
+    ''' Return the totals of the chapters and the prices of the unit price
+        quantities of the project (full computation).'''
+    retval= [chapter.getRoundedPrice() for chapter in site.getChaptersDepthFirst()]
+    for chapter in site.getChaptersDepthFirst():
+        retval.extend(upq.getRoundedPrice() for upq in chapter.quantities)
+    return retval
+
+site= read_site()
+initialTotal= site.getRoundedPrice()
+newPrices= [('PEON', 21.37), ('UCOMP0202', 17.05), ('PEON', 12.7)]
+changes= list()
+siteTotals= list()
+for code, price in newPrices:
+    changes.append(site.setElementaryPrice(code, price))
+    siteTotals.append(site.getRoundedPrice())
+# Compare with a full computation.
+refSite= read_site()
+for code, price in newPrices:
+    refSite.findPrice(code).precio= price
+refTotals= get_totals(refSite)
+totals= [item[3] for item in site.budgetTotals.chapters]
+sameTotals= (totals==[item[3] for item in budget_totals.BudgetTotals(refSite).chapters])
+sameTotals= sameTotals and (get_totals(site)==refTotals)
+# The elementary price comes first and the root chapter last.
+orderOK= True
+for (code, price), change, siteTotal in zip(newPrices, changes, siteTotals):
+    orderOK= orderOK and (change[0][0].Codigo()==code) and (float(change[0][2])==price)
+    orderOK= orderOK and (change[-1][0] is site) and (change[-1][2]==siteTotal)
+finalTotal= site.getRoundedPrice()
+numUnitPrices= len([change for change in changes[0] if hasattr(change[0], 'components')])
+# Unknown code.
+logging.disable(logging.ERROR) # Don't print the error message.
+notFound= site.setElementaryPrice('NOT_A_CODE', 1.0)
+logging.disable(logging.NOTSET)
+
+# Changes made without setElementaryPrice.
+siteChapters= site.getChaptersDepthFirst()
+site.findPrice('UCOMP0202').precio= 18.0 # price changed directly.
+externalTotals= [site.setElementaryPrice('PEON', 13.5)[-1][2]==site.getRoundedPrice()]
+chapter= [ch for ch in siteChapters if len(ch.quantities)>0][-1]
+upq= chapter.quantities.pop() # quantities removed.
+externalTotals.append(site.setElementaryPrice('PEON', 14.5)[-1][2]==site.getRoundedPrice())
+chapter.quantities.append(upq) # quantities appended.
+externalTotals.append(site.setElementaryPrice('PEON', 15.5)[-1][2]==site.getRoundedPrice())
+
+# Incremental update from a new version of the FIEBDC-3 file.
+header= '''~V||FIEBDC-3/2016|pyCost|\\|utf-8||
+~C|ROOT##||Root chapter||||
+'''
+chapters= '''~D|ROOT##|01#\\1\\1\\02#\\1\\1\\|
+~C|01#||Chapter 01||||
+~D|01#|UP1\\1\\10\\UP2\\1\\5\\|
+~C|02#||Chapter 02||||
+~D|02#|UP1\\1\\2\\|
+'''
+prices= '''~C|UP1|m3|Unit price 1|||||
+~D|UP1|mt01\\1\\2\\mt02\\1\\1\\|
+~C|UP2|m2|Unit price 2|||||
+~C|mt02|kg|Material 02|2.00|||3|
+'''
+v1= header+chapters+prices+'''~D|UP2|mt02\\1\\3\\|
+~C|mt01|kg|Material 01|1.00|||3|
+~M|01#\\UP1|1\\1\\|10|
+~M|01#\\UP2|1\\2\\|5|
+~M|02#\\UP1|2\\1\\|2|
+'''
+v2= header+chapters+prices+'''~D|UP2|mt03\\1\\3\\|
+~C|mt01|kg|Material 01|1.50|||3|
+~C|mt03|kg|Material 03|3.00|||3|
+~M|01#\\UP1|1\\1\\|20|
+~M|01#\\UP2|1\\2\\|5|
+'''
+# New chapter.
+v3= v2.replace('02#\\1\\1\\|', '02#\\1\\1\\03#\\1\\1\\|')+'''~C|03#||Chapter 03||||
+~D|03#|UP2\\1\\1\\|
+~M|03#\\UP2|3\\1\\|1|
+'''
+updatedSite= obra.Obra(cod="test", tit="Test title")
+updatedSite.readBC3(io.StringIO(v1))
+updatedSite.setElementaryPrice('mt02', 2.5)
+updatedSite.updateFromBC3(io.StringIO(v2)) # quantities modified.
+updatedTotals= [updatedSite.setElementaryPrice('mt02', 4.0)[-1][2]==updatedSite.getRoundedPrice()]
+updatedSite.updateFromBC3(io.StringIO(v3)) # chapters rebuilt.
+updatedTotals.append(updatedSite.setElementaryPrice('mt01', 2.0)[-1][2]==updatedSite.getRoundedPrice())
+updatedTotal= updatedSite.getRoundedPrice()
+
+'''
+print(initialTotal, finalTotal, refSite.getRoundedPrice())
+print(externalTotals, updatedTotals, updatedTotal)
+print(len(changes[0]), numUnitPrices, sameTotals, orderOK, notFound)
+'''
+
+testOK= sameTotals and orderOK and (notFound is None) and (numUnitPrices>10)
+testOK= testOK and (finalTotal==refSite.getRoundedPrice()) and (finalTotal!=initialTotal)
+testOK= testOK and all(externalTotals) and all(updatedTotals)
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''Check the generator of synthetic FIEBDC-3 projects used by the
+   benchmarks.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+import os
+import sys
+from pycost.structure import obra
+
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+sys.path.append(pth+'/../../benchmarks')
+import bc3_generator
+import run_benchmarks
+
+# Generate the project twice.
+project= bc3_generator.SyntheticProject(numConcepts= 500, decompositionDepth= 3, numParametric= 2, numMeasurementLines= 2)
+output= io.StringIO()
+numbers= project.write(output)
+text= output.getvalue()
+output= io.StringIO()
+project.write(output)
+secondText= output.getvalue()
+
+# Read the project.
+site= obra.Obra(cod="test", tit="Test title")
+site.readBC3(io.StringIO(text))
+price= site.getPrice()
+
+# Compare with a baseline.
+baseline= {'project': project.getParameters(), 'scenarios': {'import_bc3': {'time': 1.0, 'peak_memory': 100}}}
+results= {'project': project.getParameters(), 'scenarios': {'import_bc3': {'time': 1.1, 'peak_memory': 200}}}
+comparison= run_benchmarks.compare_results(results, baseline, tolerance= 0.2)
+
+'''
+print(numbers)
+print(len(site.precios.unidades), len(site.precios.elementos), price)
+print(comparison)
+'''
+
+testOK= (text==secondText) # deterministic.
+testOK= testOK and (numbers['elementary_prices']+numbers['unit_prices']+numbers['parametric_concepts']==500)
+testOK= testOK and (len(site.precios.unidades)==numbers['unit_prices'])
+testOK= testOK and (len(site.precios.elementos)==numbers['elementary_prices']+1) # SINDESCO
+testOK= testOK and (len(site.precios.unidades.parametricConcepts)==numbers['parametric_concepts'])
+testOK= testOK and (len(site.getChaptersDepthFirst())>numbers['leaf_chapters']) and (price>0.0)
+testOK= testOK and (len(comparison)==2)
+testOK= testOK and (not comparison[0][5]) and comparison[1][5] # only memory regression.
+
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
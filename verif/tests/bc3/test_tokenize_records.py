@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+'''Check the FIEBDC-3 record tokenizer.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+from pycost.bc3 import fiebdc3
+
+# Read data from file.
+import os
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+inputFile= open(pth+'/../data/bc3/test_parametric_01.bc3',mode='r')
+records= list(fiebdc3.tokenize_records(inputFile))
+inputFile.close()
+
+# Read it again using a tiny buffer (records split between chunks).
+inputFile= open(pth+'/../data/bc3/test_parametric_01.bc3',mode='r')
+smallChunkRecords= list(fiebdc3.tokenize_records(inputFile, chunkSize= 7))
+inputFile.close()
+
+recordTypes= [r[0] for r in records]
+firstConcept= records[1]
+parametricRecord= None
+for (recordType, code, fields) in records:
+    if(recordType=='P'):
+        parametricRecord= (recordType, code, fields)
+        break
+parametricTokens= parametricRecord[2][0].split(fiebdc3.parameter_tokens_separator)
+
+# Records from memory.
+memoryRecords= list(fiebdc3.tokenize_records(io.StringIO('~C|A#||Chapter A||||\r\n~D|A#|\\B\\1\\2\\|\n~X\n')))
+
+'''
+print(recordTypes)
+print(firstConcept)
+print(parametricTokens)
+print(memoryRecords)
+'''
+
+testOK= (records==smallChunkRecords)
+testOK= testOK and (recordTypes[0]=='V') and (firstConcept==('C', 'ROOT##', ['', 'BASE PRECIOS', '', '12082022', '', '']))
+testOK= testOK and (parametricRecord[1]=='AAA010$')
+testOK= testOK and (parametricTokens[1]=='\\ALTURA DE APEO \\<3 m\\<6 m\\')
+testOK= testOK and (not any(tk.startswith('#') for tk in parametricTokens)) # no comments.
+testOK= testOK and (memoryRecords==[('C', 'A#', ['', 'Chapter A', '', '', '', '']), ('D', 'A#', ['\\B\\1\\2\\', ''])])
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
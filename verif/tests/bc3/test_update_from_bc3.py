@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+'''Check the incremental update of a construction site from a new
+   version of its FIEBDC-3 file.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+from pycost.structure import obra
+
+header= '''~V||FIEBDC-3/2016|pyCost|\\|utf-8||
+~C|ROOT##||Root chapter||||
+'''
+chapters= '''~D|ROOT##|01#\\1\\1\\02#\\1\\1\\|
+~C|01#||Chapter 01||||
+~D|01#|UP1\\1\\10\\UP2\\1\\5\\|
+~C|02#||Chapter 02||||
+~D|02#|UP1\\1\\2\\|
+'''
+prices= '''~C|UP1|m3|Unit price 1|||||
+~D|UP1|mt01\\1\\2\\mt02\\1\\1\\|
+~C|UP2|m2|Unit price 2|||||
+~C|mt02|kg|Material 02|2.00|||3|
+'''
+# First version.
+v1= header+chapters+prices+'''~D|UP2|mt02\\1\\3\\|
+~C|mt01|kg|Material 01|1.00|||3|
+~M|01#\\UP1|1\\1\\|10|
+~M|01#\\UP2|1\\2\\|5|
+~M|02#\\UP1|2\\1\\|2|
+'''
+# Second version: mt01 price modified, mt03 added, UP2 decomposition
+# modified, quantities of UP1 in chapter 01 modified and removed in
+# chapter 02.
+v2= header+chapters+prices+'''~D|UP2|mt03\\1\\3\\|
+~C|mt01|kg|Material 01|1.50|||3|
+~C|mt03|kg|Material 03|3.00|||3|
+~M|01#\\UP1|1\\1\\|20|
+~M|01#\\UP2|1\\2\\|5|
+'''
+# Third version: new chapter.
+v3= v2.replace('02#\\1\\1\\|', '02#\\1\\1\\03#\\1\\1\\|')+'''~C|03#||Chapter 03||||
+~D|03#|UP2\\1\\1\\|
+~M|03#\\UP2|3\\1\\|1|
+'''
+
+site= obra.Obra(cod="test", tit="Test title")
+site.readBC3(io.StringIO(v1))
+price1= site.getPrice()
+up1= site.findPrice('UP1')
+mt01= site.findPrice('mt01')
+
+# Update to the second version.
+changes2= site.updateFromBC3(io.StringIO(v2))
+price2= site.getPrice()
+ref2= obra.Obra(cod="test", tit="Test title")
+ref2.readBC3(io.StringIO(v2))
+
+# Update to the third version.
+changes3= site.updateFromBC3(io.StringIO(v3))
+price3= site.getPrice()
+ref3= obra.Obra(cod="test", tit="Test title")
+ref3.readBC3(io.StringIO(v3))
+
+# Nothing changes.
+changes4= site.updateFromBC3(io.StringIO(v3))
+
+'''
+print(price1, price2, ref2.getPrice(), price3, ref3.getPrice())
+print(changes2)
+print(changes3)
+print(changes4)
+'''
+
+testOK= (abs(price1-78.0)<1e-6) and (abs(price2-145.0)<1e-6) and (abs(price3-154.0)<1e-6)
+testOK= testOK and (price2==ref2.getPrice()) and (price3==ref3.getPrice())
+testOK= testOK and (changes2['elementary_prices']=={'added': ['mt03'], 'removed': [], 'modified': ['mt01']})
+testOK= testOK and (changes2['unit_prices']=={'added': [], 'removed': [], 'modified': ['UP2']})
+testOK= testOK and (changes2['quantities']=={'added': [], 'removed': ['02#\\UP1'], 'modified': ['01#\\UP1']})
+testOK= testOK and (changes3['chapters']=={'added': ['03#'], 'removed': [], 'modified': ['ROOT##']})
+for category in changes4: # no changes.
+    testOK= testOK and (changes4[category]=={'added': [], 'removed': [], 'modified': []})
+# The objects have been updated in place.
+testOK= testOK and (site.findPrice('UP1') is up1) and (site.findPrice('mt01') is mt01)
+testOK= testOK and (up1.components[0].ent is mt01)
+testOK= testOK and (site.findPrice('mt03').getPrice()==3.0)
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
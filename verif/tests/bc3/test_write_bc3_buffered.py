@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''Check the buffered (and optionally parallel) output of FIEBDC-3 files.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import io
+from pycost.structure import obra
+
+import os
+pth= os.path.dirname(__file__)
+# print("pth= ", pth)
+if(not pth):
+    pth= "."
+fileName= pth+'/../data/bc3/test_file_05.bc3'
+
+class CountingStream(io.StringIO):
+    ''' Stream that counts the number of calls to write.'''
+    def __init__(self):
+        super().__init__()
+        self.numWrites= 0
+    def write(self, text):
+        self.numWrites+= 1
+        return super().write(text)
+
+if __name__ == '__main__': # worker processes must not run the test.
+    site= obra.Obra(cod="test", tit="Test title")
+    with open(fileName, mode='r', encoding="utf-8") as inputFile:
+        site.readBC3(inputFile)
+
+    # Record by record output (the buffer is flushed on each record).
+    unbufferedOutput= CountingStream()
+    site.WriteBC3(unbufferedOutput, bufferSize= 1)
+    # Buffered output.
+    bufferedOutput= CountingStream()
+    site.WriteBC3(bufferedOutput)
+    # Parallel output.
+    parallelOutput= CountingStream()
+    site.WriteBC3(parallelOutput, numWorkers= 2)
+
+    text= bufferedOutput.getvalue()
+    # Chapter prices.
+    chapterPrices= site.getPrices()
+
+    '''
+    print(unbufferedOutput.numWrites, bufferedOutput.numWrites, parallelOutput.numWrites)
+    print(text[:500])
+    '''
+
+    testOK= (len(text)>100000) and text.startswith('~V|')
+    testOK= testOK and (text==unbufferedOutput.getvalue()) and (text==parallelOutput.getvalue())
+    testOK= testOK and (unbufferedOutput.numWrites>1000) and (bufferedOutput.numWrites==1)
+    testOK= testOK and (len(chapterPrices)==len(site.getChaptersDepthFirst()))
+    testOK= testOK and (chapterPrices[id(site)]==site.getPrice())
+    for chapter in site.subcapitulos:
+        testOK= testOK and (chapterPrices[id(chapter)]==chapter.getPrice())
+
+    import logging
+    fname= os.path.basename(__file__)
+    if testOK:
+        print('test: '+fname+': ok.')
+    else:
+        logging.error('test: '+fname+' ERROR.')
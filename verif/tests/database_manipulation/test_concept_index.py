@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+'''Check the code -> concept index of the root chapter.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import pickle
+import logging
+from pycost.structure import obra
+from pycost.structure import chapter
+from pycost.prices import elementary_price
+from pycost.prices import unit_price
+from pycost.utils import basic_types
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= '.'
+
+def same_as_tree(site, codes):
+    ''' Return true if the concepts found using the index are the same
+        found searching the chapter tree.'''
+    retval= True
+    for code in codes:
+        retval= retval and (site.findPrice(code) is chapter.Chapter.findPrice(site, code))
+    return retval
+
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+conceptIndex= site.conceptIndex # built when reading the decompositions.
+codes= [concept.Codigo() for concept in site.getConcepts()]
+results= [same_as_tree(site, codes), site.checkConceptIndex()==[]]
+
+# Append, remove and clear.
+subChapter= site.getChaptersDepthFirst()[-1]
+newElementaryPrice= subChapter.precios.elementos.Append(elementary_price.ElementaryPrice(cod= 'NEW_MT', tit= 'New material', ud= 'kg', p= 1.0, tp= basic_types.mat))
+newUnitPrice= site.precios.unidades.Append(unit_price.UnitPrice(cod= 'NEW_UP', desc= 'New unit price', ud= 'm2'))
+results.append((conceptIndex.find('NEW_MT') is newElementaryPrice) and (conceptIndex.find('NEW_UP') is newUnitPrice))
+subChapter.precios.elementos.removeConcept('NEW_MT')
+results.append((conceptIndex.find('NEW_MT') is None) and (site.findPrice('NEW_MT') is None))
+removedCode= list(subChapter.precios.elementos.concepts)[0]
+subChapter.precios.clear()
+results.append(same_as_tree(site, codes+['NEW_UP']) and (site.checkConceptIndex()==[]))
+sameIndex= (site.conceptIndex is conceptIndex)
+
+# New chapters.
+newChapter= site.subcapitulos.newChapter(chapter.Chapter(cod= 'NEW_CH', tit= 'New chapter'))
+newChapter.precios.elementos.Append(elementary_price.ElementaryPrice(cod= 'NEW_MT2', tit= 'New material', ud= 'kg', p= 1.0, tp= basic_types.mat))
+inconsistencies= site.checkConceptIndex() # the new chapter is not in the index.
+results.append(site.findPrice('NEW_MT2') is not None) # found in the chapter tree.
+results.append(site.checkConceptIndex()==[]) # the index has been rebuilt.
+
+# Pickling.
+site2= pickle.loads(pickle.dumps(site))
+results.append((site2.conceptIndex is None) and same_as_tree(site2, codes+['NEW_MT2']) and (site2.checkConceptIndex()==[]))
+
+# Clear.
+site.clear()
+results.append((site.conceptIndex is None) and (site.findPrice(codes[-1]) is None))
+
+'''
+print(results, sameIndex, removedCode)
+print(inconsistencies)
+'''
+
+testOK= all(results) and sameIndex and (len(inconsistencies)==3)
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
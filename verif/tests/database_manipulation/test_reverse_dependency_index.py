@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+'''Check the reverse dependency index used to find the concepts that depend
+   on a price.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import pickle
+import logging
+from pycost.structure import obra
+from pycost.prices import elementary_price
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= '.'
+
+def get_reference(site, code):
+    ''' Return the identifiers of the prices and quantities that depend on
+        the concept with the given code (checking all of them).'''
+    retval= set()
+    for chapter in site.getChaptersDepthFirst():
+        for up in chapter.precios.unidades.concepts.values():
+            if(up.dependsOnConcept(code)):
+                retval.add(id(up))
+        for upq in chapter.quantities:
+            if(upq.getUnitPriceCode()==code):
+                retval.add(id(upq))
+    return retval
+
+def check(site, codes):
+    ''' Compare the dependent concepts with the reference ones.'''
+    retval= True
+    for code in codes:
+        dependents= site.getConceptsThatDependOn(code)
+        retval= retval and (len(dependents)==len(set(id(d) for d in dependents)))
+        retval= retval and (set(id(d) for d in dependents)==get_reference(site, code))
+    return retval
+
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+codes= [concept.Codigo() for concept in site.getConcepts()]+['NOT_A_CODE']
+results= [check(site, codes)]
+numDependents= len(site.getConceptsThatDependOn('PEON'))
+
+# Modify the decompositions.
+up= site.getConceptsThatDependOn('PEON')[0]
+component= [c for c in up.components if c.CodigoEntidad()=='PEON'][0]
+up.components.remove(component)
+results.append(check(site, ['PEON']))
+up.components.append(component)
+results.append(check(site, ['PEON']))
+component.ent= site.findPrice('PEONES')
+results.append(check(site, ['PEON', 'PEONES']))
+up.components= up.components.getCopy()
+results.append(check(site, ['PEON', 'PEONES']))
+
+# Modify the quantities.
+chapter= [ch for ch in site.getChaptersDepthFirst() if len(ch.quantities)>1][0]
+upq= chapter.quantities.pop()
+upqCode= upq.getUnitPriceCode()
+results.append(check(site, [upqCode]) and (chapter.quantities.getQuantitiesForPrice(upqCode) is None))
+chapter.quantities.insert(0, upq)
+results.append(check(site, [upqCode]) and (chapter.quantities.getQuantitiesForPrice(upqCode) is upq))
+
+# Replace and remove concepts.
+site.replacePrices([['PEONENC', 'PEONES']])
+results.append(check(site, ['PEONENC', 'PEONES']) and (len(site.getConceptsThatDependOn('PEONENC'))==0))
+site.removeConcepts(['PEONES', upqCode])
+results.append(check(site, codes))
+removedOK= (site.getConceptsThatDependOn('PEONES')==[]) and (site.getConceptsThatDependOn(upqCode)==[])
+
+# Replace a concept by other object with the same code (the components
+# still refer to the old one) and then remove it.
+peon= site.findPrice('PEON')
+numPeonDependents= len(site.getConceptsThatDependOn('PEON'))
+site.precios.elementos.Append(elementary_price.ElementaryPrice(cod= 'PEON', tit= peon.getTitle(), ud= peon.Unidad(), p= peon.precio, tp= peon.getType()))
+results.append(check(site, ['PEON']) and (len(site.getConceptsThatDependOn('PEON'))==numPeonDependents))
+site.removeConcept('PEON')
+results.append(check(site, codes))
+removedOK= removedOK and (numPeonDependents>5) and (site.getConceptsThatDependOn('PEON')==[])
+
+# Pickling.
+site2= pickle.loads(pickle.dumps(site))
+results.append(check(site2, codes))
+
+'''
+print(results, numDependents, removedOK)
+'''
+
+testOK= all(results) and (numDependents>5) and removedOK
+
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
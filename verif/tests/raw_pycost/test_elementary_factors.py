@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+'''Check the cached decomposition of the unit prices in elementary
+   prices.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import pickle
+from pycost.structure import obra
+from pycost.prices import elementary_price
+from pycost.prices import unit_price
+from pycost.utils import basic_types
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+def get_reference_factors(unitPrice):
+    ''' Return the (code, coefficient) tuples computed from scratch.'''
+    elementaryComponents= unitPrice.getElementaryComponents(parentPrices= [unitPrice.Codigo()])
+    return [(ec.CodigoEntidad(), ec.getProduct()) for ec in elementaryComponents.values()]
+
+def same_factors(factors, refFactors):
+    ''' Return true if both lists are equal (except for rounding errors).'''
+    retval= (len(factors)==len(refFactors))
+    for (code, coefficient), (refCode, refCoefficient) in zip(factors, refFactors):
+        retval= retval and (code==refCode) and (abs(coefficient-refCoefficient)<=1e-12*abs(refCoefficient))
+    return retval
+
+# Elementary prices.
+labour= elementary_price.ElementaryPrice(cod= 'MO001', tit= 'Labourer', ud= 'h', p= 20.0, tp= basic_types.mdo)
+cement= elementary_price.ElementaryPrice(cod= 'MT001', tit= 'Cement', ud= 't', p= 100.0, tp= basic_types.mat)
+sand= elementary_price.ElementaryPrice(cod= 'MT002', tit= 'Sand', ud= 't', p= 15.0, tp= basic_types.mat)
+
+# Unit prices (the mortar is a component of the wall and the labour
+# appears twice in the mortar).
+mortar= unit_price.UnitPrice(cod= 'MORTAR', desc= 'Mortar', ud= 'm3')
+mortar.Append(labour, 1.0, 2.0)
+mortar.Append(cement, 1.0, 0.25)
+mortar.Append(labour, 1.0, 0.5)
+wall= unit_price.UnitPrice(cod= 'WALL', desc= 'Wall', ud= 'm2')
+wall.Append(labour, 1.0, 0.5)
+mortarComponent= wall.Append(mortar, 2.0, 0.1)
+
+results= list()
+def check():
+    ''' Compare the cached factors with the computed ones.'''
+    for up in [mortar, wall]:
+        results.append(same_factors(up.getElementaryFactors(), get_reference_factors(up)))
+
+check()
+factors0= wall.getElementaryFactors()
+cached= (wall.getElementaryFactors() is factors0) # not computed again.
+# Change the decomposition of the nested unit price.
+mortarComponent.productionRate= 0.2
+invalidated= (wall.cachedElementaryFactors is None)
+check()
+mortar.components[1].factor= 1.5
+check()
+tmp= mortar.Append(sand, 1.0, 1.0)
+check()
+mortar.components.remove(tmp)
+check()
+mortar.components[1].ent= sand
+check()
+wallFactors= wall.getElementaryFactors()
+# Pickling.
+wall2= pickle.loads(pickle.dumps(wall))
+notPickled= (wall2.cachedElementaryFactors is None)
+check()
+results.append(same_factors(wall2.getElementaryFactors(), wall.getElementaryFactors()))
+
+# Unit prices of a project.
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+numUnitPrices= 0
+projectOK= True
+for concept in site.getConcepts():
+    if(concept.isCompound()):
+        numUnitPrices+= 1
+        projectOK= projectOK and same_factors(concept.getElementaryFactors(), get_reference_factors(concept))
+
+'''
+print(results, cached, invalidated, notPickled)
+print(wallFactors)
+print(numUnitPrices, projectOK)
+'''
+
+testOK= all(results) and cached and invalidated and notPickled
+# the labour repeated in the mortar counts once (see
+# ComponentList.getElementaryComponentFactors).
+testOK= testOK and same_factors(wallFactors, [('MO001', 0.5), ('MO001', 0.5*0.4**2), ('MT002', 0.25*0.4)])
+testOK= testOK and (numUnitPrices>100) and projectOK
+
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+'''Check that the integer arithmetic rounding gives the same results as the
+   Decimal one.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import os
+import random
+from decimal import Decimal
+from pycost.structure import obra
+from pycost.bc3 import fr_entity
+from pycost.utils import basic_types
+from pycost.utils import fixed_point
+
+pth= os.path.dirname(__file__)
+if(not pth):
+    pth= "."
+
+# Rounding of numbers (ties included).
+random.seed(1)
+values= [0.125, 2.675, 1.005, -0.125, -2.675, 1e15+0.125, Decimal('0.0050'), Decimal('-1.2345'), 7]
+for i in range(2000):
+    values.append(random.uniform(-1e4, 1e4))
+    values.append(random.randint(-10**6, 10**6)/1000.0+random.choice([0.0, 0.0005, -0.0005, 0.005]))
+    values.append(Decimal(random.randint(-10**8, 10**8)).scaleb(-random.randint(0, 6)))
+numbersOK= True
+for v in values:
+    numbersOK= numbersOK and (basic_types.ppl_price(v)==fixed_point.to_decimal(fixed_point.ppl_price(v), fixed_point.priceScale))
+    numbersOK= numbersOK and (basic_types.ppl_justification(v)==fixed_point.to_decimal(fixed_point.ppl_justification(v), fixed_point.justificationScale))
+    numbersOK= numbersOK and (basic_types.ppl_percentage(v)==fixed_point.to_decimal(fixed_point.ppl_percentage(v), fixed_point.percentageScale))
+    fr= fr_entity.EntFR(float(v), 1.1)
+    numbersOK= numbersOK and (fr.getRoundedProduct()==fixed_point.to_decimal(fr.getScaledRoundedProduct(), fixed_point.productScale))
+
+# Prices (with percentages) and quantities of a project.
+site= obra.Obra(cod="test", tit="Test title")
+inputFile= open(pth+'/../data/bc3/test_file_05.bc3',mode='r')
+site.readBC3(inputFile)
+inputFile.close()
+pricesOK= True
+numPrices= 0
+for concept in site.getConcepts():
+    pricesOK= pricesOK and (concept.getRoundedPrice()==fixed_point.to_decimal(concept.getScaledRoundedPrice(), fixed_point.priceScale))
+    if(concept.isCompound()):
+        numPrices+= 1
+        for cumulated in [True, False]:
+            justification= concept.components.getPriceJustificationList(cumulated)
+            pricesOK= pricesOK and (justification.getTotal()==fixed_point.to_decimal(justification.getScaledTotal(), fixed_point.justificationUnit))
+            pricesOK= pricesOK and (justification.getTotalCP1()==fixed_point.to_decimal(justification.getScaledRoundedTotal(), fixed_point.priceScale))
+quantitiesOK= True
+numQuantities= 0
+chapters= [site]
+while(chapters):
+    chapter= chapters.pop()
+    quantitiesOK= quantitiesOK and (chapter.quantities.getRoundedPrice()==fixed_point.to_decimal(chapter.quantities.getScaledRoundedPrice(), fixed_point.priceScale))
+    for quantities in chapter.quantities:
+        numQuantities+= 1
+        quantitiesOK= quantitiesOK and (quantities.getRoundedTotal()==fixed_point.to_decimal(quantities.getScaledRoundedTotal(), fixed_point.quantityScale))
+    chapters.extend(chapter.subcapitulos)
+
+'''
+print(numbersOK, pricesOK, quantitiesOK)
+print(numPrices, numQuantities)
+'''
+
+testOK= numbersOK and pricesOK and quantitiesOK and (numPrices>100) and (numQuantities>10)
+
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+'''Check the invalidation of the cached prices.'''
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT)"
+__copyright__= "Copyright 2022, LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@ciccp.es"
+
+import pickle
+from pycost.prices import elementary_price
+from pycost.prices import unit_price
+from pycost.utils import basic_types
+
+# Elementary prices.
+labour= elementary_price.ElementaryPrice(cod= 'MO001', tit= 'Labourer', ud= 'h', p= 20.0, tp= basic_types.mdo)
+cement= elementary_price.ElementaryPrice(cod= 'MT001', tit= 'Cement', ud= 't', p= 100.0, tp= basic_types.mat)
+sand= elementary_price.ElementaryPrice(cod= 'MT002', tit= 'Sand', ud= 't', p= 15.0, tp= basic_types.mat)
+
+# Unit prices (the mortar is a component of the wall).
+mortar= unit_price.UnitPrice(cod= 'MORTAR', desc= 'Mortar', ud= 'm3')
+mortar.Append(labour, 1.0, 2.0)
+mortar.Append(cement, 1.0, 0.25)
+wall= unit_price.UnitPrice(cod= 'WALL', desc= 'Wall', ud= 'm2')
+wall.Append(labour, 1.0, 0.5)
+mortarComponent= wall.Append(mortar, 1.0, 0.1)
+
+def get_reference_price(unitPrice):
+    ''' Return the price computed from scratch.'''
+    return unitPrice.components.getPrice()
+
+results= list()
+def check():
+    ''' Compare the cached prices with the computed ones.'''
+    results.append((mortar.getPrice()==get_reference_price(mortar)) and (wall.getPrice()==get_reference_price(wall)))
+
+price0= wall.getPrice()
+sameValue= (wall.cachedPrice is not None) and (wall.getPrice() is price0) # not computed again.
+check()
+# Change the price of an elementary price used by the nested unit price.
+cement.precio= 120.0
+invalidated= (mortar.cachedPrice is None) and (wall.cachedPrice is None)
+check()
+# Change the factor and the production rate of a component.
+mortarComponent.productionRate= 0.2
+check()
+mortar.components[0].factor= 1.5
+check()
+# Append, remove and replace components.
+tmp= mortar.Append(sand, 1.0, 1.0)
+check()
+mortar.components.remove(tmp)
+check()
+mortar.components[1].ent= sand
+check()
+cementReleased= (len(cement.getDependents())==0)
+cement.precio= 1000.0 # does not affect the mortar anymore.
+cementIgnored= (mortar.cachedPrice is not None)
+check()
+# The dependencies are restored after pickling.
+wall.getPrice()
+labour2, wall2= pickle.loads(pickle.dumps((labour, wall)))
+cachedAfterLoad= (wall2.cachedPrice is None)
+price2= wall2.getPrice()
+labour2.precio= 40.0
+results.append((wall2.cachedPrice is None) and (wall2.getPrice()>price2) and (wall.getPrice()==price2))
+
+'''
+print(price0, wall.getPrice())
+print(sameValue, invalidated, cementReleased, cementIgnored, cachedAfterLoad)
+print(results)
+'''
+
+testOK= sameValue and invalidated and cementReleased and cementIgnored and cachedAfterLoad
+testOK= testOK and all(results)
+
+import os
+import logging
+fname= os.path.basename(__file__)
+if testOK:
+    print('test: '+fname+': ok.')
+else:
+    logging.error('test: '+fname+' ERROR.')